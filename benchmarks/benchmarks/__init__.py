@@ -0,0 +1,11 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Benchmarks of tephi, run with airspeed velocity from the ``benchmarks``
+directory, for example::
+
+    asv run --bench loadtxt
+
+"""
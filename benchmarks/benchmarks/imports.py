@@ -0,0 +1,25 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Benchmarks of importing tephi, each in a fresh interpreter.
+
+"""
+
+
+class Import:
+    def timeraw_tephi(self):
+        return "import tephi", "import numpy"
+
+    def timeraw_physics(self):
+        return (
+            """
+            import tephi.indices, tephi.parcel, tephi.resample, tephi.thermo
+            import tephi.transforms
+            """,
+            "import numpy",
+        )
+
+    def timeraw_tephigram(self):
+        return "tephi.TephiAxes", "import numpy, tephi"
@@ -0,0 +1,91 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Benchmarks of :func:`tephi.loadtxt` on large sounding files.
+
+"""
+
+import os.path
+import tempfile
+
+import numpy as np
+
+import tephi
+
+# The titles of the columns of each sounding file.
+COLUMNS = ("pressure", "temperature", "wind_speed", "wind_direction")
+
+
+def _sounding(rows):
+    """Generate a high resolution sounding of pressure, temperature and wind."""
+    generator = np.random.default_rng(0)
+    pressure = np.linspace(1050, 100, rows)
+    temperature = generator.normal(10, 5, rows)
+    wind_speed = generator.uniform(0, 50, rows)
+    wind_direction = generator.uniform(0, 360, rows)
+    return np.column_stack([pressure, temperature, wind_speed, wind_direction])
+
+
+class LoadTxt:
+    params = ([10_000, 1_000_000], ["whitespace", "comma", "comments"])
+    param_names = ["rows", "format"]
+
+    def setup_cache(self):
+        directory = tempfile.mkdtemp()
+        for rows in self.params[0]:
+            data = _sounding(rows)
+            header = " ".join(COLUMNS)
+            filename = os.path.join(directory, "{}.txt".format(rows))
+            np.savetxt(filename, data, fmt="%.1f", header=header)
+            filename = os.path.join(directory, "{}_comma.txt".format(rows))
+            np.savetxt(
+                filename, data, fmt="%.1f", delimiter=", ", header=header
+            )
+            # Comments after the values are parsed value by value.
+            filename = os.path.join(directory, "{}_comments.txt".format(rows))
+            np.savetxt(filename, data, fmt="%.1f", header=header)
+            with open(filename, "a") as fh:
+                fh.write("# end of sounding\n")
+        return directory
+
+    def setup(self, directory, rows, format):
+        suffix = "" if format == "whitespace" else "_{}".format(format)
+        self.filename = os.path.join(
+            directory, "{}{}.txt".format(rows, suffix)
+        )
+        self.delimiter = "," if format == "comma" else None
+
+    def time_loadtxt(self, directory, rows, format):
+        tephi.loadtxt(
+            self.filename, column_titles=COLUMNS, delimiter=self.delimiter
+        )
+
+    def peakmem_loadtxt(self, directory, rows, format):
+        tephi.loadtxt(
+            self.filename, column_titles=COLUMNS, delimiter=self.delimiter
+        )
+
+
+class LoadTxtMany:
+    """Load many small sounding files, as a batch render does."""
+
+    number = 1
+
+    def setup_cache(self):
+        directory = tempfile.mkdtemp()
+        data = _sounding(100)
+        for index in range(500):
+            filename = os.path.join(directory, "{:03d}.txt".format(index))
+            np.savetxt(filename, data, fmt="%.1f", header=" ".join(COLUMNS))
+        return directory
+
+    def setup(self, directory):
+        self.filenames = sorted(
+            os.path.join(directory, name) for name in os.listdir(directory)
+        )
+
+    def time_loadtxt(self, directory):
+        for filename in self.filenames:
+            tephi.loadtxt(filename, column_titles=COLUMNS)
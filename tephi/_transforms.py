@@ -0,0 +1,78 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+The matplotlib tephigram transforms, see :mod:`tephi.transforms`.
+
+"""
+
+from matplotlib.transforms import Transform
+import numpy as np
+
+from tephi.transforms import convert_Tt2xy, convert_xy2Tt
+
+
+class TephiTransform(Transform):
+    """
+    Tephigram transformation to convert from temperature and
+    potential temperature to native plotting device coordinates.
+
+    """
+
+    input_dims = 2
+    output_dims = 2
+    is_separable = False
+    has_inverse = True
+
+    def transform_non_affine(self, values):
+        """
+        Transform from tephigram temperature and potential temperature
+        to native plotting device coordinates.
+
+        Args:
+
+        * values:
+            Values to be transformed, with shape (N, 2).
+
+        """
+        return np.concatenate(
+            convert_Tt2xy(values[:, 0:1], values[:, 1:2]), axis=-1
+        )
+
+    def inverted(self):
+        """Return the inverse transformation."""
+        return TephiTransformInverted()
+
+
+class TephiTransformInverted(Transform):
+    """
+    Tephigram inverse transformation to convert from native
+    plotting device coordinates to tephigram temperature and
+    potential temperature.
+
+    """
+
+    input_dims = 2
+    output_dims = 2
+    is_separable = False
+    has_inverse = True
+
+    def transform_non_affine(self, values):
+        """
+        Transform from native plotting display coordinates to tephigram
+        temperature and potential temperature.
+
+        Args:
+
+        * values:
+           Values to be transformed, with shape (N, 2).
+
+        """
+        return np.concatenate(
+            convert_xy2Tt(values[:, 0:1], values[:, 1:2]), axis=-1
+        )
+
+    def inverted(self):
+        """Return the inverse transformation."""
+        return TephiTransform()
@@ -1,18 +1,60 @@
 import matplotlib.artist
+from matplotlib.image import AxesImage
+from matplotlib.lines import Line2D
+import matplotlib.patches as mpatches
+from matplotlib.text import Text
 import numpy as np
 from scipy.interpolate import interp1d
 from shapely.geometry import LineString, Polygon
 from shapely.prepared import prep
 
+from . import indices, parcel, resample
 from .constants import default
 from .isopleths import Isobar, WetAdiabat, HumidityMixingRatio
-from .transforms import convert_xy2Tt, convert_Tt2pT
+from .transforms import (
+    convert_xy2Tt,
+    convert_Tt2pT,
+    convert_pT2Tt,
+    convert_Tt2xy,
+)
 
 
 class IsoplethArtist(matplotlib.artist.Artist):
     def __init__(self):
         super(IsoplethArtist, self).__init__()
         self._isopleths = None
+        self._shared = None
+
+    def share(self, artist):
+        """
+        Share the isopleth geometry of another artist of the same type and
+        settings, such as on another tephigram of the same figure, rather
+        than generating it again.
+
+        Args:
+
+        * artist:
+            The isopleth artist whose geometry is shared, once it has been
+            drawn.
+
+        """
+        if type(artist) is not type(self):
+            msg = "Expected a {} artist to share, got {}."
+            raise TypeError(msg.format(type(self).__name__, type(artist)))
+        self._shared = artist
+
+    def _shared_isopleths(self):
+        """
+        Copies of the isopleths of the shared artist on these axes, or None
+        if it has not generated them.
+
+        """
+        shared = self._shared
+        if shared is None or shared._isopleths is None:
+            return None
+        return np.asarray(
+            [isopleth.copy(self.axes) for isopleth in shared._isopleths]
+        )
 
     def _locator(self, x0, x1, y0, y1):
         temperature, theta = convert_xy2Tt([x0, x0, x1, x1], [y0, y1, y1, y0])
@@ -49,10 +91,10 @@ class IsobarArtist(IsoplethArtist):
         self._kwargs = {}
         if line is None:
             line = default.get("isobar_line")
-        self._kwargs["line"] = line
+        self._kwargs["line"] = dict(line)
         if text is None:
             text = default.get("isobar_text")
-        self._kwargs["text"] = text
+        self._kwargs["text"] = dict(text)
         if min_theta is None:
             min_theta = default.get("isobar_min_theta")
         self.min_theta = min_theta
@@ -83,6 +125,8 @@ class IsobarArtist(IsoplethArtist):
         if max_theta is None:
             max_theta = self.max_theta
 
+        if self._isopleths is None:
+            self._isopleths = self._shared_isopleths()
         if self._isopleths is None:
             isobars = []
             for tick in self.ticks:
@@ -100,8 +144,12 @@ class IsobarArtist(IsoplethArtist):
         pressure, _ = convert_Tt2pT(temperature, theta)
         func = interp1d(pressure, theta, bounds_error=False)
 
+        draft = axes.tephi["drafting"]
         for isobar in self._isopleths[mask]:
-            isobar.draw(renderer, **draw_kwargs)
+            isobar.draw(renderer, draft=draft, **draw_kwargs)
+            if draft:
+                # Skip the labels, and their bbox patches, while drafting.
+                continue
             point = text_line.intersection(isobar.geometry)
             if point:
                 isobar.refresh(
@@ -134,10 +182,10 @@ class WetAdiabatArtist(IsoplethArtist):
         self._kwargs = {}
         if line is None:
             line = default.get("wet_adiabat_line")
-        self._kwargs["line"] = line
+        self._kwargs["line"] = dict(line)
         if text is None:
             text = default.get("wet_adiabat_text")
-        self._kwargs["text"] = text
+        self._kwargs["text"] = dict(text)
         if min_temperature is None:
             min_temperature = default.get("wet_adiabat_min_temperature")
         self.min_temperature = min_temperature
@@ -173,6 +221,8 @@ class WetAdiabatArtist(IsoplethArtist):
         if max_pressure is None:
             max_pressure = self.max_pressure
 
+        if self._isopleths is None:
+            self._isopleths = self._shared_isopleths()
         if self._isopleths is None:
             adiabats = []
             for tick in self.ticks:
@@ -191,8 +241,12 @@ class WetAdiabatArtist(IsoplethArtist):
         mT = temperature[1]
         snap = None
 
+        draft = axes.tephi["drafting"]
         for adiabat in self._isopleths[mask]:
-            adiabat.draw(renderer, **draw_kwargs)
+            adiabat.draw(renderer, draft=draft, **draw_kwargs)
+            if draft:
+                # Skip the labels, and their bbox patches, while drafting.
+                continue
             point = text_line.intersection(adiabat.geometry)
             if point:
                 adiabat.refresh(
@@ -229,10 +283,10 @@ class HumidityMixingRatioArtist(IsoplethArtist):
         self._kwargs = {}
         if line is None:
             line = default.get("mixing_ratio_line")
-        self._kwargs["line"] = line
+        self._kwargs["line"] = dict(line)
         if text is None:
             text = default.get("mixing_ratio_text")
-        self._kwargs["text"] = text
+        self._kwargs["text"] = dict(text)
         if min_pressure is None:
             min_pressure = default.get("mixing_ratio_min_pressure")
         self.min_pressure = min_pressure
@@ -268,6 +322,8 @@ class HumidityMixingRatioArtist(IsoplethArtist):
         if max_pressure is None:
             max_pressure = self.max_pressure
 
+        if self._isopleths is None:
+            self._isopleths = self._shared_isopleths()
         if self._isopleths is None:
             ratios = []
             for tick in self.ticks:
@@ -286,8 +342,12 @@ class HumidityMixingRatioArtist(IsoplethArtist):
         mt = theta[1]
         snap = None
 
+        draft = axes.tephi["drafting"]
         for ratio in self._isopleths[mask]:
-            ratio.draw(renderer, **draw_kwargs)
+            ratio.draw(renderer, draft=draft, **draw_kwargs)
+            if draft:
+                # Skip the labels, and their bbox patches, while drafting.
+                continue
             point = text_line.intersection(ratio.geometry)
             if point:
                 ratio.refresh(
@@ -305,3 +365,514 @@ class HumidityMixingRatioArtist(IsoplethArtist):
                     t = ratio.extent.theta.lower
                     snap = "lower"
                 ratio.refresh(T, t, renderer=renderer, **text_kwargs)
+
+
+class ParcelArtist(matplotlib.artist.Artist):
+    #: The parcel diagnostics available for each kind of parcel.
+    kinds = dict(
+        surface=parcel.surface_based,
+        mixed_layer=parcel.mixed_layer,
+        most_unstable=parcel.most_unstable,
+    )
+
+    def __init__(
+        self,
+        pressure,
+        temperature,
+        dewpoint,
+        kind="surface",
+        line=None,
+        cape=None,
+        cin=None,
+    ):
+        """
+        Overlay the path of a lifted parcel, and its shaded areas of CAPE and
+        CIN, on the environment profile of a single sounding.
+
+        Args:
+
+        * pressure:
+            Pressure levels of the sounding, in mb or hPa, from the surface
+            upwards.
+
+        * temperature:
+            Environment temperature of the sounding, in degC.
+
+        * dewpoint:
+            Environment dew-point temperature of the sounding, in degC.
+
+        Kwargs:
+
+        * kind:
+            The parcel to lift, which is one of "surface", "mixed_layer" or
+            "most_unstable". Defaults to "surface".
+
+        * line:
+            Keyword arguments for the parcel path line.
+
+        * cape:
+            Keyword arguments for the CAPE shading polygons.
+
+        * cin:
+            Keyword arguments for the CIN shading polygons.
+
+        """
+        super(ParcelArtist, self).__init__()
+        if kind not in self.kinds:
+            msg = "Invalid parcel kind {!r}, expecting one of {}."
+            raise ValueError(msg.format(kind, ", ".join(sorted(self.kinds))))
+        self.pressure = np.asarray(pressure, dtype=float)
+        self.temperature = np.asarray(temperature, dtype=float)
+        if self.pressure.ndim != 1:
+            msg = "The parcel artist requires a single sounding."
+            raise ValueError(msg)
+        self.parcel = self.kinds[kind](
+            self.pressure, self.temperature, dewpoint
+        )
+        self._kwargs = {}
+        for key, kwargs in (("line", line), ("cape", cape), ("cin", cin)):
+            self._kwargs[key] = dict(default.get("parcel_{}".format(key)))
+            if kwargs is not None:
+                self._kwargs[key].update(kwargs)
+        self.set_zorder(default.get("isopleth_zorder"))
+        self._artists = None
+
+    def _path(self):
+        """The parcel path from its starting point to the sounding top."""
+        start = self.parcel.pressure
+        top = np.nanmin(self.pressure)
+        pressure = np.geomspace(start, top, default.get("parcel_steps"))
+        lcl = self.parcel.lcl_pressure
+        if top < lcl < start:
+            pressure = np.sort(np.append(pressure, lcl))[::-1]
+        temperature = parcel.lift(
+            pressure,
+            self.parcel.pressure,
+            self.parcel.temperature,
+            self.parcel.dewpoint,
+        )
+        return convert_pT2Tt(pressure, temperature)
+
+    def _shade(self, bottom, top, sign):
+        """
+        The vertices of the area between the parcel and environment
+        temperature, between the bottom and top pressures, where the
+        parcel buoyancy has the given sign.
+
+        """
+        profile = self.parcel.profile
+        valid = np.isfinite(profile) & np.isfinite(self.temperature)
+        if not (np.isfinite(bottom) and np.isfinite(top)) or not valid.any():
+            return None
+        # Work in negative log-pressure, which increases with height.
+        x = -np.log(self.pressure[valid])
+        lower, upper = -np.log(bottom), -np.log(top)
+        inside = x[(x > lower) & (x < upper)]
+        xs = np.concatenate(([lower], inside, [upper]))
+        environment = np.interp(xs, x, self.temperature[valid])
+        buoyancy = np.interp(xs, x, profile[valid] - self.temperature[valid])
+        # Insert the points at which the buoyancy changes sign.
+        cross = np.where(buoyancy[:-1] * buoyancy[1:] < 0)[0]
+        fraction = buoyancy[cross] / (buoyancy[cross] - buoyancy[cross + 1])
+        xc = xs[cross] + fraction * (xs[cross + 1] - xs[cross])
+        environment_c = np.interp(xc, xs, environment)
+        xs = np.insert(xs, cross + 1, xc)
+        environment = np.insert(environment, cross + 1, environment_c)
+        buoyancy = np.insert(buoyancy, cross + 1, 0.0)
+        buoyancy = np.where(sign * buoyancy > 0, buoyancy, 0.0)
+        pressure = np.exp(-np.concatenate((xs, xs[::-1])))
+        temperature = np.concatenate(
+            (environment + buoyancy, environment[::-1])
+        )
+        return np.column_stack(convert_pT2Tt(pressure, temperature))
+
+    def _make_artists(self):
+        axes = self.axes
+        transform = axes.tephi["transform"]
+        temperature, theta = self._path()
+        line = Line2D(
+            temperature, theta, transform=transform, **self._kwargs["line"]
+        )
+        artists = [line]
+        result = self.parcel
+        areas = (
+            ("cape", result.lfc_pressure, result.el_pressure, 1),
+            ("cin", result.pressure, result.lfc_pressure, -1),
+        )
+        for key, bottom, top, sign in areas:
+            vertices = self._shade(bottom, top, sign)
+            if vertices is not None:
+                artists.append(
+                    mpatches.Polygon(
+                        vertices,
+                        closed=True,
+                        transform=transform,
+                        **self._kwargs[key],
+                    )
+                )
+        for artist in artists:
+            artist.set_figure(axes.figure)
+            artist.set_clip_box(axes.bbox)
+            artist.set_zorder(self.get_zorder())
+        return artists
+
+    @matplotlib.artist.allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if self._artists is None:
+            self._artists = self._make_artists()
+        for artist in self._artists:
+            artist.draw(renderer)
+
+
+class DensityArtist(matplotlib.artist.Artist):
+    def __init__(self, data=None, extent=None, bins=None, image=None):
+        """
+        Show the density of a large collection of profiles as a single image.
+
+        The profiles are rasterised into a two-dimensional histogram in the
+        native tephigram x and y coordinates, in which each profile adds
+        about one count to each bin that it passes through. Further profiles
+        may be accumulated with :meth:`add`, without reprocessing those
+        already binned.
+
+        Kwargs:
+
+        * data:
+            Array with shape (N, L, 2), or a sequence of N sequences of
+            pressure and temperature points, of differing lengths, for each
+            profile to bin.
+
+        * extent:
+            The (x0, x1, y0, y1) extent of the histogram in native tephigram
+            coordinates, see :func:`tephi.transforms.convert_Tt2xy`. Defaults
+            to the extent of the first profiles binned, with a margin.
+
+        * bins:
+            The number of bins, or the (nx, ny) number of bins, along the x
+            and y axes of the histogram.
+
+        * image:
+            Keyword arguments for the :class:`matplotlib.image.AxesImage`.
+
+        """
+        super(DensityArtist, self).__init__()
+        if bins is None:
+            bins = default.get("density_bins")
+        self.bins = tuple(np.broadcast_to(np.asarray(bins, dtype=int), 2))
+        self.extent = None if extent is None else tuple(extent)
+        self.counts = np.zeros(self.bins[::-1])
+        self.count = 0
+        self._kwargs = dict(default.get("density_image"))
+        if image is not None:
+            self._kwargs.update(image)
+        self.set_zorder(self._kwargs.pop("zorder", 0))
+        self._image = None
+        self._stale = True
+        if data is not None:
+            self.add(data)
+
+    def _points(self, data):
+        """The native x and y coordinates of each profile point."""
+        data = resample.stack(list(data))
+        if data.ndim != 3 or data.shape[-1] != 2:
+            msg = (
+                "The density data requires to be a sequence of profiles of "
+                "pressure, temperature value pairs."
+            )
+            raise ValueError(msg)
+        return data.shape[0], convert_Tt2xy(
+            *convert_pT2Tt(data[..., 0], data[..., 1])
+        )
+
+    @staticmethod
+    def _clip(xa, ya, xb, yb, nx, ny):
+        """
+        Clip the segments to the box of the histogram, from (0, 0) to
+        (nx, ny) in units of bins, and drop the segments outside of it.
+
+        """
+        dx, dy = xb - xa, yb - ya
+        lower, upper = np.zeros_like(xa), np.ones_like(xa)
+        outside = np.zeros(xa.shape, dtype=bool)
+        # The fraction along each segment at which it crosses each edge.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for p, q in ((-dx, xa), (dx, nx - xa), (-dy, ya), (dy, ny - ya)):
+                fraction = q / p
+                lower = np.where(p < 0, np.maximum(lower, fraction), lower)
+                upper = np.where(p > 0, np.minimum(upper, fraction), upper)
+                outside |= (p == 0) & (q < 0)
+        keep = ~outside & (lower <= upper)
+        lower, upper = lower[keep], upper[keep]
+        xa, ya, dx, dy = xa[keep], ya[keep], dx[keep], dy[keep]
+        return (
+            xa + lower * dx,
+            ya + lower * dy,
+            xa + upper * dx,
+            ya + upper * dy,
+        )
+
+    def add(self, data):
+        """
+        Accumulate the profiles into the histogram.
+
+        Args:
+
+        * data:
+            Array with shape (N, L, 2), or a sequence of N sequences of
+            pressure and temperature points, of differing lengths, for each
+            profile to bin.
+
+        """
+        count, (x, y) = self._points(data)
+        if self.extent is None:
+            x0, x1 = np.nanmin(x), np.nanmax(x)
+            y0, y1 = np.nanmin(y), np.nanmax(y)
+            margin = default.get("density_margin")
+            dx, dy = margin * (x1 - x0), margin * (y1 - y0)
+            self.extent = (x0 - dx, x1 + dx, y0 - dy, y1 + dy)
+        nx, ny = self.bins
+        x0, x1, y0, y1 = self.extent
+        # Work in units of bins.
+        x = (x - x0) * (nx / (x1 - x0))
+        y = (y - y0) * (ny / (y1 - y0))
+        # The segments joining consecutive valid points of each profile.
+        valid = np.isfinite(x[:, :-1] + x[:, 1:] + y[:, :-1] + y[:, 1:])
+        xa, ya, xb, yb = self._clip(
+            x[:, :-1][valid],
+            y[:, :-1][valid],
+            x[:, 1:][valid],
+            y[:, 1:][valid],
+            nx,
+            ny,
+        )
+        # Sample each segment at intervals of no more than one bin, with
+        # each sample weighted by its share of the segment length.
+        length = np.hypot(xb - xa, yb - ya)
+        samples = np.ceil(np.maximum(abs(xb - xa), abs(yb - ya))) + 1
+        samples = samples.astype(int)
+        segment = np.repeat(np.arange(samples.size), samples)
+        start = np.cumsum(samples) - samples
+        step = np.arange(segment.size) - start[segment]
+        fraction = (step + 0.5) / samples[segment]
+        xs = xa[segment] + fraction * (xb - xa)[segment]
+        ys = ya[segment] + fraction * (yb - ya)[segment]
+        weight = (length / samples)[segment]
+        # The samples of the clipped segments are inside the histogram, but
+        # for rounding at its edges.
+        i = np.clip(xs.astype(int), 0, nx - 1)
+        j = np.clip(ys.astype(int), 0, ny - 1)
+        self.counts += np.bincount(
+            j * nx + i, weights=weight, minlength=nx * ny
+        ).reshape(ny, nx)
+        self.count += count
+        self._stale = True
+        self.stale = True
+
+    @matplotlib.artist.allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible() or self.extent is None:
+            return
+        if self._image is None:
+            self._image = AxesImage(
+                self.axes, extent=self.extent, origin="lower", **self._kwargs
+            )
+            self._image.set_transform(self.axes.transData)
+            self._image.set_zorder(self.get_zorder())
+            self._image.set_clip_path(self.axes.patch)
+        if self._stale:
+            self._image.set_data(np.ma.masked_equal(self.counts, 0))
+            self._stale = False
+        self._image.draw(renderer)
+
+
+class EnvelopeArtist(matplotlib.artist.Artist):
+    def __init__(
+        self,
+        data,
+        levels=None,
+        percentiles=None,
+        color=None,
+        median=None,
+        band=None,
+    ):
+        """
+        Summarise the members of an ensemble by shaded percentile bands and
+        a median line.
+
+        The members are resampled onto common pressure levels, and the
+        percentiles are calculated across the members at each level, once,
+        on creation. The artist then draws one polygon per band and one
+        median line, whatever the number of members.
+
+        Args:
+
+        * data:
+            Array with shape (N, L, 2), or a sequence of N sequences of
+            pressure and temperature points, of differing lengths, for each
+            member. The temperature may equally be the dew-point.
+
+        Kwargs:
+
+        * levels:
+            The pressure levels, in mb or hPa, of the envelope. Defaults to
+            levels evenly spaced in log-pressure over the members.
+
+        * percentiles:
+            Sequence of (lower, upper) percentile pairs, from 0 to 100, of
+            each shaded band. Defaults to the 10-90% and 25-75% bands.
+
+        * color:
+            Colour of the bands and the median line.
+
+        * median:
+            Keyword arguments for the median line, or False to omit it.
+
+        * band:
+            Keyword arguments for the band polygons.
+
+        """
+        super(EnvelopeArtist, self).__init__()
+        data = resample.stack(list(data))
+        if data.ndim != 3 or data.shape[-1] != 2:
+            msg = (
+                "The envelope data requires to be a sequence of members of "
+                "pressure, temperature value pairs."
+            )
+            raise ValueError(msg)
+        if levels is None:
+            levels = np.geomspace(
+                np.nanmax(data[..., 0]),
+                np.nanmin(data[..., 0]),
+                default.get("envelope_steps"),
+            )
+        if percentiles is None:
+            percentiles = default.get("envelope_percentiles")
+        self.percentiles = np.asarray(percentiles, dtype=float).reshape(-1, 2)
+        values = resample.resample(data[..., 0], data[..., 1], levels)
+        valid = np.isfinite(values).any(axis=0)
+        self.levels = np.asarray(levels, dtype=float)[valid]
+        # The band percentiles, followed by the median.
+        self.quantiles = np.nanpercentile(
+            values[:, valid], np.append(self.percentiles.ravel(), 50), axis=0
+        )
+        self._kwargs = {}
+        colors = dict(median="color", band="facecolor")
+        for key, kwargs in (("median", median), ("band", band)):
+            self._kwargs[key] = dict(default.get("envelope_{}".format(key)))
+            if color is not None:
+                self._kwargs[key][colors[key]] = color
+            if kwargs:
+                self._kwargs[key].update(kwargs)
+        self._median = median is not False
+        self.set_zorder(default.get("isopleth_zorder") - 1)
+        self._artists = None
+
+    def _make_artists(self):
+        axes = self.axes
+        transform = axes.tephi["transform"]
+        levels = np.concatenate([self.levels, self.levels[::-1]])
+        bands = self.quantiles[:-1].reshape(-1, 2, self.levels.size)
+        artists = []
+        for lower, upper in bands:
+            temperature = np.concatenate([lower, upper[::-1]])
+            vertices = np.column_stack(convert_pT2Tt(levels, temperature))
+            artists.append(
+                mpatches.Polygon(
+                    vertices,
+                    closed=True,
+                    transform=transform,
+                    **self._kwargs["band"],
+                )
+            )
+        if self._median:
+            temperature, theta = convert_pT2Tt(self.levels, self.quantiles[-1])
+            artists.append(
+                Line2D(
+                    temperature,
+                    theta,
+                    transform=transform,
+                    **self._kwargs["median"],
+                )
+            )
+        for artist in artists:
+            artist.set_figure(axes.figure)
+            artist.set_clip_box(axes.bbox)
+            artist.set_zorder(self.get_zorder())
+        return artists
+
+    @matplotlib.artist.allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if self._artists is None:
+            self._artists = self._make_artists()
+        for artist in self._artists:
+            artist.draw(renderer)
+
+
+class IndexTableArtist(matplotlib.artist.Artist):
+    def __init__(
+        self, pressure, temperature, dewpoint, text=None, position=None
+    ):
+        """
+        Tabulate the stability indices of a single sounding.
+
+        Args:
+
+        * pressure:
+            Pressure levels of the sounding, in mb or hPa, from the surface
+            upwards.
+
+        * temperature:
+            Temperature of the sounding, in degC.
+
+        * dewpoint:
+            Dew-point temperature of the sounding, in degC.
+
+        Kwargs:
+
+        * text:
+            Keyword arguments for the table :class:`matplotlib.text.Text`.
+
+        * position:
+            Position of the table in axes coordinates. Defaults to the
+            upper left corner.
+
+        """
+        super(IndexTableArtist, self).__init__()
+        if np.ndim(pressure) != 1:
+            msg = "The index table artist requires a single sounding."
+            raise ValueError(msg)
+        self.indices = indices.calculate(pressure, temperature, dewpoint)
+        self._kwargs = dict(default.get("indices_text"))
+        if text is not None:
+            self._kwargs.update(text)
+        if position is None:
+            position = default.get("indices_position")
+        self.position = position
+        self.set_zorder(default.get("isopleth_zorder") + 2)
+        self._text = None
+
+    def _table(self):
+        rows = []
+        for (name, units), value in zip(indices.NAMES, self.indices):
+            rows.append("{:<19}{:>7.1f} {}".format(name, value, units))
+        return "\n".join(rows)
+
+    @matplotlib.artist.allow_rasterization
+    def draw(self, renderer):
+        if not self.get_visible():
+            return
+        if self._text is None:
+            x, y = self.position
+            self._text = Text(
+                x,
+                y,
+                self._table(),
+                transform=self.axes.transAxes,
+                figure=self.axes.figure,
+                **self._kwargs,
+            )
+        self._text.draw(renderer)
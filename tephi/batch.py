@@ -0,0 +1,303 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Batch rendering of many sounding files to tephigram images.
+
+The files are rendered across a pool of worker processes. Each worker holds
+a :class:`~tephi.pool.TephiPool` of one tephigram, which is built and drawn
+once, so that the isopleth geometry is computed once per worker rather than
+once per file. Each file is then loaded, plotted onto the tephigram of the
+worker and saved, and the tephigram is reset before the next file.
+
+"""
+
+from collections import Counter, namedtuple
+import concurrent.futures
+import glob
+import os
+import time
+
+from tephi import loadtxt
+from tephi.pool import ISOPLETHS, TephiPool
+
+#: The time spent, in seconds, in each stage of rendering: building the
+#: tephigram of each worker, loading, plotting and saving the files, and the
+#: elapsed time of the batch. The stages are summed over all the workers.
+TIMINGS = namedtuple("TIMINGS", "setup load plot save wall")
+
+#: The result of rendering a batch: the rendered image filenames, a mapping
+#: of each sounding file that failed to render to its error message, and the
+#: :data:`TIMINGS` of the batch.
+RENDERED = namedtuple("RENDERED", "filenames failed timings")
+
+# The wind columns of a sounding file, which are drawn as barbs.
+_WINDS = ("wind_speed", "wind_direction")
+
+# The tephigram of the worker process, which is built by its initialiser.
+_WORKER = None
+
+
+def expand(filenames):
+    """
+    Expand the glob patterns of a sequence of filenames.
+
+    Args:
+
+    * filenames:
+        A filename or glob pattern, or a sequence of them.
+
+    Returns:
+        The list of filenames, with each pattern replaced by its sorted
+        matches.
+
+    """
+    if isinstance(filenames, (str, os.PathLike)):
+        filenames = [filenames]
+    result = []
+    for filename in filenames:
+        filename = os.fspath(filename)
+        if glob.has_magic(filename):
+            result.extend(sorted(glob.glob(filename)))
+        else:
+            result.append(filename)
+    return result
+
+
+def _targets(filenames, output, format):
+    """
+    The image filename of each sounding file, which is named after the stem
+    of the file. Files of the same stem in different directories keep their
+    path relative to the common directory of those files.
+
+    """
+    stems = [
+        os.path.splitext(os.path.basename(filename))[0]
+        for filename in filenames
+    ]
+    counts = Counter(stems)
+    clashing = [
+        os.path.dirname(os.path.abspath(filename))
+        for filename, stem in zip(filenames, stems)
+        if counts[stem] > 1
+    ]
+    if clashing:
+        common = os.path.commonpath(clashing)
+    targets = []
+    for filename, stem in zip(filenames, stems):
+        if counts[stem] > 1:
+            path = os.path.splitext(os.path.abspath(filename))[0]
+            stem = os.path.relpath(path, common)
+        targets.append(os.path.join(output, "{}.{}".format(stem, format)))
+    counts = Counter(targets)
+    duplicates = [
+        filename
+        for filename, target in zip(filenames, targets)
+        if counts[target] > 1
+    ]
+    if duplicates:
+        msg = "Sounding files {} would be rendered to the same image."
+        raise ValueError(msg.format(duplicates))
+    return targets
+
+
+class _Worker(object):
+    def __init__(self, options):
+        """
+        The tephigram of a worker process, which is built and drawn once and
+        reused for every file that the worker renders.
+
+        """
+        start = time.perf_counter()
+        self.options = options
+        self.pool = TephiPool(
+            size=1, figsize=options["figsize"], isopleths=options["isopleths"]
+        )
+        self.pool.fill()
+        self.setup = time.perf_counter() - start
+
+    def _load(self, filename):
+        return loadtxt(
+            filename,
+            column_titles=self.options["column_titles"],
+            delimiter=self.options["delimiter"],
+        )
+
+    def _plot(self, axes, data):
+        fields = data._fields
+        pressure = getattr(data, "pressure", data[0])
+        columns = [
+            name
+            for name in fields
+            if name not in _WINDS and getattr(data, name) is not pressure
+        ]
+        profiles = []
+        for name in columns:
+            points = zip(pressure, getattr(data, name))
+            profiles.append(axes.plot(points, label=name))
+        if profiles and all(name in fields for name in _WINDS):
+            barbs = zip(data.wind_speed, data.wind_direction, pressure)
+            profiles[0].barbs(barbs)
+
+    def render(self, filename, target):
+        """
+        Render the sounding file to the image filename.
+
+        Returns:
+            A tuple of the sounding filename, the image filename, the error
+            message of a failure, and the time of the setup, load, plot and
+            save stages. The setup time of the worker is only reported with
+            its first file.
+
+        """
+        options = self.options
+        error = None
+        times = [self.setup, 0.0, 0.0, 0.0]
+        self.setup = 0.0
+        try:
+            with self.pool.axes() as axes:
+                start = time.perf_counter()
+                data = self._load(filename)
+                times[1] = time.perf_counter() - start
+                start = time.perf_counter()
+                self._plot(axes, data)
+                times[2] = time.perf_counter() - start
+                start = time.perf_counter()
+                axes.figure.savefig(
+                    target, format=options["format"], dpi=options["dpi"]
+                )
+                times[3] = time.perf_counter() - start
+        except Exception as exc:
+            target = None
+            error = "{}: {}".format(type(exc).__name__, exc)
+        return (filename, target, error) + tuple(times)
+
+
+def _initialise(options):
+    global _WORKER
+    _WORKER = _Worker(options)
+
+
+def _render(filename, target):
+    return _WORKER.render(filename, target)
+
+
+def render_files(
+    filenames,
+    output=".",
+    workers=None,
+    chunksize=1,
+    format="png",
+    dpi=None,
+    figsize=None,
+    column_titles=None,
+    delimiter=None,
+    isopleths=ISOPLETHS,
+):
+    """
+    Render each sounding file to a tephigram image, across a pool of worker
+    processes.
+
+    Each column of a sounding file, other than the pressure and any wind
+    speed and wind direction columns, is plotted as a profile against the
+    pressure. The wind, if present, is plotted as barbs of the first
+    profile.
+
+    Args:
+
+    * filenames:
+        A filename or glob pattern, or a sequence of them, of sounding files
+        loaded by :func:`tephi.loadtxt`.
+
+    Kwargs:
+
+    * output:
+        The directory of the images, which are named after the stem of each
+        sounding file. Files of the same stem in different directories keep
+        their path relative to the common directory of those files. Defaults
+        to the current directory.
+
+    * workers:
+        The number of worker processes. Defaults to the number of CPUs.
+        One worker renders the files in this process.
+
+    * chunksize:
+        The number of files sent to a worker at a time. Larger chunks reduce
+        the overhead of many small files.
+
+    * format:
+        The image format, such as ``"png"``, ``"svg"`` or ``"pdf"``.
+
+    * dpi:
+        The resolution of the images. Defaults to that of the figure.
+
+    * figsize:
+        The width and height of the figure in inches.
+
+    * column_titles:
+        The titles of the columns of each sounding file, see
+        :func:`tephi.loadtxt`. Defaults to pressure and temperature.
+
+    * delimiter:
+        The delimiter of the values of each sounding file. Defaults to any
+        whitespace.
+
+    * isopleths:
+        The isopleths added to each tephigram, from ``"isobars"``,
+        ``"wet_adiabats"`` and ``"mixing_ratios"``. Defaults to all of them.
+
+    Returns:
+        A :data:`RENDERED` namedtuple.
+
+    """
+    start = time.perf_counter()
+    filenames = expand(filenames)
+    unknown = set(isopleths).difference(ISOPLETHS)
+    if unknown:
+        msg = "Unknown isopleths {}, expected any of {}."
+        raise ValueError(msg.format(sorted(unknown), list(ISOPLETHS)))
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(int(workers), len(filenames)))
+    # Name the images before rendering, so that no image overwrites another.
+    targets = _targets(filenames, output, format)
+    os.makedirs(output, exist_ok=True)
+    for directory in set(map(os.path.dirname, targets)):
+        os.makedirs(directory, exist_ok=True)
+    options = dict(
+        column_titles=column_titles,
+        delimiter=delimiter,
+        dpi=dpi,
+        figsize=figsize,
+        format=format,
+        isopleths=tuple(isopleths),
+    )
+
+    if not filenames:
+        results = []
+    elif workers == 1:
+        worker = _Worker(options)
+        results = [
+            worker.render(filename, target)
+            for filename, target in zip(filenames, targets)
+        ]
+    else:
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers, initializer=_initialise, initargs=(options,)
+        ) as executor:
+            results = list(
+                executor.map(_render, filenames, targets, chunksize=chunksize)
+            )
+
+    rendered = [target for _, target, error, *_ in results if error is None]
+    failed = {
+        filename: error
+        for filename, _, error, *_ in results
+        if error is not None
+    }
+    stages = [sum(times) for times in zip(*[r[3:] for r in results])]
+    if not stages:
+        stages = [0.0] * 4
+    timings = TIMINGS(*stages, wall=time.perf_counter() - start)
+    return RENDERED(rendered, failed, timings)
@@ -0,0 +1,143 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+The ``tephi`` command line interface.
+
+For example, to render each sounding file of a directory across four worker
+processes::
+
+    tephi render --workers 4 --output images "soundings/*.txt"
+
+"""
+
+import argparse
+import sys
+
+from tephi import batch
+
+
+def _parser():
+    parser = argparse.ArgumentParser(
+        prog="tephi", description="Tephigram plotting in Python."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    render = commands.add_parser(
+        "render",
+        help="Render sounding files to tephigram images.",
+        description=(
+            "Render each sounding file to a tephigram image, across a "
+            "pool of worker processes."
+        ),
+    )
+    render.add_argument(
+        "filenames",
+        nargs="+",
+        metavar="FILE",
+        help="Sounding file or glob pattern.",
+    )
+    render.add_argument(
+        "-o",
+        "--output",
+        default=".",
+        help="Directory of the images (default: %(default)s).",
+    )
+    render.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: the number of CPUs).",
+    )
+    render.add_argument(
+        "--chunksize",
+        type=int,
+        default=1,
+        help="Files sent to a worker at a time (default: %(default)s).",
+    )
+    render.add_argument(
+        "-f",
+        "--format",
+        default="png",
+        help="Image format (default: %(default)s).",
+    )
+    render.add_argument(
+        "--dpi", type=float, default=None, help="Image resolution."
+    )
+    render.add_argument(
+        "--columns",
+        default=None,
+        help=(
+            "Comma separated column titles of the sounding files, such as "
+            "pressure,temperature,dewpoint,wind_speed,wind_direction "
+            "(default: pressure,temperature)."
+        ),
+    )
+    render.add_argument(
+        "--delimiter",
+        default=None,
+        help="Delimiter of the values (default: any whitespace).",
+    )
+    render.add_argument(
+        "--isopleths",
+        default=",".join(batch.ISOPLETHS),
+        help="Comma separated isopleths to add (default: %(default)s).",
+    )
+    return parser
+
+
+def _split(value):
+    if value is None:
+        return None
+    return tuple(item.strip() for item in value.split(",") if item.strip())
+
+
+def _render(args):
+    result = batch.render_files(
+        args.filenames,
+        output=args.output,
+        workers=args.workers,
+        chunksize=args.chunksize,
+        format=args.format,
+        dpi=args.dpi,
+        column_titles=_split(args.columns),
+        delimiter=args.delimiter,
+        isopleths=_split(args.isopleths),
+    )
+    total = len(result.filenames) + len(result.failed)
+    timings = result.timings
+    rate = len(result.filenames) / timings.wall if timings.wall else 0.0
+    print(
+        "Rendered {} of {} files in {:.2f} s ({:.1f} files/s).".format(
+            len(result.filenames), total, timings.wall, rate
+        )
+    )
+    for stage in ("setup", "load", "plot", "save"):
+        print("  {:<6}{:10.3f} s".format(stage, getattr(timings, stage)))
+    for filename, error in result.failed.items():
+        print("Failed {}: {}".format(filename, error), file=sys.stderr)
+    return 1 if result.failed else 0
+
+
+def main(argv=None):
+    """
+    Run the ``tephi`` command.
+
+    Kwargs:
+
+    * argv:
+        The command line arguments. Defaults to those of the process.
+
+    Returns:
+        The exit status, which is non-zero if any file failed.
+
+    """
+    args = _parser().parse_args(argv)
+    if args.command == "render":
+        return _render(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
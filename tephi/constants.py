@@ -12,6 +12,9 @@ Cp = 1004.0
 # Dimensionless ratio: Rd / Cp.
 K = 0.286
 
+# The acceleration due to gravity, in units of m s-2.
+G = 9.81
+
 # Conversion offset between degree Celsius and Kelvin.
 KELVIN = 273.15
 
@@ -39,6 +42,28 @@ default = {
     "barbs_length": 7,
     "barbs_linewidth": 1.5,
     "barbs_zorder": 10,
+    "density_bins": 256,
+    "density_image": dict(cmap="Blues", interpolation="nearest", zorder=-1),
+    "density_margin": 0.05,
+    "draft_barbs": 8,
+    "draft_step": 4,
+    "envelope_band": dict(facecolor="grey", edgecolor="none", alpha=0.3),
+    "envelope_median": dict(color="grey", linewidth=1.5, clip_on=True),
+    "envelope_percentiles": ((10, 90), (25, 75)),
+    "envelope_steps": 50,
+    "indices_position": (0.02, 0.98),
+    "indices_text": dict(
+        size=8,
+        family="monospace",
+        va="top",
+        ha="left",
+        bbox=dict(
+            boxstyle="Round,pad=0.3",
+            facecolor="white",
+            edgecolor="grey",
+            alpha=0.8,
+        ),
+    ),
     "isobar_line": dict(color="blue", linewidth=0.5, clip_on=True),
     "isobar_min_theta": 0,
     "isobar_max_theta": 250,
@@ -71,6 +96,12 @@ default = {
     ],
     "isopleth_picker": 3,
     "isopleth_zorder": 10,
+    "legend": dict(
+        loc="upper right",
+        fancybox=True,
+        shadow=True,
+        prop=dict(size="x-small"),
+    ),
     "mixing_ratio_line": dict(color="green", linewidth=0.5, clip_on=True),
     "mixing_ratio_text": dict(
         size=8, color="green", clip_on=True, va="bottom", ha="right"
@@ -124,6 +155,15 @@ default = {
         68.0,
         80.0,
     ],
+    "parcel_cape": dict(facecolor="red", edgecolor="none", alpha=0.3),
+    "parcel_cin": dict(facecolor="blue", edgecolor="none", alpha=0.3),
+    "parcel_line": dict(
+        color="black", linewidth=1, linestyle="--", clip_on=True
+    ),
+    "parcel_steps": 100,
+    "pool_size": 4,
+    "spatial_cell": 2.0,
+    "spatial_merge": 0.25,
     "wet_adiabat_line": dict(color="orange", linewidth=0.5, clip_on=True),
     "wet_adiabat_min_temperature": -50,
     "wet_adiabat_max_pressure": P_BASE,
@@ -0,0 +1,131 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Small multiples of tephigrams within one figure.
+
+The tephigrams of a :class:`TephiGrid` share one
+:class:`~tephi.grid_finder.GridFinder`, and so one transform instance and one
+cache of grid lines, tick locations and tick labels. Their isopleth artists
+share the geometry of the isopleths of the first tephigram, which is
+generated once, rather than once per tephigram. Optionally, the tephigrams
+also share their view limits, which are centered around the profiles of all
+of them.
+
+"""
+
+import numpy as np
+
+from tephi.tephigram import TephiAxes
+
+
+class TephiGrid(object):
+    def __init__(self, nrows=1, ncols=1, figure=None, share=False, **kwargs):
+        """
+        Create a grid of tephigrams within one figure.
+
+        Kwargs:
+
+        * nrows, ncols:
+            The number of rows and columns of tephigrams.
+
+        * figure:
+            The :class:`matplotlib.figure.Figure` of the tephigrams.
+            Defaults to the current pyplot figure.
+
+        * share:
+            Whether the tephigrams share their view limits. Defaults to
+            False.
+
+        .. note::
+            All other keyword arguments, such as ``xylim`` and the
+            ``isotherm_locator`` and ``dry_adiabat_locator``, are passed
+            through to each :class:`~tephi.TephiAxes`.
+
+        For example:
+
+            >>> from matplotlib.figure import Figure
+            >>> from tephi import TephiGrid
+            >>> grid = TephiGrid(2, 3, figure=Figure(), share=True)
+            >>> grid.add_isobars()
+            >>> profile = grid[1, 2].plot([(1000, 20), (850, 10), (700, 0)])
+            >>> len(grid), grid.axes.shape
+            (6, (2, 3))
+
+        """
+        self.nrows, self.ncols = int(nrows), int(ncols)
+        if self.nrows < 1 or self.ncols < 1:
+            msg = "Expected at least one row and column, got {} by {}."
+            raise ValueError(msg.format(nrows, ncols))
+        self.share = share
+        first = TephiAxes((self.nrows, self.ncols, 1), figure=figure, **kwargs)
+        self.figure = first.figure
+        # The isotherm and dry adiabat locators are those of the shared
+        # grid finder.
+        kwargs.pop("isotherm_locator", None)
+        kwargs.pop("dry_adiabat_locator", None)
+        kwargs["grid_finder"] = first.get_grid_helper().grid_finder
+        if share:
+            kwargs.update(sharex=first, sharey=first)
+        axes = [first]
+        for index in range(2, self.nrows * self.ncols + 1):
+            item = TephiAxes(
+                (self.nrows, self.ncols, index), figure=self.figure, **kwargs
+            )
+            if share:
+                # Center the shared view around the profiles of every axes.
+                item.tephi["bbox"] = first.tephi["bbox"]
+            axes.append(item)
+        self.axes = np.empty(len(axes), dtype=object)
+        self.axes[:] = axes
+        self.axes = self.axes.reshape(self.nrows, self.ncols)
+
+    def __len__(self):
+        return self.axes.size
+
+    def __iter__(self):
+        return iter(self.axes.flat)
+
+    def __getitem__(self, index):
+        return self.axes[index]
+
+    def _add(self, name, attribute, kwargs):
+        """Add the isopleths to each axes, sharing those of the first."""
+        first = None
+        for axes in self:
+            getattr(axes, "add_{}".format(name))(**kwargs)
+            artist = getattr(axes, attribute)
+            if first is None:
+                first = artist
+            else:
+                artist.share(first)
+
+    def add_isobars(self, **kwargs):
+        """
+        Add isobars to each tephigram, see
+        :meth:`~tephi.TephiAxes.add_isobars`.
+
+        """
+        self._add("isobars", "isobar", kwargs)
+
+    def add_wet_adiabats(self, **kwargs):
+        """
+        Add wet adiabats to each tephigram, see
+        :meth:`~tephi.TephiAxes.add_wet_adiabats`.
+
+        """
+        self._add("wet_adiabats", "wet_adiabat", kwargs)
+
+    def add_mixing_ratios(self, **kwargs):
+        """
+        Add humidity mixing ratios to each tephigram, see
+        :meth:`~tephi.TephiAxes.add_mixing_ratios`.
+
+        """
+        self._add("mixing_ratios", "mixing_ratio", kwargs)
+
+    def reset(self):
+        """Reset each tephigram, see :meth:`~tephi.TephiAxes.reset`."""
+        for axes in self:
+            axes.reset()
@@ -0,0 +1,248 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Curvilinear grid support specialised to the tephigram.
+
+The isotherms and dry adiabats are straight lines in the native tephigram
+coordinates, with temperature and the logarithm of potential temperature
+each linear in x and y. So the range of temperature and potential
+temperature over a view is found exactly from the corners of the view,
+rather than by sampling the inverse transform, and all of the gridlines are
+transformed together. The grid information, tick locations and tick labels
+are cached, so that redrawing an unchanged view does no grid work.
+
+The grid finder overrides the private ``_format_ticks`` and
+``_get_raw_grid_lines`` methods of the matplotlib grid finder, and the
+extreme finder replaces the private ``_find_transformed_bbox`` method of
+:class:`mpl_toolkits.axisartist.grid_finder.ExtremeFinderSimple`. They are
+written against the matplotlib versions pinned by the package.
+
+"""
+
+from matplotlib import ticker as mticker
+from matplotlib.transforms import Bbox
+from mpl_toolkits.axisartist.grid_finder import GridFinder as _GridFinder
+from mpl_toolkits.axisartist.grid_helper_curvelinear import (
+    GridHelperCurveLinear,
+)
+import numpy as np
+
+from tephi.transforms import TephiTransform, convert_Tt2xy
+
+# The number of views for which the grid information is cached.
+_CACHE_SIZE = 8
+
+# The number of points of each gridline.
+_GRIDLINE_POINTS = 100
+
+
+class ExtremeFinder(object):
+    def __init__(self, padding=0.1):
+        """
+        Find the exact range of temperature and potential temperature over
+        a view of the tephigram.
+
+        Kwargs:
+
+        * padding:
+            The fraction by which the range is expanded. Defaults to the
+            padding of the sampled extremes of
+            :class:`mpl_toolkits.axisartist.grid_finder.ExtremeFinderSimple`,
+            which the gridlines are then located within.
+
+        """
+        self.padding = padding
+
+    def __call__(self, transform_xy, x1, y1, x2, y2):
+        x, y = transform_xy([x1, x1, x2, x2], [y1, y2, y1, y2])
+        bbox = Bbox.from_extents(np.min(x), np.min(y), np.max(x), np.max(y))
+        bbox = bbox.expanded(1 + self.padding, 1 + self.padding)
+        return bbox.x0, bbox.x1, bbox.y0, bbox.y1
+
+    def _find_transformed_bbox(self, trans, bbox):
+        """
+        The bbox of temperature and potential temperature over the view,
+        which are extreme at its corners.
+
+        """
+        corners = trans.transform(bbox.corners())
+        bbox = Bbox.from_extents(*corners.min(axis=0), *corners.max(axis=0))
+        return bbox.expanded(1 + self.padding, 1 + self.padding)
+
+
+class _CachedLocator(object):
+    """Memoise the tick locations of a grid locator for each range."""
+
+    def __init__(self, locator):
+        self.locator = locator
+        self._cache = {}
+
+    def __call__(self, v1, v2):
+        key = (float(v1), float(v2))
+        result = self._cache.get(key)
+        if result is None:
+            if len(self._cache) >= _CACHE_SIZE:
+                self._cache.clear()
+            result = self.locator(v1, v2)
+            self._cache[key] = result
+        return result
+
+
+class GridFinder(_GridFinder):
+    def __init__(
+        self,
+        transform=None,
+        extreme_finder=None,
+        grid_locator1=None,
+        grid_locator2=None,
+        tick_formatter1=None,
+        tick_formatter2=None,
+    ):
+        """
+        Create a grid finder of the isotherms and dry adiabats.
+
+        Kwargs:
+
+        * transform:
+            The transform from temperature and potential temperature to
+            native tephigram coordinates. Defaults to
+            :class:`tephi.transforms.TephiTransform`.
+
+        * extreme_finder:
+            Defaults to the exact :class:`ExtremeFinder`.
+
+        * grid_locator1, grid_locator2:
+            The isotherm and dry adiabat locators.
+
+        * tick_formatter1, tick_formatter2:
+            The isotherm and dry adiabat tick formatters.
+
+        """
+        if transform is None:
+            transform = TephiTransform()
+        if extreme_finder is None:
+            extreme_finder = ExtremeFinder()
+        super(GridFinder, self).__init__(
+            transform,
+            extreme_finder=extreme_finder,
+            grid_locator1=grid_locator1,
+            grid_locator2=grid_locator2,
+            tick_formatter1=tick_formatter1,
+            tick_formatter2=tick_formatter2,
+        )
+        self._grid_info = {}
+        self._labels = {}
+
+    def __setattr__(self, name, value):
+        # Memoise the locators, and drop the caches of the grid information
+        # whenever any part of the grid finder changes.
+        if name in ("grid_locator1", "grid_locator2"):
+            if not isinstance(value, _CachedLocator):
+                value = _CachedLocator(value)
+        super(GridFinder, self).__setattr__(name, value)
+        if not name.startswith("_") or name == "_aux_transform":
+            self.__dict__["_grid_info"] = {}
+            self.__dict__["_labels"] = {}
+
+    def _format_ticks(self, idx, direction, factor, levels):
+        """
+        Format the tick labels, which are memoised for each value, for the
+        tephigram formatters.
+
+        """
+        formatter = self.tick_formatter1 if idx == 1 else self.tick_formatter2
+        if isinstance(formatter, mticker.Formatter):
+            # The labels of a matplotlib formatter depend on all the ticks.
+            return super(GridFinder, self)._format_ticks(
+                idx, direction, factor, levels
+            )
+        labels = []
+        for level in levels:
+            key = (idx, direction, float(factor), float(level))
+            label = self._labels.get(key)
+            if label is None:
+                (label,) = formatter(direction, factor, [level])
+                self._labels[key] = label
+            labels.append(label)
+        return labels
+
+    def get_grid_info(self, bbox):
+        """
+        Compute positioning information for grid lines and ticks, given the
+        axes' data *bbox*, which is cached for each view.
+
+        """
+        key = tuple(bbox.extents)
+        grid_info = self._grid_info.get(key)
+        if grid_info is None:
+            if len(self._grid_info) >= _CACHE_SIZE:
+                self._grid_info.clear()
+            grid_info = super(GridFinder, self).get_grid_info(bbox)
+            self._grid_info[key] = grid_info
+        return grid_info
+
+    def _get_raw_grid_lines(self, lon_values, lat_values, bbox):
+        """
+        The isotherm and dry adiabat gridlines over the range of the view,
+        transformed together in closed form.
+
+        """
+        if not isinstance(self.get_transform(), TephiTransform):
+            return super(GridFinder, self)._get_raw_grid_lines(
+                lon_values, lat_values, bbox
+            )
+        # Sample the gridlines as matplotlib does, which the rendering of
+        # the reference images depends on.
+        lons = np.linspace(bbox.x0, bbox.x1, _GRIDLINE_POINTS)
+        lats = np.linspace(bbox.y0, bbox.y1, _GRIDLINE_POINTS)
+        lon_x, lon_y = convert_Tt2xy(
+            np.asarray(lon_values, dtype=float)[:, np.newaxis], lats
+        )
+        lat_x, lat_y = convert_Tt2xy(
+            lons, np.asarray(lat_values, dtype=float)[:, np.newaxis]
+        )
+        lon_lines = list(np.stack([lon_x, lon_y], axis=-1))
+        lat_lines = list(np.stack([lat_x, lat_y], axis=-1))
+        return lon_lines, lat_lines
+
+
+class GridHelper(GridHelperCurveLinear):
+    def __init__(
+        self,
+        transform=None,
+        extreme_finder=None,
+        grid_locator1=None,
+        grid_locator2=None,
+        tick_formatter1=None,
+        tick_formatter2=None,
+        grid_finder=None,
+    ):
+        """
+        Create a curvilinear grid helper of the isotherms and dry
+        adiabats, using the tephigram :class:`GridFinder`.
+
+        The keyword arguments are those of :class:`GridFinder`, except for:
+
+        * grid_finder:
+            A :class:`GridFinder` to use, rather than creating one, such as
+            to share its transform and caches between the grid helpers of
+            many tephigrams.
+
+        """
+        if grid_finder is not None:
+            transform = grid_finder.get_transform()
+        elif transform is None:
+            transform = TephiTransform()
+        super(GridHelper, self).__init__(transform)
+        if grid_finder is None:
+            grid_finder = GridFinder(
+                transform,
+                extreme_finder=extreme_finder,
+                grid_locator1=grid_locator1,
+                grid_locator2=grid_locator2,
+                tick_formatter1=tick_formatter1,
+                tick_formatter2=tick_formatter2,
+            )
+        self.grid_finder = grid_finder
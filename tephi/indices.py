@@ -0,0 +1,148 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Batched stability indices for archives of soundings.
+
+The soundings are described as for :mod:`tephi.parcel`, by two-dimensional
+arrays of pressure, temperature and dew-point of shape (N, L), with the
+levels of each sounding ordered from the surface upwards and padded at the
+top with NaN. Each index is returned as a column of N values, which is NaN
+for soundings that do not span the mandatory levels the index requires.
+
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+import tephi.constants as constants
+import tephi.parcel as parcel
+from tephi.resample import resample
+import tephi.thermo as thermo
+
+#: The mandatory pressure levels, in mb or hPa, used by the indices.
+LEVELS = (850.0, 700.0, 500.0)
+
+INDICES = namedtuple(
+    "INDICES",
+    "k_index total_totals showalter lifted_index precipitable_water",
+)
+
+#: The display name and units of each index.
+NAMES = INDICES(
+    ("K-index", "degC"),
+    ("Total totals", "degC"),
+    ("Showalter", "degC"),
+    ("Lifted index", "degC"),
+    ("Precipitable water", "mm"),
+)
+
+
+def calculate(pressure, temperature, dewpoint):
+    """
+    Calculate the stability indices of each sounding.
+
+    The indices are:
+
+    * the K-index, T850 - T500 + Td850 - (T700 - Td700),
+    * the total totals, T850 + Td850 - 2 T500,
+    * the Showalter index, the temperature at 500 mb less that of the
+      parcel lifted from 850 mb,
+    * the lifted index, the temperature at 500 mb less that of the parcel
+      with the mean properties of the lowest 100 mb, and
+    * the precipitable water of the whole sounding.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, with shape (N, L) or (L,).
+
+    * temperature:
+        Temperature, in degC, with the same shape as the pressure.
+
+    * dewpoint:
+        Dew-point temperature, in degC, with the same shape as the pressure.
+
+    Returns:
+        An :data:`INDICES` namedtuple of arrays with shape (N,), or scalars
+        for a single sounding.
+
+    For example:
+
+        >>> from tephi import indices
+        >>> pressure = [1000, 850, 700, 500, 300]
+        >>> temperature = [30, 20, 8, -10, -40]
+        >>> dewpoint = [22, 14, 0, -20, -50]
+        >>> result = indices.calculate(pressure, temperature, dewpoint)
+        >>> print(f"{result.k_index:.1f} {result.total_totals:.1f}")
+        36.0 54.0
+
+    """
+    (pressure, temperature, dewpoint), single = parcel.as_soundings(
+        pressure, temperature, dewpoint
+    )
+    values = resample(
+        pressure, np.stack([temperature, dewpoint], axis=-1), LEVELS
+    )
+    (t850, td850), (t700, td700), (t500, _) = np.moveaxis(values, 0, -1)
+
+    k_index = t850 - t500 + td850 - (t700 - td700)
+    total_totals = t850 + td850 - 2 * t500
+
+    # Lift the 850 mb and mixed-layer parcels to 500 mb only.
+    level = np.full((pressure.shape[0], 1), LEVELS[-1])
+    lifted = parcel.lift(level, np.full_like(t850, LEVELS[0]), t850, td850)
+    showalter = t500 - lifted[:, 0]
+    start = parcel.mixed_layer_start(
+        pressure, temperature, dewpoint, depth=100.0
+    )
+    lifted = parcel.lift(level, *start)
+    lifted_index = t500 - lifted[:, 0]
+
+    precipitable_water = _precipitable_water(pressure, dewpoint)
+
+    result = INDICES(
+        k_index, total_totals, showalter, lifted_index, precipitable_water
+    )
+    if single:
+        result = INDICES(*[column[0] for column in result])
+    return result
+
+
+def _precipitable_water(pressure, dewpoint):
+    """Precipitable water, in mm, of two-dimensional soundings."""
+    # Mixing ratio in kg kg-1 and pressure in Pa.
+    ratio = thermo.mixing_ratio(pressure, dewpoint) / 1000.0
+    layer = (ratio[:, :-1] + ratio[:, 1:]) / 2
+    depth = (pressure[:, :-1] - pressure[:, 1:]) * 100.0
+    terms = layer * depth
+    result = np.nansum(terms, axis=1) / constants.G
+    # Soundings without any humidity have no precipitable water.
+    result[~np.isfinite(terms).any(axis=1)] = np.nan
+    return result
+
+
+def precipitable_water(pressure, dewpoint):
+    """
+    Calculate the precipitable water of each sounding.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, with shape (N, L) or (L,).
+
+    * dewpoint:
+        Dew-point temperature, in degC, with the same shape as the pressure.
+
+    Returns:
+        Precipitable water, in mm, with shape (N,), or a scalar for a single
+        sounding.
+
+    """
+    (pressure, dewpoint), single = parcel.as_soundings(pressure, dewpoint)
+    result = _precipitable_water(pressure, dewpoint)
+    if single:
+        result = result[0]
+    return result
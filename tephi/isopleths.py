@@ -12,20 +12,24 @@ from __future__ import absolute_import, division, print_function
 
 from abc import ABCMeta, abstractmethod
 from collections import namedtuple
+import copy
 import math
+import weakref
 import matplotlib.artist
+from itertools import cycle, islice
 from matplotlib.text import Text
-from matplotlib.collections import PathCollection
+from matplotlib.collections import LineCollection, PathCollection
+from matplotlib.lines import Line2D
 from matplotlib.path import Path
-import matplotlib.pyplot as plt
 import matplotlib.transforms as mtrans
 from mpl_toolkits.axisartist import Subplot
 import numpy as np
 from shapely.geometry import LineString
 from scipy.interpolate import interp1d
 
-import tephi.constants as constants
 from tephi.constants import default
+import tephi.resample as resample
+import tephi.thermo as thermo
 import tephi.transforms as transforms
 
 
@@ -153,9 +157,8 @@ class BarbArtist(matplotlib.artist.Artist):
             barb = self.axes.barbs(
                 temperature, theta, u, v, transform=transform, **self._kwargs
             )
-            collections = list(self.axes.collections).remove(barb)
-            if collections:
-                self.axes.collections = tuple(collections)
+            # The barb is drawn by this artist, rather than by the axes.
+            barb.remove()
         return barb
 
     @matplotlib.artist.allow_rasterization
@@ -171,7 +174,13 @@ class BarbArtist(matplotlib.artist.Artist):
         pressure, _ = transforms.convert_Tt2pT(temperature, theta)
         min_pressure, max_pressure = np.min(pressure), np.max(pressure)
         func = interp1d(pressure, temperature)
-        for i, (speed, angle, pressure, barb) in enumerate(self.barbs):
+        index = np.arange(self.barbs.size)
+        if axes.tephi["drafting"]:
+            # Draw a reduced set of barbs while drafting.
+            step = -(-index.size // default.get("draft_barbs"))
+            index = index[::step]
+        for i in index:
+            speed, angle, pressure, barb = self.barbs[i]
             if min_pressure < pressure < max_pressure:
                 temperature, theta = transforms.convert_pT2Tt(
                     pressure, func(pressure)
@@ -198,6 +207,7 @@ class Isopleth(object):
         )
         self.line = None
         self.label = None
+        self._draft = None
         self._kwargs = dict(line={}, text={})
         Tmin, Tmax = (
             np.argmin(self.points.temperature),
@@ -226,22 +236,66 @@ class Isopleth(object):
     def _generate_points(self):
         pass
 
-    def draw(self, renderer, **kwargs):
+    def copy(self, axes):
+        """
+        Copy the isopleth onto the axes, sharing its points and geometry
+        rather than generating them again.
+
+        Args:
+
+        * axes:
+            The tephigram axes of the copy.
+
+        Returns:
+            The copy of the isopleth, which is yet to be drawn.
+
+        """
+        result = copy.copy(self)
+        result.axes = axes
+        result._transform = axes.tephi["transform"]
+        result.line = None
+        result.label = None
+        result._draft = None
+        result._kwargs = {
+            key: dict(value) for key, value in self._kwargs.items()
+        }
+        return result
+
+    def draw(self, renderer, draft=False, **kwargs):
         if self.line is None:
             if "zorder" not in kwargs:
                 kwargs["zorder"] = default.get("isopleth_zorder")
             draw_kwargs = dict(self._kwargs["line"])
             draw_kwargs.update(kwargs)
-            self.line = plt.Line2D(
+            self.line = Line2D(
                 self.points.temperature,
                 self.points.theta,
                 transform=self._transform,
                 **draw_kwargs,
             )
             self.line.set_clip_box(self.axes.bbox)
-        self.line.draw(renderer)
+        if draft:
+            self._draw_draft(renderer)
+        else:
+            self.line.draw(renderer)
         return self.line
 
+    def _draw_draft(self, renderer):
+        """Draw the line through every few points of the isopleth."""
+        if self._draft is None:
+            size = len(self.points.temperature)
+            index = np.append(
+                np.arange(0, size - 1, default.get("draft_step")), size - 1
+            )
+            self._draft = Line2D(
+                np.asarray(self.points.temperature)[index],
+                np.asarray(self.points.theta)[index],
+            )
+            self._draft.update_from(self.line)
+            self._draft.set_transform(self._transform)
+            self._draft.set_clip_box(self.axes.bbox)
+        self._draft.draw(renderer)
+
     def plot(self, **kwargs):
         """
         Plot the points of the isopleth.
@@ -255,7 +309,7 @@ class Isopleth(object):
         """
         if self.line is not None:
             if self.line in self.axes.lines:
-                self.axes.lines.remove(self.line)
+                self.line.remove()
         if "zorder" not in kwargs:
             kwargs["zorder"] = default.get("isopleth_zorder")
         if "picker" not in kwargs:
@@ -340,8 +394,8 @@ class Isobar(Isopleth):
         self.bounds = BOUNDS(min_theta, max_theta)
         self._steps = _ISOBAR_STEPS
         super(Isobar, self).__init__(axes)
-        self._kwargs["line"] = default.get("isobar_line")
-        self._kwargs["text"] = default.get("isobar_text")
+        self._kwargs["line"] = dict(default.get("isobar_line"))
+        self._kwargs["text"] = dict(default.get("isobar_text"))
 
     def _generate_points(self):
         pressure = np.asarray([self.data] * self._steps)
@@ -367,7 +421,7 @@ class Isotherm(Isopleth):
 
 
 class Profile(Isopleth):
-    def __init__(self, axes, data):
+    def __init__(self, axes, data, metadata=None):
         """
         Create a profile from the sequence of pressure and temperature points.
 
@@ -380,15 +434,30 @@ class Profile(Isopleth):
             Sequence of pressure and temperature points defining
             the profile.
 
+        Kwargs:
+
+        * metadata:
+            Mapping of hashable metadata, such as the station, valid time
+            or ensemble member, by which the profile may be selected from a
+            :class:`ProfileList`.
+
         """
         self.data = np.asarray(list(data))
         super(Profile, self).__init__(axes)
+        self.metadata = dict(metadata or {})
         self._barbs = None
         self._highlight = None
+        self._interpolator = None
+        self._registries = []
 
     def has_highlight(self):
         return self._highlight is not None
 
+    def plot(self, **kwargs):
+        line = super(Profile, self).plot(**kwargs)
+        _notify(self)
+        return line
+
     def highlight(self, state=None):
         if state is None:
             state = not self.has_highlight()
@@ -411,8 +480,9 @@ class Profile(Isopleth):
                 )
         else:
             if self._highlight is not None:
-                self.axes.lines.remove(self._highlight)
+                self._highlight.remove()
                 self._highlight = None
+        _notify(self)
 
     def _generate_points(self):
         if self.data.ndim != 2 or self.data.shape[-1] != 2:
@@ -427,6 +497,44 @@ class Profile(Isopleth):
         _, theta = transforms.convert_pT2Tt(pressure, temperature)
         return POINTS(temperature, theta, pressure)
 
+    def resample(self, levels):
+        """
+        Interpolate the temperature of the profile onto the pressure levels,
+        linearly in log-pressure.
+
+        Args:
+
+        * levels:
+            The pressure levels, in mb or hPa.
+
+        Returns:
+            Array of the temperatures at the levels, which are NaN outside
+            the pressure range of the profile.
+
+        """
+        return resample.resample(self.data[:, 0], self.data[:, 1], levels)[0]
+
+    def temperature_at(self, pressure):
+        """
+        Interpolate the temperature of the profile at the pressure, linearly
+        in log-pressure, with an interpolator prepared on first use.
+
+        Args:
+
+        * pressure:
+            The pressure, in mb or hPa.
+
+        Returns:
+            The temperature, which is NaN outside the pressure range of the
+            profile.
+
+        """
+        if self._interpolator is None:
+            self._interpolator = resample.Interpolator(
+                self.data[:, 0], self.data[:, 1]
+            )
+        return self._interpolator(pressure)
+
     def barbs(self, barbs, **kwargs):
         """
         Plot the sequence of barbs associated with this profile.
@@ -455,6 +563,192 @@ class Profile(Isopleth):
         return self._barbs.barbs
 
 
+class ProfileGroup(object):
+    def __init__(self, axes, data, metadata=None):
+        """
+        Create a group of profiles, which are transformed together and drawn
+        as a single :class:`matplotlib.collections.LineCollection`.
+
+        Args:
+
+        * axes:
+            The tephigram axes on which to plot the profiles.
+
+        * data:
+            Array with shape (N, L, 2), or a sequence of N sequences of
+            pressure and temperature points, of differing lengths, defining
+            each profile.
+
+        Kwargs:
+
+        * metadata:
+            Mapping of hashable metadata by which the group may be selected
+            from a :class:`ProfileList`.
+
+        """
+        self.axes = axes
+        self._transform = axes.tephi["transform"]
+        self.data = resample.stack(list(data))
+        if self.data.ndim != 3 or self.data.shape[-1] != 2:
+            msg = (
+                "The profile group data requires to be a sequence of "
+                "profiles of pressure, temperature value pairs."
+            )
+            raise ValueError(msg)
+        pressure = self.data[..., 0]
+        temperature = self.data[..., 1]
+        _, theta = transforms.convert_pT2Tt(pressure, temperature)
+        self.points = POINTS(temperature, theta, pressure)
+        self.metadata = dict(metadata or {})
+        self.line = None
+        self._highlight = None
+        self._highlighted = np.zeros(len(self), dtype=bool)
+        self._interpolators = {}
+        self._registries = []
+
+    def __len__(self):
+        return self.data.shape[0]
+
+    def _segments(self, index=None):
+        """The valid temperature and theta points of each profile."""
+        if index is None:
+            index = np.arange(len(self))
+        segments = []
+        for temperature, theta in zip(
+            self.points.temperature[index], self.points.theta[index]
+        ):
+            valid = np.isfinite(temperature) & np.isfinite(theta)
+            segments.append(np.column_stack([temperature, theta])[valid])
+        return segments
+
+    def plot(self, **kwargs):
+        """
+        Plot the profiles of the group as one line collection.
+
+        By default, each profile is coloured in turn from the axes property
+        cycle. Pass a sequence of colours as ``colors``, or an array of
+        values as ``array`` together with a ``cmap``, to colour each
+        profile explicitly.
+
+        Kwargs:
+            See :class:`matplotlib.collections.LineCollection`.
+
+        Returns:
+            The :class:`matplotlib.collections.LineCollection`.
+
+        """
+        if self.line is not None:
+            self.line.remove()
+        colors = ["color", "colors", "edgecolor", "edgecolors", "array"]
+        if not set(colors).intersection(kwargs):
+            prop_cycle = matplotlib.rcParams["axes.prop_cycle"].by_key()
+            kwargs["colors"] = list(
+                islice(cycle(prop_cycle.get("color", ["k"])), len(self))
+            )
+        if "zorder" not in kwargs:
+            kwargs["zorder"] = default.get("isopleth_zorder")
+        if "picker" not in kwargs:
+            kwargs["picker"] = default.get("isopleth_picker")
+        self.line = LineCollection(
+            self._segments(), transform=self._transform, **kwargs
+        )
+        self.axes.add_collection(self.line, autolim=False)
+        _notify(self)
+        return self.line
+
+    def has_highlight(self):
+        return bool(self._highlighted.any())
+
+    def highlighted(self):
+        """The indices of the highlighted profiles of the group."""
+        return np.flatnonzero(self._highlighted)
+
+    def highlight(self, state=None, index=None):
+        """
+        Highlight profiles of the group.
+
+        Kwargs:
+
+        * state:
+            Whether to highlight the profiles. Defaults to toggling the
+            highlight of each profile.
+
+        * index:
+            The index, or indices, of the profiles, such as the ``ind`` of a
+            pick event on the line collection. Defaults to all profiles.
+
+        """
+        if index is None:
+            index = slice(None)
+        if state is None:
+            self._highlighted[index] = ~self._highlighted[index]
+        else:
+            self._highlighted[index] = state
+        if self._highlight is not None:
+            self._highlight.remove()
+            self._highlight = None
+        if self.has_highlight():
+            linewidth = np.max(self.line.get_linewidth()) * 7
+            zorder = default.get("isopleth_zorder", 10) - 1
+            self._highlight = LineCollection(
+                self._segments(self.highlighted()),
+                linewidth=linewidth,
+                color="grey",
+                alpha=0.3,
+                transform=self._transform,
+                zorder=zorder,
+            )
+            self.axes.add_collection(self._highlight, autolim=False)
+        _notify(self)
+
+    def resample(self, levels):
+        """
+        Interpolate the temperature of each profile of the group onto the
+        pressure levels, linearly in log-pressure.
+
+        Args:
+
+        * levels:
+            The M pressure levels, in mb or hPa.
+
+        Returns:
+            Array of the temperatures with shape (N, M), which are NaN
+            outside the pressure range of each profile.
+
+        """
+        return resample.resample(
+            self.points.pressure, self.points.temperature, levels
+        )
+
+    def temperature_at(self, pressure, index):
+        """
+        Interpolate the temperature of one profile of the group at the
+        pressure, linearly in log-pressure, with an interpolator prepared on
+        first use.
+
+        Args:
+
+        * pressure:
+            The pressure, in mb or hPa.
+
+        * index:
+            The index of the profile, such as the ``member`` of a
+            :data:`tephi.spatial.NEAREST` point.
+
+        Returns:
+            The temperature, which is NaN outside the pressure range of the
+            profile.
+
+        """
+        interpolator = self._interpolators.get(index)
+        if interpolator is None:
+            interpolator = resample.Interpolator(
+                self.points.pressure[index], self.points.temperature[index]
+            )
+            self._interpolators[index] = interpolator
+        return interpolator(pressure)
+
+
 class WetAdiabat(Isopleth):
     def __init__(self, axes, theta_e, min_temperature, max_pressure):
         self.data = theta_e
@@ -465,19 +759,7 @@ class WetAdiabat(Isopleth):
     def _gradient(self, pressure, temperature, dp):
         stop = False
 
-        kelvin = temperature + constants.KELVIN
-        lsbc = (constants.L / constants.Rv) * (
-            (1.0 / constants.KELVIN) - (1.0 / kelvin)
-        )
-        rw = 6.11 * np.exp(lsbc) * (constants.E / pressure)
-        lrwbt = (constants.L * rw) / (constants.Rd * kelvin)
-        numerator = ((constants.Rd * kelvin) / (constants.Cp * pressure)) * (
-            1.0 + lrwbt
-        )
-        denominator = 1.0 + (
-            lrwbt * ((constants.E * constants.L) / (constants.Cp * kelvin))
-        )
-        grad = numerator / denominator
+        grad = thermo.saturated_lapse_rate(pressure, temperature)
         dt = dp * grad
 
         if (temperature + dt) < self.bounds.lower:
@@ -502,24 +784,285 @@ class WetAdiabat(Isopleth):
         return POINTS(temperature, theta, pressure)
 
 
+def _notify(profile):
+    """Update the artist and highlight indices of each list of the profile."""
+    registries = []
+    for reference in profile._registries:
+        registry = reference()
+        if registry is not None:
+            registry._update_artist(profile)
+            registry._update_highlight(profile)
+            registries.append(reference)
+    profile._registries = registries
+
+
 class ProfileList(list):
-    def __new__(cls, profiles=None):
-        profile_list = list.__new__(cls, profiles)
-        if not all(isinstance(profile, Profile) for profile in profile_list):
-            msg = "All items in the list must be a Profile instance."
+    def __init__(self, profiles=None, index=None):
+        """
+        A list of :class:`Profile` and :class:`ProfileGroup` instances, which
+        is indexed by the line artist and by the metadata of each profile,
+        and by which profiles are highlighted.
+
+        Kwargs:
+
+        * profiles:
+            Sequence of the profiles of the list.
+
+        * index:
+            A :class:`~tephi.spatial.ProfileIndex`, which is kept up to date
+            with the profiles of the list.
+
+        """
+        profiles = [] if profiles is None else list(profiles)
+        self._check(profiles)
+        self.index = index
+        super(ProfileList, self).__init__(profiles)
+        self._reindex()
+
+    @staticmethod
+    def _check(profiles):
+        if not all(
+            isinstance(profile, (Profile, ProfileGroup))
+            for profile in profiles
+        ):
+            msg = (
+                "All items in the list must be a Profile or ProfileGroup "
+                "instance."
+            )
             raise TypeError(msg)
-        return profile_list
+
+    def _reindex(self):
+        self._artists = {}
+        self._by_artist = {}
+        self._by_metadata = {}
+        self._highlighted = {}
+        for profile in self:
+            self._register(profile)
+
+    def _register(self, profile):
+        if not any(ref() is self for ref in profile._registries):
+            profile._registries.append(weakref.ref(self))
+        self._update_artist(profile)
+        for item in profile.metadata.items():
+            self._by_metadata.setdefault(item, {})[id(profile)] = profile
+        self._update_highlight(profile)
+        if self.index is not None:
+            self.index.add(profile)
+
+    def _unregister(self, profile):
+        if any(item is profile for item in self):
+            return
+        profile._registries = [
+            ref for ref in profile._registries if ref() is not self
+        ]
+        artist = self._artists.pop(id(profile), None)
+        self._by_artist.pop(artist, None)
+        for item in profile.metadata.items():
+            self._by_metadata.get(item, {}).pop(id(profile), None)
+        self._highlighted.pop(id(profile), None)
+        if self.index is not None:
+            self.index.remove(profile)
+
+    def _update_artist(self, profile):
+        # Index the line of the profile in place of any line it replaced.
+        self._by_artist.pop(self._artists.pop(id(profile), None), None)
+        if profile.line is not None:
+            self._artists[id(profile)] = id(profile.line)
+            self._by_artist[id(profile.line)] = profile
+
+    def _update_highlight(self, profile):
+        if profile.has_highlight():
+            self._highlighted[id(profile)] = profile
+        else:
+            self._highlighted.pop(id(profile), None)
+
+    def append(self, profile):
+        self._check([profile])
+        super(ProfileList, self).append(profile)
+        self._register(profile)
+
+    def extend(self, profiles):
+        profiles = list(profiles)
+        self._check(profiles)
+        super(ProfileList, self).extend(profiles)
+        for profile in profiles:
+            self._register(profile)
+
+    def __iadd__(self, profiles):
+        self.extend(profiles)
+        return self
+
+    def insert(self, index, profile):
+        self._check([profile])
+        super(ProfileList, self).insert(index, profile)
+        self._register(profile)
+
+    def remove(self, profile):
+        super(ProfileList, self).remove(profile)
+        self._unregister(profile)
+
+    def pop(self, index=-1):
+        profile = super(ProfileList, self).pop(index)
+        self._unregister(profile)
+        return profile
+
+    def clear(self):
+        profiles = list(self)
+        super(ProfileList, self).clear()
+        for profile in profiles:
+            self._unregister(profile)
+
+    def __setitem__(self, index, value):
+        values = list(value) if isinstance(index, slice) else [value]
+        self._check(values)
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super(ProfileList, self).__setitem__(index, value)
+        for profile in removed:
+            self._unregister(profile)
+        for profile in values:
+            self._register(profile)
+
+    def __delitem__(self, index):
+        removed = self[index] if isinstance(index, slice) else [self[index]]
+        super(ProfileList, self).__delitem__(index)
+        for profile in removed:
+            self._unregister(profile)
 
     def highlighted(self):
-        profiles = [profile for profile in self if profile.has_highlight()]
-        return profiles
+        """The highlighted profiles, in the order of the list."""
+        if not self._highlighted:
+            return []
+        highlighted = self._highlighted
+        return [profile for profile in self if id(profile) in highlighted]
+
+    def profile_for(self, artist):
+        """
+        The profile of the list drawn by the artist, or None if there is no
+        such profile.
+
+        """
+        profile = self._by_artist.get(id(artist))
+        if profile is None or profile.line is not artist:
+            return None
+        return profile
 
     def picker(self, artist):
-        result = None
-        for profile in self:
-            if profile.line == artist:
-                result = profile
-                break
+        result = self.profile_for(artist)
+        if result is None:
+            # The line of the profile may have been replaced directly.
+            self._reindex()
+            result = self.profile_for(artist)
         if result is None:
             raise ValueError("Picker cannot find the profile.")
         return result
+
+    def select(self, **metadata):
+        """
+        Select the profiles with all of the metadata values.
+
+        Kwargs:
+
+        * metadata:
+            The metadata values of the profiles to select, such as
+            ``station="03808"``.
+
+        Returns:
+            A :class:`ProfileList` of the selected profiles, in order.
+
+        """
+        return ProfileList(self._select(**metadata))
+
+    def _select(self, **metadata):
+        if not metadata:
+            return list(self)
+        matches = sorted(
+            (self._by_metadata.get(item, {}) for item in metadata.items()),
+            key=len,
+        )
+        selected = {
+            key
+            for key in matches[0]
+            if all(key in match for match in matches[1:])
+        }
+        if not selected:
+            return []
+        # The metadata index is unordered, so take the order of the list.
+        return [profile for profile in self if id(profile) in selected]
+
+    def set_visible(self, visible, **metadata):
+        """
+        Show or hide the profiles with all of the metadata values, together
+        with their highlights and barbs.
+
+        Args:
+
+        * visible:
+            Whether the profiles are visible.
+
+        Kwargs:
+
+        * metadata:
+            The metadata values of the profiles. Defaults to all profiles.
+
+        """
+        for profile in self._select(**metadata):
+            for artist in (
+                profile.line,
+                profile._highlight,
+                getattr(profile, "_barbs", None),
+            ):
+                if artist is not None:
+                    artist.set_visible(visible)
+
+    def show(self, **metadata):
+        """Show the profiles with all of the metadata values."""
+        self.set_visible(True, **metadata)
+
+    def hide(self, **metadata):
+        """Hide the profiles with all of the metadata values."""
+        self.set_visible(False, **metadata)
+
+    def highlight(self, state=None, **metadata):
+        """
+        Highlight the profiles with all of the metadata values.
+
+        Kwargs:
+
+        * state:
+            Whether to highlight the profiles. Defaults to toggling the
+            highlight of each profile.
+
+        * metadata:
+            The metadata values of the profiles. Defaults to all profiles.
+
+        """
+        for profile in self._select(**metadata):
+            profile.highlight(state)
+
+    def resample(self, levels):
+        """
+        Interpolate the temperature of every profile onto the pressure levels
+        at once, linearly in log-pressure.
+
+        Args:
+
+        * levels:
+            The M pressure levels, in mb or hPa.
+
+        Returns:
+            Array of the temperatures with shape (N, M), for the N profiles
+            of the list, including each profile of a
+            :class:`ProfileGroup`, which are NaN outside the pressure range
+            of each profile.
+
+        """
+        data = []
+        for profile in self:
+            if isinstance(profile, ProfileGroup):
+                data.extend(profile.data)
+            else:
+                data.append(profile.data)
+        data = resample.stack(data)
+        if data.size == 0:
+            return np.empty((len(self), np.size(levels)))
+        return resample.resample(data[..., 0], data[..., 1], levels)
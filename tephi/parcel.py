@@ -0,0 +1,484 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Vectorised parcel ascent and convective diagnostics for batches of soundings.
+
+A batch of soundings is described by two-dimensional arrays of pressure,
+temperature and dew-point of shape (N, L), holding N soundings of up to L
+levels each. The levels of each sounding must be ordered from the surface
+upwards, i.e. with decreasing pressure, and soundings with fewer levels are
+padded at the top with NaN. A single sounding may be passed as
+one-dimensional arrays of shape (L,).
+
+All calculations are performed with NumPy over the whole batch at once, using
+the same constants and saturated adiabatic lapse rate as the
+:class:`~tephi.isopleths.WetAdiabat` isopleths drawn on the tephigram.
+
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+import tephi.constants as constants
+import tephi.thermo as thermo
+import tephi.transforms as transforms
+
+#: Number of fourth-order Runge-Kutta steps, in log-pressure, used to
+#: integrate the saturated adiabat from the LCL to the top of each sounding.
+_MOIST_STEPS = 100
+
+PARCEL = namedtuple(
+    "PARCEL",
+    "pressure temperature dewpoint lcl_pressure lcl_temperature "
+    "lfc_pressure el_pressure cape cin profile",
+)
+
+
+def as_soundings(*arrays):
+    """
+    Promote the arrays of a batch of soundings, or of a single sounding, to
+    two-dimensional float arrays.
+
+    Args:
+
+    * arrays:
+        The sounding arrays, such as of pressure, temperature and dew-point,
+        each with the same shape (N, L) or (L,).
+
+    Returns:
+        The list of arrays with shape (N, L), and whether they describe a
+        single sounding.
+
+    """
+    arrays = [np.asarray(array, dtype=float) for array in arrays]
+    shape = arrays[0].shape
+    if any(array.shape != shape for array in arrays):
+        msg = "The sounding arrays require to have the same shape."
+        raise ValueError(msg)
+    if len(shape) not in (1, 2):
+        msg = (
+            "The sounding arrays require to be one or two dimensional, "
+            "got {} dimensions."
+        )
+        raise ValueError(msg.format(len(shape)))
+    return [np.atleast_2d(array) for array in arrays], len(shape) == 1
+
+
+def _squeeze(parcel):
+    """Remove the leading sounding dimension from a single sounding."""
+    return PARCEL(*[field[0] for field in parcel])
+
+
+def _take(array, index):
+    """Select one value per sounding from the level dimension."""
+    return np.take_along_axis(array, index[:, np.newaxis], axis=1)[:, 0]
+
+
+def lift(pressure, start_pressure, start_temperature, start_dewpoint):
+    """
+    Calculate the temperature of parcels lifted from their starting point.
+
+    Each parcel ascends the dry adiabat to its lifting condensation level and
+    then the saturated adiabat, which is integrated for all parcels at once.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, at which to calculate the parcel
+        temperature, with shape (N, L) or (L,).
+
+    * start_pressure:
+        Starting pressure of each parcel, in mb or hPa, with shape (N,).
+
+    * start_temperature:
+        Starting temperature of each parcel, in degC, with shape (N,).
+
+    * start_dewpoint:
+        Starting dew-point of each parcel, in degC, with shape (N,).
+
+    Returns:
+        The parcel temperature, in degC, with the same shape as the pressure.
+        Levels below the starting pressure of the parcel are NaN.
+
+    """
+    (pressure,), single = as_soundings(pressure)
+    start_pressure, start_temperature, start_dewpoint = [
+        np.atleast_1d(np.asarray(value, dtype=float))
+        for value in (start_pressure, start_temperature, start_dewpoint)
+    ]
+    lcl_pressure, lcl_temperature = thermo.lcl(
+        start_pressure, start_temperature, start_dewpoint
+    )
+    _, theta = transforms.convert_pT2Tt(start_pressure, start_temperature)
+
+    # Dry adiabatic ascent below the LCL.
+    _, dry = transforms.convert_pt2pT(pressure, theta[:, np.newaxis])
+
+    # Saturated adiabatic ascent above the LCL, integrated in log-pressure
+    # on a per-parcel grid from the LCL to the top of the sounding.
+    with np.errstate(invalid="ignore"):
+        top = np.fmin(np.nanmin(pressure, axis=1), lcl_pressure)
+    log_lcl = np.log(lcl_pressure)
+    step = (np.log(top) - log_lcl) / _MOIST_STEPS
+    moist = np.empty((pressure.shape[0], _MOIST_STEPS + 1))
+    kelvin = lcl_temperature + constants.KELVIN
+    moist[:, 0] = kelvin
+    log_p = log_lcl
+
+    def slope(log_p, kelvin):
+        p = np.exp(log_p)
+        return p * thermo.saturated_lapse_rate(p, kelvin - constants.KELVIN)
+
+    for i in range(_MOIST_STEPS):
+        k1 = slope(log_p, kelvin)
+        k2 = slope(log_p + step / 2, kelvin + step * k1 / 2)
+        k3 = slope(log_p + step / 2, kelvin + step * k2 / 2)
+        k4 = slope(log_p + step, kelvin + step * k3)
+        kelvin = kelvin + step * (k1 + 2 * k2 + 2 * k3 + k4) / 6
+        log_p = log_p + step
+        moist[:, i + 1] = kelvin
+
+    # Linearly interpolate each moist curve, in log-pressure, to the levels.
+    with np.errstate(divide="ignore", invalid="ignore"):
+        position = (np.log(pressure) - log_lcl[:, np.newaxis]) / step[
+            :, np.newaxis
+        ]
+    position = np.nan_to_num(position, nan=0.0, posinf=0.0, neginf=0.0)
+    position = np.clip(position, 0, _MOIST_STEPS)
+    index = np.minimum(position.astype(int), _MOIST_STEPS - 1)
+    weight = position - index
+    lower = np.take_along_axis(moist, index, axis=1)
+    upper = np.take_along_axis(moist, index + 1, axis=1)
+    moist = lower + weight * (upper - lower) - constants.KELVIN
+
+    result = np.where(pressure >= lcl_pressure[:, np.newaxis], dry, moist)
+    result[~(pressure <= start_pressure[:, np.newaxis])] = np.nan
+    if single:
+        result = result[0]
+    return result
+
+
+def _areas(log_p0, log_p1, b0, b1):
+    """
+    Positive and negative areas of buoyancy varying linearly in
+    log-pressure between two points.
+
+    """
+    depth = log_p0 - log_p1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cross = b0 * b1 < 0
+        span = np.abs(b1 - b0)
+        positive = np.where(
+            cross,
+            depth * np.maximum(b0, b1) ** 2 / (2 * span),
+            depth * (np.maximum(b0, 0) + np.maximum(b1, 0)) / 2,
+        )
+        negative = np.where(
+            cross,
+            -depth * np.minimum(b0, b1) ** 2 / (2 * span),
+            depth * (np.minimum(b0, 0) + np.minimum(b1, 0)) / 2,
+        )
+    return np.nan_to_num(positive), np.nan_to_num(negative)
+
+
+def _clipped_areas(log_p, buoyancy, bottom, top):
+    """
+    Integrate the positive and negative buoyancy of each sounding layer,
+    clipped to lie between the bottom and top log-pressure of each sounding.
+
+    """
+    log_p0, log_p1 = log_p[:, :-1], log_p[:, 1:]
+    b0, b1 = buoyancy[:, :-1], buoyancy[:, 1:]
+    bottom, top = bottom[:, np.newaxis], top[:, np.newaxis]
+    lower = np.clip(log_p0, top, bottom)
+    upper = np.clip(log_p1, top, bottom)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (b1 - b0) / (log_p1 - log_p0)
+    lower_b = b0 + slope * (lower - log_p0)
+    upper_b = b0 + slope * (upper - log_p0)
+    positive, negative = _areas(lower, upper, lower_b, upper_b)
+    return positive.sum(axis=1), negative.sum(axis=1)
+
+
+def _crossing(log_p, buoyancy, index):
+    """Pressure at which the buoyancy of the indexed layer changes sign."""
+    log_p0, log_p1 = _take(log_p, index), _take(log_p, index + 1)
+    b0, b1 = _take(buoyancy, index), _take(buoyancy, index + 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        fraction = np.clip(b0 / (b0 - b1), 0, 1)
+    return np.exp(log_p0 + fraction * (log_p1 - log_p0))
+
+
+def _diagnose(
+    pressure, temperature, start_pressure, start_temperature, start_dewpoint
+):
+    """Lift the parcels and calculate their convective diagnostics."""
+    profile = lift(pressure, start_pressure, start_temperature, start_dewpoint)
+    lcl_pressure, lcl_temperature = thermo.lcl(
+        start_pressure, start_temperature, start_dewpoint
+    )
+    buoyancy = profile - temperature
+    valid = np.isfinite(buoyancy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        log_p = np.log(pressure)
+    levels = np.arange(pressure.shape[1])
+
+    # The level of free convection is the first upward crossing from
+    # negative to positive buoyancy above the LCL, or the LCL itself when
+    # the parcel is already positively buoyant there.
+    above = valid & (pressure < lcl_pressure[:, np.newaxis])
+    has_above = above.any(axis=1)
+    first = np.argmax(above, axis=1)
+    positive = np.where(valid, buoyancy > 0, False)
+    upward = ~positive[:, :-1] & positive[:, 1:] & valid[:, :-1]
+    upward &= levels[np.newaxis, 1:] >= first[:, np.newaxis]
+    at_lcl = has_above & _take(positive, first)
+    has_lfc = at_lcl | upward.any(axis=1)
+    lfc_index = np.argmax(upward, axis=1)
+    lfc_pressure = np.where(
+        at_lcl, lcl_pressure, _crossing(log_p, buoyancy, lfc_index)
+    )
+    lfc_pressure = np.where(has_lfc, lfc_pressure, np.nan)
+
+    # The equilibrium level is the last downward crossing from positive to
+    # negative buoyancy above the LFC, or the top of the sounding when the
+    # parcel remains positively buoyant there.
+    downward = positive[:, :-1] & ~positive[:, 1:] & valid[:, 1:]
+    with np.errstate(invalid="ignore"):
+        downward &= pressure[:, 1:] < lfc_pressure[:, np.newaxis]
+    top_index = pressure.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    at_top = _take(positive, top_index) | ~downward.any(axis=1)
+    el_index = downward.shape[1] - 1 - np.argmax(downward[:, ::-1], axis=1)
+    el_pressure = np.where(
+        at_top,
+        _take(pressure, top_index),
+        _crossing(log_p, buoyancy, el_index),
+    )
+    el_pressure = np.where(has_lfc, el_pressure, np.nan)
+
+    # Layers with a missing level contribute no area.
+    log_lfc = np.log(np.where(has_lfc, lfc_pressure, 1))
+    log_el = np.log(np.where(has_lfc, el_pressure, 1))
+    cape, _ = _clipped_areas(log_p, buoyancy, log_lfc, log_el)
+    _, cin = _clipped_areas(log_p, buoyancy, np.log(start_pressure), log_lfc)
+    cape = np.where(has_lfc, constants.Rd * cape, 0.0)
+    cin = np.where(has_lfc, constants.Rd * cin, 0.0)
+
+    return PARCEL(
+        start_pressure,
+        start_temperature,
+        start_dewpoint,
+        lcl_pressure,
+        lcl_temperature,
+        lfc_pressure,
+        el_pressure,
+        cape,
+        cin,
+        profile,
+    )
+
+
+def mixed_layer_start(pressure, temperature, dewpoint, depth=100.0):
+    """
+    Calculate the starting point of the parcel with the mean potential
+    temperature and humidity mixing ratio of the lowest layer of each
+    sounding.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, with shape (N, L) or (L,).
+
+    * temperature:
+        Temperature, in degC, with the same shape as the pressure.
+
+    * dewpoint:
+        Dew-point temperature, in degC, with the same shape as the pressure.
+
+    Kwargs:
+
+    * depth:
+        Depth of the mixed layer, in mb or hPa. Defaults to 100.
+
+    Returns:
+        The starting pressure, temperature and dew-point of each parcel,
+        with shape (N,), or scalars for a single sounding.
+
+    """
+    (pressure, temperature, dewpoint), single = as_soundings(
+        pressure, temperature, dewpoint
+    )
+    surface = _take(pressure, np.argmax(np.isfinite(pressure), axis=1))
+    with np.errstate(invalid="ignore"):
+        inside = pressure >= (surface - depth)[:, np.newaxis]
+    inside &= np.isfinite(temperature) & np.isfinite(dewpoint)
+
+    # Pressure weighted (trapezoidal) means over the levels in the layer.
+    weight = np.zeros_like(pressure)
+    thickness = np.where(
+        inside[:, :-1] & inside[:, 1:], pressure[:, :-1] - pressure[:, 1:], 0
+    )
+    weight[:, :-1] += thickness / 2
+    weight[:, 1:] += thickness / 2
+    # A layer without any depth takes the values at the lowest level.
+    lowest = np.argmax(np.isfinite(pressure), axis=1)[:, np.newaxis]
+    empty = (weight.sum(axis=1) == 0)[:, np.newaxis]
+    np.put_along_axis(
+        weight,
+        lowest,
+        np.where(empty, 1.0, np.take_along_axis(weight, lowest, axis=1)),
+        axis=1,
+    )
+    _, theta = transforms.convert_pT2Tt(pressure, temperature)
+    mixing_ratio = thermo.mixing_ratio(pressure, dewpoint)
+    total = weight.sum(axis=1)
+    theta = np.nansum(weight * theta, axis=1) / total
+    mixing_ratio = np.nansum(weight * mixing_ratio, axis=1) / total
+
+    _, start_temperature = transforms.convert_pt2pT(surface, theta)
+    vapour = mixing_ratio * surface / (1000.0 * constants.E)
+    start_dewpoint = thermo._dewpoint(vapour) - constants.KELVIN
+    result = surface, start_temperature, start_dewpoint
+    if single:
+        result = tuple(value[0] for value in result)
+    return result
+
+
+def surface_based(pressure, temperature, dewpoint):
+    """
+    Calculate the diagnostics of the parcel lifted from the lowest level of
+    each sounding.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, with shape (N, L) or (L,).
+
+    * temperature:
+        Temperature, in degC, with the same shape as the pressure.
+
+    * dewpoint:
+        Dew-point temperature, in degC, with the same shape as the pressure.
+
+    Returns:
+        A :data:`PARCEL` namedtuple of the starting pressure, temperature and
+        dew-point, the LCL pressure and temperature, the LFC and EL pressures,
+        the CAPE and CIN, in J kg-1, and the parcel temperature profile at
+        each level. The LFC and EL are NaN, and the CAPE and CIN are zero, for
+        parcels without a level of free convection.
+
+    For example:
+
+        >>> from tephi import parcel
+        >>> pressure = [1000, 850, 700, 500, 300, 200]
+        >>> temperature = [30, 18, 8, -12, -40, -55]
+        >>> dewpoint = [22, 12, -2, -25, -50, -65]
+        >>> sb = parcel.surface_based(pressure, temperature, dewpoint)
+        >>> bool(sb.cape > 0)
+        True
+
+    """
+    (pressure, temperature, dewpoint), single = as_soundings(
+        pressure, temperature, dewpoint
+    )
+    surface = np.argmax(np.isfinite(pressure), axis=1)
+    result = _diagnose(
+        pressure,
+        temperature,
+        _take(pressure, surface),
+        _take(temperature, surface),
+        _take(dewpoint, surface),
+    )
+    if single:
+        result = _squeeze(result)
+    return result
+
+
+def mixed_layer(pressure, temperature, dewpoint, depth=100.0):
+    """
+    Calculate the diagnostics of the parcel with the mean potential
+    temperature and humidity mixing ratio of the lowest layer of each
+    sounding, lifted from the lowest level.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, with shape (N, L) or (L,).
+
+    * temperature:
+        Temperature, in degC, with the same shape as the pressure.
+
+    * dewpoint:
+        Dew-point temperature, in degC, with the same shape as the pressure.
+
+    Kwargs:
+
+    * depth:
+        Depth of the mixed layer, in mb or hPa. Defaults to 100.
+
+    Returns:
+        A :data:`PARCEL` namedtuple, see :func:`surface_based`.
+
+    """
+    (pressure, temperature, dewpoint), single = as_soundings(
+        pressure, temperature, dewpoint
+    )
+    surface, start_temperature, start_dewpoint = mixed_layer_start(
+        pressure, temperature, dewpoint, depth=depth
+    )
+    result = _diagnose(
+        pressure, temperature, surface, start_temperature, start_dewpoint
+    )
+    if single:
+        result = _squeeze(result)
+    return result
+
+
+def most_unstable(pressure, temperature, dewpoint, depth=300.0):
+    """
+    Calculate the diagnostics of the parcel lifted from the level of maximum
+    equivalent potential temperature in the lowest layer of each sounding.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, with shape (N, L) or (L,).
+
+    * temperature:
+        Temperature, in degC, with the same shape as the pressure.
+
+    * dewpoint:
+        Dew-point temperature, in degC, with the same shape as the pressure.
+
+    Kwargs:
+
+    * depth:
+        Depth of the layer, in mb or hPa, searched for the most unstable
+        parcel. Defaults to 300.
+
+    Returns:
+        A :data:`PARCEL` namedtuple, see :func:`surface_based`.
+
+    """
+    (pressure, temperature, dewpoint), single = as_soundings(
+        pressure, temperature, dewpoint
+    )
+    surface = _take(pressure, np.argmax(np.isfinite(pressure), axis=1))
+    theta_e = thermo.theta_e(pressure, temperature, dewpoint)
+    with np.errstate(invalid="ignore"):
+        inside = pressure >= (surface - depth)[:, np.newaxis]
+    theta_e = np.where(inside & np.isfinite(theta_e), theta_e, -np.inf)
+    start = np.argmax(theta_e, axis=1)
+    result = _diagnose(
+        pressure,
+        temperature,
+        _take(pressure, start),
+        _take(temperature, start),
+        _take(dewpoint, start),
+    )
+    if single:
+        result = _squeeze(result)
+    return result
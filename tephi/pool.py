@@ -0,0 +1,162 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+A pool of pre-built tephigrams for rendering one sounding at a time.
+
+Building a :class:`~tephi.TephiAxes`, its curvilinear grid, each of its axes
+and its isopleth artists costs far more than plotting a single profile.
+A :class:`TephiPool` keeps figures with their tephigram axes built and drawn
+once, so that the geometry of their isopleths is cached, and hands them out
+for each plot. When a tephigram is returned to the pool it is
+:meth:`~tephi.TephiAxes.reset`, which removes only the profiles, barbs,
+labels and other user artists.
+
+"""
+
+from contextlib import contextmanager
+import threading
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from tephi.constants import default
+from tephi.tephigram import TephiAxes
+
+#: The isopleths which may be added to each tephigram.
+ISOPLETHS = ("isobars", "wet_adiabats", "mixing_ratios")
+
+
+class TephiPool(object):
+    def __init__(
+        self, size=None, figsize=None, dpi=None, isopleths=ISOPLETHS, **kwargs
+    ):
+        """
+        Create an empty pool of tephigrams, which are built when first
+        required.
+
+        Kwargs:
+
+        * size:
+            The greatest number of idle tephigrams kept by the pool.
+            Defaults to ``pool_size`` of :data:`tephi.constants.default`.
+
+        * figsize:
+            The width and height of each figure in inches.
+
+        * dpi:
+            The resolution of each figure.
+
+        * isopleths:
+            The isopleths added to each tephigram, from ``"isobars"``,
+            ``"wet_adiabats"`` and ``"mixing_ratios"``. Defaults to all of
+            them.
+
+        .. note::
+            All other keyword arguments are passed through to
+            :class:`~tephi.TephiAxes`.
+
+        For example:
+
+            >>> import os
+            >>> from tephi.pool import TephiPool
+            >>> pool = TephiPool(size=2)
+            >>> with pool.axes() as ax:
+            ...     profile = ax.plot([(1000, 20), (850, 10), (700, 0)])
+            ...     ax.figure.savefig(os.devnull, format="png")
+            >>> len(pool)
+            1
+
+        """
+        if size is None:
+            size = default.get("pool_size")
+        unknown = set(isopleths).difference(ISOPLETHS)
+        if unknown:
+            msg = "Unknown isopleths {}, expected any of {}."
+            raise ValueError(msg.format(sorted(unknown), list(ISOPLETHS)))
+        self.size = int(size)
+        self.figsize = figsize
+        self.dpi = dpi
+        self.isopleths = tuple(isopleths)
+        self._kwargs = kwargs
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._idle)
+
+    def _build(self):
+        """Build a figure and its tephigram, and draw it once."""
+        figure = Figure(figsize=self.figsize, dpi=self.dpi)
+        FigureCanvasAgg(figure)
+        axes = TephiAxes(figure=figure, **self._kwargs)
+        for name in self.isopleths:
+            getattr(axes, "add_{}".format(name))()
+        # Draw once, which builds the geometry of the isopleths.
+        figure.canvas.draw()
+        return axes
+
+    def fill(self, count=None):
+        """
+        Build idle tephigrams in advance of their use.
+
+        Kwargs:
+
+        * count:
+            The number of idle tephigrams to build up to. Defaults to the
+            size of the pool.
+
+        """
+        if count is None:
+            count = self.size
+        count = min(count, self.size)
+        while len(self) < count:
+            axes = self._build()
+            with self._lock:
+                self._idle.append(axes)
+
+    def acquire(self):
+        """
+        Take a tephigram from the pool, which is built if none are idle.
+
+        Returns:
+            The :class:`~tephi.TephiAxes`, whose figure is ``axes.figure``.
+
+        """
+        with self._lock:
+            axes = self._idle.pop() if self._idle else None
+        if axes is None:
+            axes = self._build()
+        return axes
+
+    def release(self, axes):
+        """
+        Reset the tephigram and return it to the pool, unless the pool
+        already holds as many idle tephigrams as its size.
+
+        """
+        axes.reset()
+        with self._lock:
+            if len(self._idle) < self.size and all(
+                item is not axes for item in self._idle
+            ):
+                self._idle.append(axes)
+
+    def clear(self):
+        """Discard the idle tephigrams of the pool."""
+        with self._lock:
+            self._idle = []
+
+    @contextmanager
+    def axes(self):
+        """
+        Take a tephigram from the pool, and return it at the end of the
+        context.
+
+        """
+        axes = self.acquire()
+        try:
+            yield axes
+        finally:
+            self.release(axes)
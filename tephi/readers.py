@@ -0,0 +1,573 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Readers of soundings from text files and streams.
+
+A multi-sounding file is a concatenation of soundings, each of which is a
+header of comment lines followed by its lines of values. The file is read
+through a buffered stream, and only the lines of the current sounding are
+held in memory, so that an arbitrarily large file or an unending feed may be
+read one sounding at a time.
+
+Station files of the Integrated Global Radiosonde Archive, version 2
+(IGRA2), and text listings of the University of Wyoming are read likewise,
+by :func:`read_igra2` and :func:`read_wyoming`. Their fixed-width records
+are sliced and parsed as arrays of characters, a block of records at a
+time, rather than value by value. Their missing values are NaN, or masked,
+and :func:`points` and :func:`winds` select the levels of a sounding which
+may be plotted by :meth:`tephi.TephiAxes.plot` and
+:meth:`tephi.isopleths.Profile.barbs`.
+
+"""
+
+from collections import namedtuple
+import functools
+import os
+import re
+
+import numpy as np
+
+#: A sounding of a multi-sounding file: the header of the sounding, and a
+#: namedtuple of the values of each of its columns, as returned by
+#: :func:`tephi.loadtxt`.
+SOUNDING = namedtuple("SOUNDING", "header data")
+
+#: The header record of an IGRA2 sounding. The latitude and longitude are in
+#: degrees, and the release time is in HHMM format.
+IGRA2 = namedtuple(
+    "IGRA2",
+    (
+        "station year month day hour release_time levels pressure_source "
+        "non_pressure_source latitude longitude"
+    ),
+)
+
+# The columns of the soundings of the IGRA2 and Wyoming readers.
+_COLUMNS = (
+    "pressure",
+    "temperature",
+    "dewpoint",
+    "wind_speed",
+    "wind_direction",
+)
+
+# The zero-based start and stop columns of the fixed-width fields of the
+# header and data records of an IGRA2 station file.
+_IGRA2_HEADER = dict(
+    station=(1, 12),
+    year=(13, 17),
+    month=(18, 20),
+    day=(21, 23),
+    hour=(24, 26),
+    release_time=(27, 31),
+    levels=(32, 36),
+    pressure_source=(37, 45),
+    non_pressure_source=(46, 54),
+    latitude=(55, 62),
+    longitude=(63, 71),
+)
+_IGRA2_DATA = dict(
+    pressure=(9, 15),
+    temperature=(22, 27),
+    dewpoint_depression=(34, 39),
+    wind_direction=(40, 45),
+    wind_speed=(46, 51),
+)
+_IGRA2_WIDTH = 71
+
+# The IGRA2 codes of missing values, and of values removed by quality
+# assurance.
+_IGRA2_MISSING = (-9999, -8888)
+
+# The columns of a Wyoming text listing.
+_WYOMING = dict(
+    PRES="pressure",
+    TEMP="temperature",
+    DWPT="dewpoint",
+    SKNT="wind_speed",
+    DRCT="wind_direction",
+)
+
+# The HTML tags of a Wyoming text listing.
+_TAGS = re.compile(r"<[^>]*>")
+
+# The number of knots in one metre per second.
+_KNOTS = 3600 / 1852
+
+# The powers of ten of the digits of a fixed-width number.
+_POWERS = 10 ** np.arange(19, dtype=np.int64)
+
+
+def _repr(nt):
+    """An improved representation of namedtuples over the default."""
+
+    typename = nt.__class__.__name__
+    fields = nt._fields
+    n_fields = len(fields)
+    return_str = "{}(\n".format(typename)
+    for i, t in enumerate(fields):
+        gap = " " * 4
+        if i == n_fields - 1:
+            ender = ""
+        else:
+            ender = "\n"
+        return_str += "{}{}={!r}{}".format(gap, t, getattr(nt, t), ender)
+    return_str += ")"
+    return return_str
+
+
+@functools.lru_cache(maxsize=None)
+def _tephidata(fields):
+    """The namedtuple class of the loaded data with the given fields."""
+    tephidata = namedtuple("tephidata", fields)
+    tephidata.__repr__ = _repr
+    return tephidata
+
+
+def _lines(source):
+    """Yield the text lines of a filename, or of a text or binary stream."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as fh:
+            yield from fh
+    else:
+        for line in source:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8", errors="replace")
+            yield line
+
+
+def _parse(lines, tephidata, delimiter, dtype):
+    """Parse the lines of values of one sounding."""
+    try:
+        payload = np.loadtxt(
+            lines,
+            dtype=np.float64,
+            delimiter=delimiter,
+            comments=None,
+            ndmin=2,
+        )
+    except ValueError:
+        # Lines with trailing comments, or values which the native parser
+        # cannot read, are parsed value by value.
+        payload = np.loadtxt(
+            lines,
+            dtype=np.float64,
+            delimiter=delimiter,
+            converters=float,
+            ndmin=2,
+        )
+    return tephidata(*payload.astype(dtype, copy=False).T)
+
+
+def read_soundings(
+    source,
+    column_titles=None,
+    delimiter=None,
+    dtype="f4",
+    comments="#",
+    callback=None,
+):
+    """
+    Read each sounding of a multi-sounding file or stream in turn.
+
+    A sounding starts at the first comment line after the values of the
+    previous sounding, so the consecutive comment lines before the values
+    of a sounding are its header. Blank lines are ignored, as is a header
+    without values at the end of the file.
+
+    Args:
+
+    * source:
+        The filename, or a text or binary stream such as an open file or
+        socket file, of the soundings.
+
+    Kwargs:
+
+    * column_titles:
+        The title of each column of values of every sounding. Defaults to
+        pressure and temperature.
+
+    * delimiter:
+        The delimiter of the values. Defaults to any whitespace.
+
+    * dtype:
+        The datatype of the values. Defaults to float32.
+
+    * comments:
+        The characters which start a header line. Defaults to ``"#"``.
+
+    * callback:
+        A function, such as one which renders or analyses a sounding, called
+        with each :data:`SOUNDING` as soon as it has been read.
+
+    Returns:
+        A generator of each :data:`SOUNDING`, or of the result of the
+        callback for each sounding.
+
+    For example:
+
+        >>> import os.path
+        >>> import tephi
+        >>> from tephi.readers import read_soundings
+        >>> filename = os.path.join(tephi.DATA_DIR, 'soundings.txt')
+        >>> columns = ('pressure', 'temperature', 'dewpoint')
+        >>> for sounding in read_soundings(filename, column_titles=columns):
+        ...     print(sounding.header[1], sounding.data.pressure.size)
+        time 2024-01-01T00:00Z 5
+        time 2024-01-01T12:00Z 4
+        time 2024-01-01T00:00Z 6
+
+    """
+    if column_titles is None:
+        column_titles = ("pressure", "temperature")
+    elif isinstance(column_titles, str):
+        msg = "Expected column_titles to be iterable, got {!r}."
+        raise TypeError(msg.format(type(column_titles)))
+    tephidata = _tephidata(tuple(column_titles))
+
+    def complete(header, values):
+        data = _parse(values, tephidata, delimiter, dtype)
+        sounding = SOUNDING(header, data)
+        return sounding if callback is None else callback(sounding)
+
+    header, values = [], []
+    for line in _lines(source):
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith(comments):
+            if values:
+                yield complete(header, values)
+                header, values = [], []
+            header.append(line[len(comments) :].strip())
+        else:
+            values.append(line)
+    if values:
+        yield complete(header, values)
+
+
+def _chunks(source, chunksize):
+    """Yield the bytes of a filename, or of a text or binary stream."""
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as fh:
+            yield from _chunks(fh, chunksize)
+    else:
+        while True:
+            chunk = source.read(chunksize)
+            if not chunk:
+                break
+            if isinstance(chunk, str):
+                chunk = chunk.encode("latin-1")
+            yield chunk
+
+
+def _table(buffer, width):
+    """
+    Slice the lines of the bytes into an array of characters, of one
+    fixed-width record per line, padded with spaces.
+
+    """
+    characters = np.frombuffer(buffer, dtype=np.uint8)
+    ends = np.flatnonzero(characters == ord("\n"))
+    if characters.size and characters[-1] != ord("\n"):
+        ends = np.append(ends, characters.size)
+    starts = np.concatenate([[0], ends[:-1] + 1])
+    # Pad the characters, so that the record of the last line may be sliced
+    # beyond its end.
+    characters = np.concatenate(
+        [characters, np.full(width, ord(" "), dtype=np.uint8)]
+    )
+    columns = np.arange(width)
+    table = characters[starts[:, np.newaxis] + columns]
+    table = np.where(
+        columns < (ends - starts)[:, np.newaxis], table, ord(" ")
+    )
+    table[table == ord("\r")] = ord(" ")
+    return table.astype(np.uint8, copy=False)
+
+
+def _numbers(table, start, stop):
+    """
+    Parse the fixed-width field of each record of characters as a number,
+    which is NaN if the field is blank.
+
+    """
+    field = table[:, start:stop]
+    values = field - np.uint8(ord("0"))
+    digits = values < 10
+    # The number of digits to the right of each character of the field.
+    places = np.cumsum(digits[:, ::-1], axis=1, dtype=np.int8)[:, ::-1]
+    places -= digits
+    mantissa = np.sum(np.where(digits, values, 0) * _POWERS[places], axis=1)
+    point = field == ord(".")
+    if point.any():
+        fraction = np.sum(np.where(point, places, 0), axis=1)
+        result = mantissa / _POWERS[fraction]
+    else:
+        result = mantissa.astype(np.float64)
+    result[np.any(field == ord("-"), axis=1)] *= -1
+    result[~np.any(digits, axis=1)] = np.nan
+    return result
+
+
+def _columns(values, dtype, masked):
+    """The namedtuple of the columns of a sounding."""
+    tephidata = _tephidata(_COLUMNS)
+    columns = [np.asarray(values[name], dtype=dtype) for name in _COLUMNS]
+    if masked:
+        columns = [np.ma.masked_invalid(column) for column in columns]
+    return tephidata(*columns)
+
+
+def _igra2(buffer, dtype, masked):
+    """Parse the complete IGRA2 soundings of the bytes."""
+    table = _table(buffer, _IGRA2_WIDTH)
+    headers = np.flatnonzero(table[:, 0] == ord("#"))
+    if not headers.size:
+        return
+    values = {}
+    for name, (start, stop) in _IGRA2_DATA.items():
+        value = _numbers(table, start, stop)
+        value[np.isin(value, _IGRA2_MISSING)] = np.nan
+        values[name] = value
+    values["pressure"] /= 100
+    values["temperature"] /= 10
+    values["dewpoint"] = (
+        values["temperature"] - values.pop("dewpoint_depression") / 10
+    )
+    values["wind_speed"] *= _KNOTS / 10
+    # The data records of each sounding, which follow its header record.
+    sounding = np.cumsum(table[:, 0] == ord("#")) - 1
+    blank = np.all(table == ord(" "), axis=1)
+    records = np.flatnonzero((table[:, 0] != ord("#")) & ~blank)
+    records = records[sounding[records] >= 0]
+    bounds = np.searchsorted(records, headers[1:])
+    header = {}
+    for name, (start, stop) in _IGRA2_HEADER.items():
+        if name in ("station", "pressure_source", "non_pressure_source"):
+            header[name] = [
+                table[row, start:stop].tobytes().decode("latin-1").strip()
+                for row in headers
+            ]
+        else:
+            header[name] = _numbers(table[headers], start, stop)
+    for index, rows in enumerate(np.split(records, bounds)):
+        fields = {}
+        for name, value in header.items():
+            value = value[index]
+            if name in ("latitude", "longitude"):
+                value = value / 10000
+            elif not isinstance(value, str):
+                value = int(value)
+            fields[name] = value
+        data = {name: value[rows] for name, value in values.items()}
+        yield SOUNDING(IGRA2(**fields), _columns(data, dtype, masked))
+
+
+def read_igra2(source, dtype="f4", masked=False, chunksize=1 << 20):
+    """
+    Read each sounding of an IGRA2 station file in turn.
+
+    The file is read in chunks, of which the complete soundings are parsed
+    together, so that the memory used is bounded by the size of a chunk
+    rather than that of the file.
+
+    Args:
+
+    * source:
+        The filename, or a binary or text stream such as a member of a zip
+        file, of the IGRA2 station data file.
+
+    Kwargs:
+
+    * dtype:
+        The datatype of the values. Defaults to float32.
+
+    * masked:
+        Whether missing values are masked, rather than NaN. Defaults to
+        False.
+
+    * chunksize:
+        The number of bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        A generator of each :data:`SOUNDING`, of an :data:`IGRA2` header and
+        the pressure (hPa), temperature (degC), dewpoint (degC), wind speed
+        (knots) and wind direction (degrees) of each level.
+
+    For example:
+
+        >>> import os.path
+        >>> import tephi
+        >>> from tephi.readers import read_igra2
+        >>> filename = os.path.join(tephi.DATA_DIR, 'igra2.txt')
+        >>> for sounding in read_igra2(filename):
+        ...     print(sounding.header.hour, sounding.data.pressure[:3])
+        0 [1013.  1000.   925.]
+        12 [1011. 1000.  850.]
+
+    """
+    carry = b""
+    for chunk in _chunks(source, chunksize):
+        buffer = carry + chunk
+        # The soundings before the last header are complete.
+        last = buffer.rfind(b"\n#") + 1
+        if last > 0:
+            yield from _igra2(buffer[:last], dtype, masked)
+            buffer = buffer[last:]
+        carry = buffer
+    if carry:
+        yield from _igra2(carry, dtype, masked)
+
+
+def _value(text):
+    """The number of a text value, or the text if it is not a number."""
+    try:
+        result = float(text)
+    except ValueError:
+        result = text
+    return result
+
+
+def _wyoming(header, spans, lines, dtype, masked):
+    """Parse the data lines of a Wyoming sounding."""
+    width = max(stop for _, stop in spans.values())
+    buffer = "".join(line.ljust(width)[:width] for line in lines)
+    table = np.frombuffer(buffer.encode("latin-1"), dtype=np.uint8)
+    table = table.reshape(len(lines), width)
+    values = {}
+    for name in _COLUMNS:
+        if name in spans:
+            values[name] = _numbers(table, *spans[name])
+        else:
+            values[name] = np.full(len(lines), np.nan)
+    return SOUNDING(header, _columns(values, dtype, masked))
+
+
+def read_wyoming(source, dtype="f4", masked=False):
+    """
+    Read each sounding of a University of Wyoming text listing in turn.
+
+    The listing may be either the HTML page, or its text, of one or more
+    soundings. The columns of each sounding are located by its column
+    titles, and its lines of values are parsed together.
+
+    Args:
+
+    * source:
+        The filename, or a text or binary stream, of the text listing.
+
+    Kwargs:
+
+    * dtype:
+        The datatype of the values. Defaults to float32.
+
+    * masked:
+        Whether missing values are masked, rather than NaN. Defaults to
+        False.
+
+    Returns:
+        A generator of each :data:`SOUNDING`, of a header and the pressure
+        (hPa), temperature (degC), dewpoint (degC), wind speed (knots) and
+        wind direction (degrees) of each level. The header is a dictionary
+        of the ``"title"`` of the sounding, and of its station information
+        and sounding indices.
+
+    For example:
+
+        >>> import os.path
+        >>> import tephi
+        >>> from tephi.readers import read_wyoming
+        >>> filename = os.path.join(tephi.DATA_DIR, 'wyoming.txt')
+        >>> for sounding in read_wyoming(filename):
+        ...     print(sounding.header['Observation time'],
+        ...           sounding.data.pressure.size)
+        240101/0000 7
+        240101/1200 3
+
+    """
+    header, spans, lines, section = {}, None, [], None
+    for line in _lines(source):
+        text = _TAGS.sub("", line).rstrip()
+        stripped = text.strip()
+        if "Observations at" in stripped:
+            if lines:
+                yield _wyoming(header, spans, lines, dtype, masked)
+            header, spans, lines, section = {}, None, [], None
+            header["title"] = stripped
+        elif stripped.startswith("PRES"):
+            if lines:
+                # A listing of values without a title.
+                yield _wyoming(header, spans, lines, dtype, masked)
+                header, lines = {}, []
+            # The column titles are right aligned to their fields.
+            spans = {}
+            for match in re.finditer(r"\S+", text):
+                if match.group() in _WYOMING:
+                    stop = match.end()
+                    spans[_WYOMING[match.group()]] = (max(stop - 7, 0), stop)
+            section = "units"
+        elif stripped and set(stripped) == {"-"}:
+            if section == "units":
+                section = "data"
+        elif stripped.startswith("Station information"):
+            section = "station"
+        elif section == "data" and stripped:
+            lines.append(text)
+        elif section == "station" and ":" in stripped:
+            key, value = stripped.split(":", 1)
+            header[key.strip()] = _value(value.strip())
+    if lines:
+        yield _wyoming(header, spans, lines, dtype, masked)
+
+
+def _finite(*columns):
+    """The rows of the columns of which every value is finite."""
+    columns = [
+        np.ma.filled(np.ma.asarray(column, dtype=np.float64), np.nan)
+        for column in columns
+    ]
+    result = np.column_stack(columns)
+    return result[np.all(np.isfinite(result), axis=1)]
+
+
+def points(data, name="temperature"):
+    """
+    Select the pressure and temperature, or other, points of a sounding
+    which are not missing.
+
+    Args:
+
+    * data:
+        The namedtuple of the columns of a sounding.
+
+    Kwargs:
+
+    * name:
+        The name of the column of the points. Defaults to temperature.
+
+    Returns:
+        An array of pressure and value pairs, for
+        :meth:`tephi.TephiAxes.plot`.
+
+    """
+    return _finite(data.pressure, getattr(data, name))
+
+
+def winds(data):
+    """
+    Select the winds of a sounding which are not missing.
+
+    Args:
+
+    * data:
+        The namedtuple of the columns of a sounding.
+
+    Returns:
+        An array of wind speed, wind direction and pressure triples, for
+        :meth:`tephi.isopleths.Profile.barbs`.
+
+    """
+    return _finite(data.wind_speed, data.wind_direction, data.pressure)
@@ -0,0 +1,113 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Headless rendering of a tephigram to memory.
+
+:func:`render` draws a figure onto an Agg canvas, without pyplot, and
+returns either the image encoded in memory, such as PNG, SVG or PDF bytes,
+or a NumPy view of the RGBA buffer of the canvas, which avoids the cost of
+encoding and decoding the image altogether.
+
+Tephigrams of separate figures share no mutable state, so each may be plotted
+and rendered in its own thread, provided that its figure is given explicitly
+rather than taken from pyplot.
+
+"""
+
+from contextlib import contextmanager
+import io
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+import numpy as np
+
+#: The format of :func:`render` which returns the RGBA buffer of the canvas.
+RGBA = "rgba"
+
+
+@contextmanager
+def _agg_canvas(figure):
+    """
+    Draw the figure on an Agg canvas, restoring its own canvas after the
+    context.
+
+    """
+    canvas = figure.canvas
+    if isinstance(canvas, FigureCanvasAgg):
+        yield canvas
+    else:
+        try:
+            yield FigureCanvasAgg(figure)
+        finally:
+            figure.set_canvas(canvas)
+
+
+@contextmanager
+def _dpi(figure, dpi):
+    if dpi is None or dpi == figure.dpi:
+        yield
+    else:
+        original = figure.dpi
+        figure.dpi = dpi
+        try:
+            yield
+        finally:
+            figure.dpi = original
+
+
+def render(figure, format=RGBA, dpi=None, **kwargs):
+    """
+    Render the figure, or the figure of a tephigram, in memory.
+
+    Args:
+
+    * figure:
+        The :class:`matplotlib.figure.Figure`, or an axes such as a
+        :class:`~tephi.TephiAxes` of the figure.
+
+    Kwargs:
+
+    * format:
+        ``"rgba"`` for the RGBA buffer of the canvas, otherwise the format
+        of the encoded image, such as ``"png"``, ``"svg"`` or ``"pdf"``.
+        Defaults to ``"rgba"``.
+
+    * dpi:
+        The resolution of the image. Defaults to that of the figure.
+
+    .. note::
+        All other keyword arguments are passed through to
+        :meth:`matplotlib.figure.Figure.savefig` for encoded images.
+
+    Returns:
+        For ``"rgba"``, a read-only array of shape (height, width, 4) of
+        uint8, which is a view of the buffer of the canvas rather than a
+        copy, so which is overwritten when the figure is drawn again.
+        Otherwise, the bytes of the encoded image.
+
+    For example:
+
+        >>> from matplotlib.figure import Figure
+        >>> from tephi import TephiAxes, render
+        >>> tephigram = TephiAxes(figure=Figure(figsize=(4, 3), dpi=50))
+        >>> render(tephigram).shape
+        (150, 200, 4)
+        >>> render(tephigram, format="png")[:4]
+        b'\\x89PNG'
+
+    """
+    figure = getattr(figure, "figure", figure)
+    if format.lower() == RGBA:
+        if kwargs:
+            msg = "Unexpected keyword arguments {} for the RGBA buffer."
+            raise TypeError(msg.format(sorted(kwargs)))
+        with _agg_canvas(figure) as canvas, _dpi(figure, dpi):
+            canvas.draw()
+            result = np.asarray(canvas.buffer_rgba())
+        result.flags.writeable = False
+    else:
+        buffer = io.BytesIO()
+        figure.savefig(buffer, format=format, dpi=dpi, **kwargs)
+        result = buffer.getvalue()
+    return result
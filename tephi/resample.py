@@ -0,0 +1,229 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Vectorised log-pressure resampling of many profiles onto common levels.
+
+Profiles with different sets of pressure levels are held together as dense,
+NaN-padded, two-dimensional arrays of shape (N, L), which :func:`stack`
+builds from a ragged sequence of profiles. :func:`resample` interpolates all
+of the profiles onto one set of target levels in a single operation, which
+is the building block for comparing, averaging and differencing soundings.
+:class:`Interpolator` prepares a single profile for repeated interpolation,
+such as at the pressure under the cursor.
+
+"""
+
+import numpy as np
+
+
+def stack(profiles, fill_value=np.nan):
+    """
+    Stack a sequence of profiles of differing lengths into one dense array.
+
+    Args:
+
+    * profiles:
+        Sequence of N arrays with shape (L_i, ...), which only differ in
+        the length of their first dimension.
+
+    Kwargs:
+
+    * fill_value:
+        The value padding the end of the shorter profiles. Defaults to NaN.
+
+    Returns:
+        Array with shape (N, max(L_i), ...).
+
+    For example:
+
+        >>> from tephi.resample import stack
+        >>> stack([[1000, 850, 700], [1000, 850]])
+        array([[1000.,  850.,  700.],
+               [1000.,  850.,   nan]])
+
+    """
+    profiles = [np.asarray(profile, dtype=float) for profile in profiles]
+    if not profiles:
+        return np.empty((0, 0))
+    trailing = {profile.shape[1:] for profile in profiles}
+    if len(trailing) != 1 or any(p.ndim == 0 for p in profiles):
+        msg = "The profiles require to differ only in their first dimension."
+        raise ValueError(msg)
+    (trailing,) = trailing
+    lengths = np.array([profile.shape[0] for profile in profiles])
+    result = np.full(
+        (len(profiles), lengths.max(initial=0)) + trailing, fill_value
+    )
+    rows = np.repeat(np.arange(len(profiles)), lengths)
+    columns = np.arange(lengths.sum()) - np.repeat(
+        np.cumsum(lengths) - lengths, lengths
+    )
+    result[rows, columns] = np.concatenate(profiles)
+    return result
+
+
+def _as_dense(profiles):
+    """Promote one profile, or a sequence of profiles, to a dense array."""
+    if isinstance(profiles, np.ndarray):
+        return profiles.astype(float, copy=False)
+    try:
+        return np.asarray(profiles, dtype=float)
+    except ValueError:
+        return stack(profiles)
+
+
+def resample(pressure, values, levels):
+    """
+    Interpolate the values of each profile onto the levels, linearly in
+    log-pressure.
+
+    All of the profiles are interpolated at once: the levels are located
+    within the log-pressures of every profile with a single sorted search,
+    by offsetting each profile into its own disjoint range. Each profile
+    may be ordered by increasing or decreasing pressure, and may be padded
+    with NaN.
+
+    Args:
+
+    * pressure:
+        Pressure levels, in mb or hPa, of the profiles, with shape (N, L),
+        or a sequence of N one-dimensional arrays of differing lengths.
+
+    * values:
+        Values of the profiles at each pressure level, with shape
+        (N, L, ...), or a sequence of N arrays matching the pressures.
+
+    * levels:
+        The M target pressure levels, in mb or hPa.
+
+    Returns:
+        Array of the values at the levels, with shape (N, M, ...). Levels
+        outside the pressure range of a profile are NaN. No levels give an
+        empty array of shape (N, 0, ...).
+
+    For example:
+
+        >>> from tephi.resample import resample
+        >>> pressure = [[1000, 850, 700], [950, 800]]
+        >>> temperature = [[20, 10, 0], [15, 5]]
+        >>> resample(pressure, temperature, [1000, 900, 800]).round(2)
+        array([[20.  , 13.52,  6.88],
+               [  nan, 11.85,  5.  ]])
+
+    """
+    pressure = np.atleast_2d(_as_dense(pressure))
+    values = _as_dense(values)
+    if values.ndim == 1:
+        values = values[np.newaxis]
+    if pressure.ndim != 2 or values.shape[:2] != pressure.shape:
+        msg = (
+            "The profile values require to match the pressure levels, "
+            "got shapes {} and {}."
+        )
+        raise ValueError(msg.format(values.shape, pressure.shape))
+    levels = np.asarray(levels, dtype=float)
+    n_profiles, n_levels = pressure.shape
+    if levels.size == 0:
+        shape = (n_profiles, 0) + values.shape[2:]
+        return np.empty(shape, dtype=np.result_type(values, float))
+    trailing = (np.newaxis,) * (values.ndim - 2)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        x = -np.log(pressure)
+        target = -np.log(levels)
+    # Order each profile by increasing height, with missing levels last.
+    order = np.argsort(np.where(np.isfinite(x), x, np.inf), axis=1)
+    x = np.take_along_axis(x, order, axis=1)
+    values = np.take_along_axis(values, order[(Ellipsis,) + trailing], axis=1)
+    valid = np.isfinite(x)
+    n_valid = valid.sum(axis=1)[:, np.newaxis]
+
+    # Offset each profile into its own disjoint range, so that one search
+    # of the concatenated profiles locates the levels within every profile.
+    lowest = min(np.min(x, where=valid, initial=np.inf), np.min(target))
+    highest = max(np.max(x, where=valid, initial=-np.inf), np.max(target))
+    span = highest - lowest + 1.0
+    x = np.where(valid, x - lowest, span - 0.5)
+    offset = np.arange(n_profiles)[:, np.newaxis] * span
+    target = np.broadcast_to(target - lowest, (n_profiles, levels.size))
+    index = np.searchsorted((x + offset).ravel(), (target + offset).ravel())
+    index = index.reshape(target.shape)
+    index -= np.arange(n_profiles)[:, np.newaxis] * n_levels
+    index = np.clip(index - 1, 0, max(n_levels - 2, 0))
+    upper = np.minimum(index + 1, n_levels - 1)
+
+    x0 = np.take_along_axis(x, index, axis=1)
+    x1 = np.take_along_axis(x, upper, axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        weight = np.where(x1 > x0, (target - x0) / (x1 - x0), 0.0)
+    top = np.take_along_axis(x, np.maximum(n_valid - 1, 0), axis=1)
+    inside = (target >= x[:, :1]) & (target <= top) & (n_valid > 0)
+
+    v0 = np.take_along_axis(values, index[(Ellipsis,) + trailing], axis=1)
+    v1 = np.take_along_axis(values, upper[(Ellipsis,) + trailing], axis=1)
+    result = v0 + weight[(Ellipsis,) + trailing] * (v1 - v0)
+    return np.where(inside[(Ellipsis,) + trailing], result, np.nan)
+
+
+class Interpolator(object):
+    def __init__(self, pressure, values):
+        """
+        Prepare one profile for repeated log-pressure interpolation.
+
+        The profile is ordered by increasing height, and its missing levels
+        dropped, once on creation, so that each call is a single
+        :func:`numpy.interp`.
+
+        Args:
+
+        * pressure:
+            Pressure levels of the profile, in mb or hPa.
+
+        * values:
+            Values of the profile at each pressure level.
+
+        For example:
+
+            >>> from tephi.resample import Interpolator
+            >>> interpolator = Interpolator([1000, 850, 700], [20, 10, 0])
+            >>> print(f"{interpolator(925):.2f}")
+            15.20
+
+        """
+        pressure = np.asarray(pressure, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if pressure.ndim != 1 or values.shape != pressure.shape:
+            msg = (
+                "The profile values require to match the pressure levels, "
+                "got shapes {} and {}."
+            )
+            raise ValueError(msg.format(values.shape, pressure.shape))
+        valid = np.isfinite(pressure) & np.isfinite(values) & (pressure > 0)
+        x = -np.log(pressure[valid])
+        order = np.argsort(x, kind="stable")
+        self._x = x[order]
+        self._values = values[valid][order]
+
+    def __call__(self, levels):
+        """
+        Interpolate the profile onto the levels, linearly in log-pressure.
+
+        Args:
+
+        * levels:
+            The pressure levels, in mb or hPa.
+
+        Returns:
+            The values at the levels, which are NaN outside the pressure
+            range of the profile.
+
+        """
+        if self._x.size == 0:
+            return np.full(np.shape(levels), np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            target = -np.log(np.asarray(levels, dtype=float))
+        return np.interp(
+            target, self._x, self._values, left=np.nan, right=np.nan
+        )
@@ -0,0 +1,298 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Spatial index of profiles for fast hover and pick queries.
+
+The segments of each profile are sampled, at intervals of no more than one
+cell, in the native tephigram x and y coordinates of
+:func:`tephi.transforms.convert_Tt2xy`, and the samples are hashed into a
+regular grid of cells. The index is held as an array of samples sorted by
+cell, so that the segments near a point are found by a sorted search of the
+few cells around it.
+
+Profiles are indexed lazily, when the index is next queried. Newly added
+profiles are held in a small pending index, which is searched by brute force
+and merged into the sorted index once it grows to a fraction of its size,
+and removed profiles are masked until the next merge.
+
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from tephi.constants import default
+import tephi.transforms as transforms
+
+#: The profile, member of a profile group, segment index, pressure and
+#: temperature of the point of a profile nearest to a query, and its distance
+#: in native tephigram coordinates.
+NEAREST = namedtuple(
+    "NEAREST", "profile member segment pressure temperature distance"
+)
+
+# Offset of the cell indices, which keeps the packed cell keys positive for
+# cell indices of magnitude less than 2**30, as each offset index is then
+# less than 2**31 and packs into 32 bits below the sign bit.
+_CELL_OFFSET = 2**30
+
+# The segment arrays of an index, which are the identity of the profile,
+# the member of the profile and segment of the member, and the x0, y0, x1
+# and y1 coordinates of the ends of the segment.
+_FIELDS = ("owner", "member", "segment", "xy")
+
+
+def _empty():
+    segments = {name: np.empty(0, dtype=int) for name in _FIELDS}
+    segments["xy"] = np.empty((0, 4))
+    return segments
+
+
+class ProfileIndex(object):
+    def __init__(self, cell=None):
+        """
+        Create an empty spatial index of profiles.
+
+        Kwargs:
+
+        * cell:
+            The size of each grid cell in native tephigram coordinates.
+
+        """
+        if cell is None:
+            cell = default.get("spatial_cell")
+        self.cell = float(cell)
+        self._profiles = {}
+        self._queued = []
+        self._removed = set()
+        self._segments = _empty()
+        self._keys = np.empty(0, dtype=np.int64)
+        self._samples = np.empty(0, dtype=int)
+        self._pending = _empty()
+
+    def __len__(self):
+        return len(self._profiles)
+
+    def __contains__(self, profile):
+        return id(profile) in self._profiles
+
+    def add(self, profile):
+        """
+        Add the :class:`~tephi.isopleths.Profile` or
+        :class:`~tephi.isopleths.ProfileGroup` to the index.
+
+        """
+        key = id(profile)
+        if key not in self._profiles:
+            if key in self._removed:
+                # Drop the stale segments of the profile before re-adding it.
+                self._compact()
+            self._profiles[key] = profile
+            self._queued.append(profile)
+
+    def remove(self, profile):
+        """Remove the profile from the index."""
+        key = id(profile)
+        if self._profiles.pop(key, None) is not None:
+            self._queued = [
+                item for item in self._queued if item is not profile
+            ]
+            alive = self._pending["owner"] != key
+            self._pending = {
+                name: value[alive] for name, value in self._pending.items()
+            }
+            self._removed.add(key)
+
+    def _cells(self, x, y):
+        i = np.floor(x / self.cell).astype(np.int64) + _CELL_OFFSET
+        j = np.floor(y / self.cell).astype(np.int64) + _CELL_OFFSET
+        return i, j
+
+    def _segment_arrays(self, profiles):
+        """The segments, in native coordinates, of each profile."""
+        arrays = {name: [] for name in _FIELDS}
+        for profile in profiles:
+            temperature = np.atleast_2d(profile.points.temperature)
+            theta = np.atleast_2d(profile.points.theta)
+            x, y = transforms.convert_Tt2xy(temperature, theta)
+            valid = np.isfinite(x[:, :-1] + x[:, 1:] + y[:, :-1] + y[:, 1:])
+            member, segment = np.nonzero(valid)
+            arrays["owner"].append(np.full(member.size, id(profile)))
+            arrays["member"].append(member)
+            arrays["segment"].append(segment)
+            arrays["xy"].append(
+                np.column_stack(
+                    [
+                        x[:, :-1][valid],
+                        y[:, :-1][valid],
+                        x[:, 1:][valid],
+                        y[:, 1:][valid],
+                    ]
+                )
+            )
+        return {
+            name: np.concatenate(values) if values else _empty()[name]
+            for name, values in arrays.items()
+        }
+
+    def _concatenate(self, *segments):
+        return {
+            name: np.concatenate([item[name] for item in segments])
+            for name in _FIELDS
+        }
+
+    def _compact(self):
+        """Merge the pending index, and drop the removed profiles."""
+        segments = self._concatenate(self._segments, self._pending)
+        if self._removed:
+            alive = ~np.isin(segments["owner"], list(self._removed))
+            segments = {name: value[alive] for name, value in segments.items()}
+            self._removed = set()
+        self._segments = segments
+        self._pending = _empty()
+        self._sort()
+
+    def _update(self):
+        """Index the queued profiles, and merge a large pending index."""
+        if self._queued:
+            queued = self._segment_arrays(self._queued)
+            self._pending = self._concatenate(self._pending, queued)
+            self._queued = []
+        size = max(self._segments["owner"].size, 1)
+        if self._pending["owner"].size > default.get("spatial_merge") * size:
+            self._compact()
+
+    def _sort(self):
+        """Sample each segment into the cells, and sort the samples."""
+        x0, y0, x1, y1 = (self._segments["xy"] / self.cell).T
+        samples = np.ceil(np.maximum(abs(x1 - x0), abs(y1 - y0))).astype(int)
+        samples += 1
+        segment = np.repeat(np.arange(samples.size), samples)
+        start = np.cumsum(samples) - samples
+        fraction = (np.arange(segment.size) - start[segment]) / np.maximum(
+            samples[segment] - 1, 1
+        )
+        x = x0[segment] + fraction * (x1 - x0)[segment]
+        y = y0[segment] + fraction * (y1 - y0)[segment]
+        i, j = self._cells(x * self.cell, y * self.cell)
+        keys = (i << 32) | j
+        order = np.argsort(keys, kind="stable")
+        self._keys = keys[order]
+        self._samples = segment[order]
+
+    def _candidates(self, x, y, radius):
+        """
+        The indices of the segments sampled within the cells around the
+        point, which may repeat.
+
+        """
+        # The samples are no more than one cell apart, so the sample nearest
+        # to any point of a segment is within half a cell of it.
+        ring = int(np.ceil(radius / self.cell + 0.5))
+        i, j = self._cells(np.asarray(x), np.asarray(y))
+        offsets = np.arange(-ring, ring + 1)
+        di, dj = np.meshgrid(offsets, offsets)
+        keys = ((i + di.ravel()) << 32) | (j + dj.ravel())
+        lower = np.searchsorted(self._keys, keys, side="left")
+        upper = np.searchsorted(self._keys, keys, side="right")
+        counts = upper - lower
+        index = np.repeat(lower - np.cumsum(counts) + counts, counts)
+        index += np.arange(counts.sum())
+        return self._samples[index]
+
+    def nearest(self, x, y, radius):
+        """
+        Find the point of a visible profile nearest to the point.
+
+        Args:
+
+        * x, y:
+            The point in native tephigram coordinates.
+
+        * radius:
+            The greatest distance of the nearest point, in native tephigram
+            coordinates.
+
+        Returns:
+            A :data:`NEAREST` namedtuple, or None if there is no visible
+            profile within the radius.
+
+        """
+        self._update()
+        candidates = self._candidates(x, y, radius)
+        pending = np.empty(0, dtype=int)
+        xy = self._segments["xy"][candidates]
+        if self._pending["owner"].size:
+            # Search the pending segments apart from the sorted index, rather
+            # than merge them into it for each query.
+            pending = self._pending_candidates(x, y, radius)
+            xy = np.concatenate([xy, self._pending["xy"][pending]])
+        x0, y0, x1, y1 = xy.T
+        dx, dy = x1 - x0, y1 - y0
+        length = dx**2 + dy**2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            fraction = np.where(
+                length > 0, ((x - x0) * dx + (y - y0) * dy) / length, 0.0
+            )
+        fraction = np.clip(fraction, 0.0, 1.0)
+        px, py = x0 + fraction * dx, y0 + fraction * dy
+        distance = np.hypot(px - x, py - y)
+        if distance.size == 0 or np.min(distance) > radius:
+            return None
+        found = (candidates, pending)
+        result = self._result(found, np.argmin(distance), px, py, distance)
+        if result is None:
+            # The nearest profile is hidden, so take the nearest segment of
+            # a visible profile.
+            within = np.flatnonzero(distance <= radius)
+            for best in within[np.argsort(distance[within], kind="stable")]:
+                result = self._result(found, best, px, py, distance)
+                if result is not None:
+                    break
+        return result
+
+    def _pending_candidates(self, x, y, radius):
+        """
+        The indices of the pending segments of which the bounds are within
+        the radius of the point.
+
+        """
+        x0, y0, x1, y1 = self._pending["xy"].T
+        near = (np.minimum(x0, x1) - radius <= x) & (
+            x <= np.maximum(x0, x1) + radius
+        )
+        near &= (np.minimum(y0, y1) - radius <= y) & (
+            y <= np.maximum(y0, y1) + radius
+        )
+        return np.flatnonzero(near)
+
+    def _result(self, found, best, px, py, distance):
+        """
+        The nearest point of the candidate segment, of the sorted or pending
+        index, if visible.
+
+        """
+        candidates, pending = found
+        if best < candidates.size:
+            segments, index = self._segments, candidates[best]
+        else:
+            segments, index = self._pending, pending[best - candidates.size]
+        profile = self._profiles.get(segments["owner"][index])
+        if (
+            profile is None
+            or profile.line is None
+            or not profile.line.get_visible()
+        ):
+            return None
+        temperature, theta = transforms.convert_xy2Tt(px[best], py[best])
+        pressure, _ = transforms.convert_Tt2pT(temperature, theta)
+        return NEAREST(
+            profile,
+            int(segments["member"][index]),
+            int(segments["segment"][index]),
+            float(pressure),
+            float(temperature),
+            float(distance[best]),
+        )
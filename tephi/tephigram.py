@@ -0,0 +1,1140 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+The tephigram axes, and the locator and formatters of its grid of isotherms
+and dry adiabats.
+
+"""
+
+from contextlib import contextmanager
+import math
+
+import matplotlib.artist as martist
+from matplotlib.backend_bases import PickEvent
+import matplotlib.transforms as mtransforms
+from mpl_toolkits.axisartist import Subplot
+from mpl_toolkits.axisartist.grid_finder import MaxNLocator
+import numpy as np
+
+from . import artists, grid_finder, isopleths, spatial, thermo, transforms
+from .artists import (
+    WetAdiabatArtist,
+    IsobarArtist,
+    HumidityMixingRatioArtist,
+)
+from .constants import default
+
+
+class _FormatterTheta(object):
+    """
+    Dry adiabats potential temperature axis tick formatter.
+
+    """
+
+    def __call__(self, direction, factor, values):
+        return [r"$\theta={:.1f}$".format(value) for value in values]
+
+
+class _FormatterIsotherm(object):
+    """
+    Isotherms temperature axis tick formatter.
+
+    """
+
+    def __call__(self, direction, factor, values):
+        return [r"$T={:.1f}$".format(value) for value in values]
+
+
+class Locator(object):
+    """
+    Determine the fixed step axis tick locations when called with a tick range.
+
+    """
+
+    def __init__(self, step):
+        """
+        Set the fixed step value for the axis tick locations.
+
+        Generate tick location specification when called with a tick range.
+
+        For example:
+
+            >>> from tephi import Locator
+            >>> locator = Locator(10)
+            >>> locator(-45, 23)
+            (array([-50, -40, -30, -20, -10,   0,  10, 20, 30]), 9, 1)
+
+        Args:
+
+        * step:
+            The step value for each axis tick.
+
+        """
+        self.step = int(step)
+
+    def __call__(self, start, stop):
+        """
+        Calculate the axis ticks given the provided tick range.
+
+        """
+        step = self.step
+        start = math.floor(int(start) / step) * step
+        stop = math.ceil(int(stop) / step) * step
+        ticks = np.arange(start, stop + step, step)
+        return ticks, len(ticks), 1
+
+
+class TephiAxes(Subplot):
+    name = "tephigram"
+
+    def __init__(self, *args, **kwargs):
+        # Validate the subplot arguments.
+
+        # TODO: Remove limit of super() behaviour.
+        #  Currently, it only accepts format of 123 or (1, 2, 3).
+        if len(args) == 0:
+            args = (1, 1, 1)
+        elif (len(args) == 1
+              and isinstance(args[0], tuple)
+              and len(args[0]) == 3):
+            args = args[0]
+        elif len(args) == 1 and isinstance(args[0], int):
+            args = tuple([int(c) for c in str(args[0])])
+            if len(args) != 3:
+                msg = (
+                    "Integer subplot specification must be a "
+                    "three digit number. Not {}.".format(len(args))
+                )
+                raise ValueError(msg)
+        else:
+            msg = "Invalid arguments: " + ", ".join(["{}" for _ in len(args)])
+            raise ValueError(msg.format(*args))
+
+        # Process the kwargs
+        figure = kwargs.pop("figure", None)
+        if figure is None:
+            # Only fall back to the global pyplot state when no figure is
+            # given, so that an explicit figure may be drawn in any thread.
+            import matplotlib.pyplot as plt
+
+            figure = plt.gcf()
+
+        # TODO: xylim should be split, to mirror the super()
+        xylim = kwargs.pop("xylim", None)
+
+        blit = kwargs.pop("blit", False)
+        draft = kwargs.pop("draft", False)
+
+        dry_adiabat_locator = kwargs.pop("dry_adiabat_locator", None)
+        isotherm_locator = kwargs.pop("isotherm_locator", None)
+
+        if isotherm_locator and not isinstance(isotherm_locator, Locator):
+            if isinstance(isotherm_locator, int):
+                locator_T = MaxNLocator(
+                    nbins=isotherm_locator,
+                    steps=[10],
+                    integer=True
+                )
+            else:
+                raise ValueError("Invalid isotherm locator.")
+        else:
+            locator_T = isotherm_locator
+
+        if dry_adiabat_locator and not isinstance(dry_adiabat_locator, Locator):
+            if isinstance(dry_adiabat_locator, int):
+                locator_theta = MaxNLocator(
+                    nbins=dry_adiabat_locator,
+                    steps=[10],
+                    integer=True
+                )
+            else:
+                raise ValueError("Invalid dry adiabat locator.")
+        else:
+            locator_theta = dry_adiabat_locator
+
+        # A grid finder shared with other tephigrams, with its transform,
+        # locators, formatters and caches.
+        finder = kwargs.pop("grid_finder", None)
+        if finder is not None:
+            gridder = grid_finder.GridHelper(grid_finder=finder)
+        else:
+            gridder = grid_finder.GridHelper(
+                transforms.TephiTransform(),
+                tick_formatter1=_FormatterIsotherm(),
+                grid_locator1=locator_T,
+                tick_formatter2=_FormatterTheta(),
+                grid_locator2=locator_theta,
+            )
+        super(TephiAxes, self).__init__(
+            figure, *args, grid_helper=gridder, **kwargs
+        )
+
+        # The tephigram cache.
+        transform = gridder.grid_finder.get_transform() + self.transData
+
+        self.tephi = dict(
+            xylim=xylim,
+            figure=figure.add_subplot(self),
+            profiles=isopleths.ProfileList(index=spatial.ProfileIndex()),
+            transform=transform,
+            # The running extent of all profiles, in native coordinates.
+            bbox=mtransforms.Bbox.null(),
+            # The nesting depth of deferred autoscaling.
+            defer=0,
+            # The positional and keyword arguments of the legend, if any,
+            # and whether it requires to be built.
+            legend=None,
+            legend_stale=False,
+            # The artists added to the axes, by type.
+            artists={},
+            # Whether to draw the static artists from a cached background,
+            # the cached background, the identity of the dynamic artists
+            # excluded while it is drawn, and whether the axes are drawing.
+            blit=blit,
+            background=None,
+            exclude=None,
+            drawing=False,
+            # The canvas callbacks of draft mode, whether a mouse button is
+            # held, and whether a draft has been drawn since it was pressed.
+            draft=[],
+            drafting=False,
+            drafted=False,
+        )
+        self.set_draft(draft)
+
+        # Create each axis.
+        self.axis["isotherm"] = self.new_floating_axis(1, 0)
+        self.axis["theta"] = self.new_floating_axis(0, 0)
+        self.axis["left"].get_helper().nth_coord_ticks = 0
+        self.axis["left"].toggle(all=True)
+        self.axis["bottom"].get_helper().nth_coord_ticks = 1
+        self.axis["bottom"].toggle(all=True)
+        self.axis["top"].get_helper().nth_coord_ticks = 0
+        self.axis["top"].toggle(all=False)  # Turned-off
+        self.axis["right"].get_helper().nth_coord_ticks = 1
+        self.axis["right"].toggle(all=True)
+        self.gridlines.set_linestyle("solid")
+
+        # Configure each axis.
+        axis = self.axis["left"]
+        axis.major_ticklabels.set_fontsize(10)
+        axis.major_ticklabels.set_va("baseline")
+        axis.major_ticklabels.set_rotation(135)
+        axis = self.axis["right"]
+        axis.major_ticklabels.set_fontsize(10)
+        axis.major_ticklabels.set_va("baseline")
+        axis.major_ticklabels.set_rotation(-135)
+        self.axis["top"].major_ticklabels.set_fontsize(10)
+        axis = self.axis["bottom"]
+        axis.major_ticklabels.set_fontsize(10)
+        axis.major_ticklabels.set_ha("left")
+        axis.major_ticklabels.set_va("bottom")
+        axis.major_ticklabels.set_rotation(-45)
+
+        # Isotherms: lines of constant temperature (degC).
+        axis = self.axis["isotherm"]
+        axis.set_axis_direction("right")
+        axis.set_axislabel_direction("-")
+        axis.major_ticklabels.set_rotation(90)
+        axis.major_ticklabels.set_fontsize(8)
+        axis.major_ticklabels.set_va("bottom")
+        axis.major_ticklabels.set_color("grey")
+        axis.major_ticklabels.set_visible(False)  # Turned-off
+        axis.major_ticklabels.set_clip_box(self.bbox)
+
+        # Dry adiabats: lines of constant potential temperature (degC).
+        axis = self.axis["theta"]
+        axis.set_axis_direction("right")
+        axis.set_axislabel_direction("+")
+        axis.major_ticklabels.set_fontsize(8)
+        axis.major_ticklabels.set_va("bottom")
+        axis.major_ticklabels.set_color("grey")
+        axis.major_ticklabels.set_visible(False)  # Turned-off
+        axis.major_ticklabels.set_clip_box(self.bbox)
+        axis.line.set_linewidth(3)
+        axis.line.set_linestyle("--")
+
+        # Lock down the aspect ratio.
+        self.set_aspect("equal")
+        self.grid(True)
+
+        # Initialise the text formatter for the navigation status bar.
+        self.format_coord = self._status_bar
+
+        # Center the plot around the xylim extent.
+        if xylim is not None:
+            xylim = np.asarray(xylim)
+            if xylim.shape != (2, 2):
+                msg = (
+                    "Invalid xylim, expecting [(BLHC-T, BLHC-t),"
+                    "(TRHC-T, TRHC-t)]"
+                )
+                raise ValueError(msg)
+            xlim, ylim = transforms.convert_Tt2xy(xylim[:, 0], xylim[:, 1])
+            self.set_xlim(xlim)
+            self.set_ylim(ylim)
+            self.tephi["xylim"] = xlim, ylim
+
+    def add_artist(self, a):
+        result = super(TephiAxes, self).add_artist(a)
+        if hasattr(self, "tephi"):
+            self.tephi["artists"].setdefault(type(a), []).append(a)
+        return result
+
+    def _search_artists(self, artist):
+        # Prune the registered artists that have since been removed.
+        list_of_relevant_artists = [
+            a for a in self.tephi["artists"].get(artist, []) if a.axes is self
+        ]
+        self.tephi["artists"][artist] = list_of_relevant_artists
+        if len(list_of_relevant_artists) == 1:
+            return list_of_relevant_artists[0]
+        elif len(list_of_relevant_artists) == 0:
+            return None
+        else:
+            raise ValueError(f"Found more than one {artist} artist.")
+
+    @property
+    def wet_adiabat(self):
+        return self._search_artists(WetAdiabatArtist)
+
+    @wet_adiabat.setter
+    def wet_adiabat(self, artist):
+        if type(artist) is WetAdiabatArtist:
+            old_artist = self._search_artists(WetAdiabatArtist)
+            if old_artist:
+                old_artist.remove()
+            self.add_artist(artist)
+        else:
+            raise ValueError(f"Artist {artist} is not of type {WetAdiabatArtist}.")
+
+    @property
+    def isobar(self):
+        return self._search_artists(IsobarArtist)
+
+    @isobar.setter
+    def isobar(self, artist):
+        if type(artist) is IsobarArtist:
+            old_artist = self._search_artists(IsobarArtist)
+            if old_artist:
+                old_artist.remove()
+            self.add_artist(artist)
+        else:
+            raise ValueError(f"Artist {artist} is not of type {IsobarArtist}.")
+
+    @property
+    def mixing_ratio(self):
+        return self._search_artists(HumidityMixingRatioArtist)
+
+    @mixing_ratio.setter
+    def mixing_ratio(self, artist):
+        if type(artist) is HumidityMixingRatioArtist:
+            old_artist = self._search_artists(HumidityMixingRatioArtist)
+            if old_artist:
+                old_artist.remove()
+            self.add_artist(artist)
+        else:
+            raise ValueError(f"Artist {artist} is not of type {HumidityMixingRatioArtist}.")
+
+    def plot(self, data, metadata=None, **kwargs):
+        """
+        Plot the profile of the pressure and temperature data points.
+
+        The pressure and temperature data points are transformed into
+        potential temperature and temperature data points before plotting.
+
+        By default, the tephigram will automatically center the plot around
+        all profiles.
+
+        .. warning::
+            Pressure data points must be in units of mb or hPa, and temperature
+            data points must be in units of degC.
+
+        Args:
+
+        * data:
+            Pressure and temperature pair data points.
+
+        Kwargs:
+
+        * metadata:
+            Mapping of hashable metadata, such as the station, valid time
+            or ensemble member, by which the profile may be selected from
+            ``tephi["profiles"]``, see
+            :meth:`~tephi.isopleths.ProfileList.select`.
+
+        .. note::
+            All other keyword arguments are passed through to
+            :func:`matplotlib.pyplot.plot`.
+
+        .. plot::
+            :include-source:
+
+            import matplotlib.pyplot as plt
+            from tephi import TephiAxes
+
+            ax = TephiAxes()
+            data = [[1006, 26.4], [924, 20.3], [900, 19.8],
+                    [850, 14.5], [800, 12.9], [755, 8.3]]
+            profile = ax.plot(data, color='red', linestyle='--',
+                              linewidth=2, marker='o')
+            barbs = [(10, 45, 900), (20, 60, 850), (25, 90, 800)]
+            profile.barbs(barbs)
+            plt.show()
+
+        For associating wind barbs with the profile, see
+        :meth:`~tephi.isopleths.Profile.barbs`.
+
+        """
+        profile = isopleths.Profile(self, data, metadata=metadata)
+        profile.plot(**kwargs)
+        self.tephi["profiles"].append(profile)
+        self._update_extents(profile.points)
+
+        # Center the tephigram plot around all the profiles.
+        self._autoscale()
+
+        # Show the plot legend, which is built when the plot is drawn.
+        if "label" in kwargs:
+            self._legend_stale()
+
+        return profile
+
+    def plot_many(self, data, metadata=None, **kwargs):
+        """
+        Plot many profiles of pressure and temperature data points at once.
+
+        The profiles are transformed together, and drawn as a single
+        :class:`matplotlib.collections.LineCollection`, which is much faster
+        than plotting each profile in turn, such as for the members of an
+        ensemble or a month of soundings. The profiles are registered as one
+        :class:`~tephi.isopleths.ProfileGroup`, which supports picking and
+        highlighting of its members.
+
+        .. warning::
+            Pressure data points must be in units of mb or hPa, and temperature
+            data points must be in units of degC.
+
+        Args:
+
+        * data:
+            Array with shape (N, L, 2), or a sequence of N sequences of
+            pressure and temperature pair data points, of differing lengths.
+
+        Kwargs:
+
+        * metadata:
+            Mapping of hashable metadata by which the group may be selected
+            from ``tephi["profiles"]``.
+
+        .. note::
+            All other keyword arguments are passed through to
+            :class:`matplotlib.collections.LineCollection`. Use ``colors``
+            for per-profile colours.
+
+        .. plot::
+            :include-source:
+
+            import matplotlib.pyplot as plt
+            import numpy as np
+            from tephi import TephiAxes
+
+            ax = TephiAxes()
+            pressure = np.linspace(1000, 300, 20)
+            temperature = np.linspace(20, -40, 20)
+            members = [np.column_stack([pressure, temperature + offset])
+                       for offset in np.linspace(-5, 5, 51)]
+            group = ax.plot_many(members, linewidth=0.5)
+            plt.show()
+
+        Returns:
+            The :class:`~tephi.isopleths.ProfileGroup`.
+
+        """
+        group = isopleths.ProfileGroup(self, data, metadata=metadata)
+        group.plot(**kwargs)
+        self.tephi["profiles"].append(group)
+        self._update_extents(group.points)
+
+        # Center the tephigram plot around all the profiles.
+        self._autoscale()
+
+        # Show the plot legend, which is built when the plot is drawn.
+        if "label" in kwargs:
+            self._legend_stale()
+
+        return group
+
+    def add_isobars(
+            self,
+            ticks=None,
+            line=None,
+            text=None,
+            min_theta=None,
+            max_theta=None,
+            nbins=None,
+    ):
+        self.isobar = artists.IsobarArtist(
+            ticks=ticks,
+            line=line,
+            text=text,
+            min_theta=min_theta,
+            max_theta=max_theta,
+            nbins=nbins,
+        )
+
+    def add_wet_adiabats(
+            self,
+            ticks=None,
+            line=None,
+            text=None,
+            min_temperature=None,
+            max_pressure=None,
+            nbins=None,
+    ):
+        self.wet_adiabat = artists.WetAdiabatArtist(
+            ticks=ticks,
+            line=line,
+            text=text,
+            min_temperature=min_temperature,
+            max_pressure=max_pressure,
+            nbins=nbins,
+        )
+
+    def add_mixing_ratios(
+            self,
+            ticks=None,
+            line=None,
+            text=None,
+            min_pressure=None,
+            max_pressure=None,
+            nbins=None,
+    ):
+        self.mixing_ratio = artists.HumidityMixingRatioArtist(
+            ticks=ticks,
+            line=line,
+            text=text,
+            min_pressure=min_pressure,
+            max_pressure=max_pressure,
+            nbins=nbins,
+        )
+
+    def add_parcel(
+            self,
+            pressure,
+            temperature,
+            dewpoint,
+            kind="surface",
+            line=None,
+            cape=None,
+            cin=None,
+    ):
+        """
+        Overlay the path of a lifted parcel, and its shaded areas of CAPE
+        and CIN, for a single sounding.
+
+        See :class:`~tephi.artists.ParcelArtist` for the arguments.
+
+        Returns:
+            The :class:`~tephi.artists.ParcelArtist`.
+
+        """
+        artist = artists.ParcelArtist(
+            pressure,
+            temperature,
+            dewpoint,
+            kind=kind,
+            line=line,
+            cape=cape,
+            cin=cin,
+        )
+        self.add_artist(artist)
+        return artist
+
+    def add_density(self, data=None, extent=None, bins=None, image=None):
+        """
+        Show the density of a large collection of profiles as a single
+        image beneath the isopleths.
+
+        See :class:`~tephi.artists.DensityArtist` for the arguments. Further
+        profiles may be accumulated with
+        :meth:`~tephi.artists.DensityArtist.add`.
+
+        By default, when no profiles have been plotted, the tephigram is
+        centered around the extent of the density image.
+
+        Returns:
+            The :class:`~tephi.artists.DensityArtist`.
+
+        """
+        artist = artists.DensityArtist(
+            data, extent=extent, bins=bins, image=image
+        )
+        self.add_artist(artist)
+        if (
+            self.tephi["xylim"] is None
+            and not self.tephi["profiles"]
+            and artist.extent is not None
+        ):
+            x0, x1, y0, y1 = artist.extent
+            self.set_xlim(x0, x1)
+            self.set_ylim(y0, y1)
+        return artist
+
+    def add_envelope(
+            self,
+            data,
+            levels=None,
+            percentiles=None,
+            color=None,
+            median=None,
+            band=None,
+    ):
+        """
+        Summarise the members of an ensemble by shaded percentile bands and
+        a median line, such as of temperature or dew-point.
+
+        See :class:`~tephi.artists.EnvelopeArtist` for the arguments.
+
+        .. plot::
+            :include-source:
+
+            import matplotlib.pyplot as plt
+            import numpy as np
+            from tephi import TephiAxes
+
+            ax = TephiAxes()
+            pressure = np.linspace(1000, 300, 20)
+            temperature = np.linspace(20, -40, 20)
+            members = [np.column_stack([pressure, temperature + offset])
+                       for offset in np.random.normal(0, 3, 51)]
+            ax.plot(members[0], color="black")
+            ax.add_envelope(members, color="red")
+            plt.show()
+
+        Returns:
+            The :class:`~tephi.artists.EnvelopeArtist`.
+
+        """
+        artist = artists.EnvelopeArtist(
+            data,
+            levels=levels,
+            percentiles=percentiles,
+            color=color,
+            median=median,
+            band=band,
+        )
+        self.add_artist(artist)
+        return artist
+
+    def add_indices(
+            self,
+            pressure,
+            temperature,
+            dewpoint,
+            text=None,
+            position=None,
+    ):
+        """
+        Tabulate the stability indices of a single sounding.
+
+        See :class:`~tephi.artists.IndexTableArtist` for the arguments, and
+        :func:`tephi.indices.calculate` for the indices.
+
+        Returns:
+            The :class:`~tephi.artists.IndexTableArtist`.
+
+        """
+        artist = artists.IndexTableArtist(
+            pressure, temperature, dewpoint, text=text, position=position
+        )
+        self.add_artist(artist)
+        return artist
+
+    def nearest_profile(self, x_point, y_point, radius=None):
+        """
+        Find the nearest point of a visible profile, using the spatial index
+        of the profiles.
+
+        Args:
+
+        * x_point, y_point:
+            The point in native tephigram coordinates, such as the
+            ``xdata`` and ``ydata`` of a mouse event.
+
+        Kwargs:
+
+        * radius:
+            The greatest distance, in points, of the nearest profile.
+            Defaults to the profile pick radius.
+
+        Returns:
+            A :data:`tephi.spatial.NEAREST` namedtuple, or None if there is
+            no profile within the radius.
+
+        """
+        if radius is None:
+            radius = default.get("isopleth_picker")
+        pixels = self.figure.dpi / 72.0 * radius
+        origin, corner = self.transData.inverted().transform(
+            [(0, 0), (pixels, pixels)]
+        )
+        distance = np.max(np.abs(corner - origin))
+        index = self.tephi["profiles"].index
+        return index.nearest(x_point, y_point, distance)
+
+    def pick(self, mouseevent):
+        # Pick the profiles through their spatial index, rather than
+        # testing the line of every profile.
+        profiles = self.tephi["profiles"]
+        for artist in self.get_children():
+            if profiles.profile_for(artist) is not None:
+                continue
+            axes = getattr(artist, "axes", None)
+            if (
+                mouseevent.inaxes is None
+                or axes is None
+                or mouseevent.inaxes == axes
+            ):
+                artist.pick(mouseevent)
+        if mouseevent.inaxes is not self or mouseevent.xdata is None:
+            return
+        nearest = self.nearest_profile(mouseevent.xdata, mouseevent.ydata)
+        if nearest is not None and nearest.profile.line.pickable():
+            if isinstance(nearest.profile, isopleths.ProfileGroup):
+                ind = nearest.member
+            else:
+                ind = nearest.segment
+            canvas = self.figure.canvas
+            event = PickEvent(
+                "pick_event",
+                canvas,
+                mouseevent,
+                nearest.profile.line,
+                ind=np.array([ind]),
+            )
+            canvas.callbacks.process(event.name, event)
+
+    def _status_bar(self, x_point, y_point):
+        """
+        Generate text for the interactive backend navigation status bar.
+
+        Along with the temperature, potential temperature and pressure under
+        the cursor, this shows the saturation mixing ratio and the wet-bulb
+        potential temperature of the wet adiabat through the cursor, and the
+        temperature at the cursor pressure of the nearest profile. Each is a
+        closed form, table lookup or prepared interpolation, so the text is
+        cheap to generate on every mouse motion event.
+
+        """
+        temperature, theta = transforms.convert_xy2Tt(x_point, y_point)
+        pressure, _ = transforms.convert_Tt2pT(temperature, theta)
+        ratio = thermo.mixing_ratio(pressure, temperature)
+        theta_w = thermo.saturated_theta_w(pressure, temperature)
+        text = (
+            "T={:.2f}\u00b0C, \u03b8={:.2f}\u00b0C, p={:.2f}hPa, "
+            "r={:.2f}g/kg, \u03b8w={:.2f}\u00b0C"
+        )
+        text = text.format(
+            float(temperature),
+            float(theta),
+            float(pressure),
+            float(ratio),
+            float(theta_w),
+        )
+        # Read out the profile under the cursor, at the cursor pressure.
+        nearest = self.nearest_profile(x_point, y_point)
+        if nearest is not None:
+            profile = nearest.profile
+            if isinstance(profile, isopleths.ProfileGroup):
+                value = profile.temperature_at(pressure, nearest.member)
+            else:
+                value = profile.temperature_at(pressure)
+            value, level = float(value), float(pressure)
+            if not np.isfinite(value):
+                # The cursor is beyond the end of the profile.
+                value, level = nearest.temperature, nearest.pressure
+            metadata = " ".join(
+                "{}={}".format(key, val)
+                for key, val in profile.metadata.items()
+            )
+            profile = "profile{} T={:.2f}\u00b0C, p={:.2f}hPa".format(
+                " " + metadata if metadata else "", value, level
+            )
+            text = "{} [{}]".format(text, profile)
+        return text
+
+    def _legend_stale(self):
+        """Flag the legend to be rebuilt when the plot is next drawn."""
+        if self.tephi["legend"] is None:
+            self.tephi["legend"] = ((), {})
+        self.tephi["legend_stale"] = True
+        self.stale = True
+
+    def legend(self, *args, **kwargs):
+        """
+        Place a legend on the tephigram.
+
+        The legend is built immediately. Otherwise, plotting a labelled
+        profile builds the legend once, when the plot is next drawn, which
+        avoids rebuilding it after every plot. The arguments given here,
+        including any handles and labels, are reused whenever the legend is
+        rebuilt.
+
+        .. note::
+            All arguments are passed through to
+            :meth:`matplotlib.axes.Axes.legend`, with defaults from
+            :data:`tephi.constants.default`.
+
+        Returns:
+            The :class:`matplotlib.legend.Legend`.
+
+        """
+        self.tephi["legend"] = (args, kwargs)
+        self.tephi["legend_stale"] = False
+        legend_kwargs = dict(default.get("legend"))
+        legend_kwargs.update(kwargs)
+        return super(TephiAxes, self).legend(*args, **legend_kwargs)
+
+    def get_children(self):
+        children = super(TephiAxes, self).get_children()
+        exclude = getattr(self, "tephi", {}).get("exclude")
+        if exclude:
+            children = [
+                child for child in children if id(child) not in exclude
+            ]
+        return children
+
+    def set_blit(self, blit):
+        """
+        Set whether to draw the tephigram from a cached background.
+
+        In blit mode, the isopleths, gridlines, axes and other static
+        artists are rendered once per view, size and DPI, and the pixel
+        buffer is cached. Each draw then restores the cached background and
+        redraws only the dynamic artists, which are the profile lines,
+        highlights and barbs, on top of it. The cache is invalidated when
+        the view, size or DPI changes, or when a static artist changes or
+        is added or removed.
+
+        .. note::
+            The dynamic artists are always drawn over the static artists,
+            whatever their zorder. Blit mode requires an Agg based canvas,
+            and is bypassed when saving a figure.
+
+        Args:
+
+        * blit:
+            Whether to enable blit mode.
+
+        """
+        self.tephi["blit"] = bool(blit)
+        self.tephi["background"] = None
+        self.stale = True
+
+    def set_draft(self, draft):
+        """
+        Set whether to draw the tephigram in draft quality while a mouse
+        button is held, such as when panning or zooming.
+
+        In draft mode, pressing a mouse button within the axes starts
+        drafting, which draws the isopleths through every few of their
+        points, without their labels and label bbox patches, and draws a
+        reduced set of barbs. Releasing the button draws the tephigram once
+        more in full quality.
+
+        Args:
+
+        * draft:
+            Whether to enable draft mode.
+
+        """
+        canvas = self.figure.canvas
+        for cid in self.tephi["draft"]:
+            canvas.mpl_disconnect(cid)
+        self.tephi["draft"] = []
+        self.tephi["drafting"] = False
+        if draft:
+            self.tephi["draft"] = [
+                canvas.mpl_connect("button_press_event", self._draft_press),
+                canvas.mpl_connect(
+                    "button_release_event", self._draft_release
+                ),
+            ]
+
+    def _draft_press(self, event):
+        if event.inaxes is self:
+            self.tephi["drafting"] = True
+            self.tephi["drafted"] = False
+
+    def _draft_release(self, event):
+        if self.tephi["drafting"]:
+            self.tephi["drafting"] = False
+            if self.tephi["drafted"]:
+                # Restore the full quality tephigram.
+                self.stale = True
+                self.figure.canvas.draw_idle()
+
+    def _dynamic_artists(self):
+        """The profile lines, highlights and barbs of the tephigram."""
+        dynamic = []
+        for profile in self.tephi["profiles"]:
+            artists = [profile.line, profile._highlight]
+            barbs = getattr(profile, "_barbs", None)
+            if barbs is not None:
+                artists.append(barbs)
+            for artist in artists:
+                if artist is not None and artist.axes is self:
+                    dynamic.append(artist)
+        return dynamic
+
+    def _background_key(self, renderer, dynamic):
+        """The state of the view which the cached background depends on."""
+        exclude = {id(artist) for artist in dynamic}
+        static = tuple(
+            id(child)
+            for child in super(TephiAxes, self).get_children()
+            if id(child) not in exclude
+        )
+        return (
+            tuple(self.viewLim.bounds),
+            tuple(self.bbox.bounds),
+            self.figure.dpi,
+            renderer.get_canvas_width_height(),
+            self.tephi["drafting"],
+            static,
+        )
+
+    def _static_stale(self, artist, value):
+        """Drop the cached background when a static artist changes."""
+        # Ignore the artists which update themselves as they are drawn.
+        if not self.tephi["drawing"]:
+            self.tephi["background"] = None
+        martist._stale_axes_callback(artist, value)
+
+    def _draw_background(self, renderer, dynamic, key):
+        """Draw the static artists, and cache the pixels of the axes."""
+        exclude = {id(artist) for artist in dynamic}
+        self.tephi["exclude"] = exclude
+        try:
+            super(TephiAxes, self).draw(renderer)
+            bbox = self.get_tightbbox(renderer)
+        finally:
+            self.tephi["exclude"] = None
+        # Pad the region to keep the antialiased edges of the axes.
+        bbox = mtransforms.Bbox.intersection(bbox.padded(2), self.figure.bbox)
+        if bbox is None:
+            bbox = self.bbox
+        region = renderer.copy_from_bbox(bbox)
+        # Watch the static artists for changes.
+        for child in super(TephiAxes, self).get_children():
+            if id(child) not in exclude and child.stale_callback in (
+                None,
+                martist._stale_axes_callback,
+            ):
+                child.stale_callback = self._static_stale
+        self.tephi["background"] = key, bbox, region
+
+    def _draw_dynamic(self, renderer, dynamic):
+        for artist in sorted(dynamic, key=lambda artist: artist.zorder):
+            artist.draw(renderer)
+
+    def draw(self, renderer):
+        if self.tephi["legend_stale"]:
+            args, kwargs = self.tephi["legend"]
+            self.legend(*args, **kwargs)
+        if self.tephi["drafting"]:
+            self.tephi["drafted"] = True
+        if (
+            not self.tephi["blit"]
+            or not self.get_visible()
+            or self.figure.canvas.is_saving()
+            or not hasattr(renderer, "copy_from_bbox")
+        ):
+            super(TephiAxes, self).draw(renderer)
+            return
+        self._unstale_viewLim()
+        locator = self.get_axes_locator()
+        self.apply_aspect(locator(self, renderer) if locator else None)
+        dynamic = self._dynamic_artists()
+        key = self._background_key(renderer, dynamic)
+        background = self.tephi["background"]
+        self.tephi["drawing"] = True
+        try:
+            if background is None or background[0] != key:
+                self._draw_background(renderer, dynamic, key)
+            else:
+                renderer.restore_region(background[2])
+            renderer.open_group("axes", gid=self.get_gid())
+            self._draw_dynamic(renderer, dynamic)
+            renderer.close_group("axes")
+        finally:
+            self.tephi["drawing"] = False
+        self.stale = False
+
+    def blit(self):
+        """
+        Redraw the dynamic artists over the cached background, and blit the
+        axes to the canvas, without drawing the rest of the figure.
+
+        This is the fast path for interactive updates to the profiles, such
+        as highlighting on hover. The canvas is drawn in full instead, when
+        there is no valid cached background.
+
+        """
+        canvas = self.figure.canvas
+        background = self.tephi["background"]
+        renderer = getattr(canvas, "get_renderer", lambda: None)()
+        if renderer is None or not self.tephi["blit"]:
+            canvas.draw_idle()
+            return
+        dynamic = self._dynamic_artists()
+        key = self._background_key(renderer, dynamic)
+        if background is None or background[0] != key:
+            canvas.draw()
+            return
+        canvas.restore_region(background[2])
+        self.tephi["drawing"] = True
+        try:
+            self._draw_dynamic(renderer, dynamic)
+        finally:
+            self.tephi["drawing"] = False
+        canvas.blit(background[1])
+        self.stale = False
+
+    def _update_extents(self, points):
+        """
+        Extend the running extent of all profiles with the points of a new
+        profile, rather than rescanning every profile.
+
+        """
+        x_points, y_points = transforms.convert_Tt2xy(
+            points.temperature, points.theta
+        )
+        xy = np.column_stack([np.ravel(x_points), np.ravel(y_points)])
+        self.tephi["bbox"].update_from_data_xy(xy, ignore=False)
+
+    def _autoscale(self):
+        """
+        Center the tephigram plot around all the profiles, unless the
+        extent is fixed or autoscaling is deferred.
+
+        """
+        if self.tephi["xylim"] is None and not self.tephi["defer"]:
+            if np.all(np.isfinite(self.tephi["bbox"].extents)):
+                xlim, ylim = self._calculate_extents(
+                    xfactor=0.25, yfactor=0.05
+                )
+                self.set_xlim(xlim)
+                self.set_ylim(ylim)
+
+    @contextmanager
+    def defer_autoscale(self):
+        """
+        Defer centering the tephigram plot around the profiles until the
+        end of a batch of plots.
+
+        For example:
+
+            >>> import numpy as np
+            >>> from tephi import TephiAxes
+            >>> ax = TephiAxes()
+            >>> pressure = np.linspace(1000, 300, 20)
+            >>> with ax.defer_autoscale():
+            ...     for offset in range(50):
+            ...         temperature = np.linspace(20, -40, 20) + offset
+            ...         _ = ax.plot(np.column_stack([pressure, temperature]))
+
+        """
+        self.tephi["defer"] += 1
+        try:
+            yield self
+        finally:
+            self.tephi["defer"] -= 1
+            self._autoscale()
+
+    def reset(self):
+        """
+        Remove the profiles, barbs, labels, legend and other user artists
+        from the tephigram, so that it may be reused for another plot.
+
+        The isopleth artists and their cached geometry, the gridlines and
+        each axis, and any fixed ``xylim`` extent are kept.
+
+        For example:
+
+            >>> from tephi import TephiAxes
+            >>> ax = TephiAxes()
+            >>> ax.add_isobars()
+            >>> _ = ax.plot([(1000, 20), (850, 10), (700, 0)])
+            >>> ax.reset()
+            >>> len(ax.tephi["profiles"]), len(ax.lines)
+            (0, 0)
+
+        """
+        profiles = self.tephi["profiles"]
+        for profile in profiles:
+            if profile.has_highlight():
+                profile.highlight(False)
+        profiles.clear()
+
+        user = [
+            artist
+            for artist in self.artists
+            if not isinstance(artist, artists.IsoplethArtist)
+        ]
+        for container in (
+            self.lines,
+            self.collections,
+            self.patches,
+            self.images,
+            self.texts,
+            self.tables,
+            user,
+        ):
+            for artist in list(container):
+                artist.remove()
+        legend = self.get_legend()
+        if legend is not None:
+            legend.remove()
+        for title in (self.title, self._left_title, self._right_title):
+            title.set_text("")
+
+        # Prune the registered artists that have been removed.
+        registry = self.tephi["artists"]
+        for kind, registered in registry.items():
+            registry[kind] = [
+                artist for artist in registered if artist.axes is self
+            ]
+        # Clear the extent in place, as it may be shared with other axes.
+        self.tephi["bbox"].set_points(mtransforms.Bbox.null().get_points())
+        self.tephi.update(legend=None, legend_stale=False)
+        self.stale = True
+
+    def _calculate_extents(self, xfactor=None, yfactor=None):
+        if self.tephi["xylim"] is not None:
+            xlim, ylim = self.tephi["xylim"]
+        else:
+            bbox = self.tephi["bbox"]
+            min_x, max_x = bbox.x0, bbox.x1
+            min_y, max_y = bbox.y0, bbox.y1
+
+            if xfactor is not None:
+                delta_x = max_x - min_x
+                min_x, max_x = (
+                    (min_x - xfactor * delta_x),
+                    (max_x + xfactor * delta_x),
+                )
+
+            if yfactor is not None:
+                delta_y = max_y - min_y
+                min_y, max_y = (
+                    (min_y - yfactor * delta_y),
+                    (max_y + yfactor * delta_y),
+                )
+
+            xlim, ylim = (min_x, max_x), (min_y, max_y)
+
+        return xlim, ylim
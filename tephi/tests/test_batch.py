@@ -0,0 +1,151 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the batch rendering provided by tephi.batch.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import os.path
+
+import pytest
+
+from tephi import batch
+from tephi.isopleths import BarbArtist
+
+_COMMA = ("pressure", "temperature", "wind_direction", "wind_speed")
+_WINDS = ("pressure", "dewpoint", "wind_speed", "wind_direction")
+
+
+class TestExpand(tests.TephiTest):
+    def test_glob(self):
+        pattern = tests.get_data_path("[bdt]*s.txt")
+        result = batch.expand(pattern)
+        expected = [
+            tests.get_data_path(name)
+            for name in ("barbs.txt", "dews.txt", "temps.txt")
+        ]
+        assert result == expected
+
+    def test_literal(self):
+        filenames = ["missing.txt", tests.get_data_path("dews.txt")]
+        assert batch.expand(filenames) == filenames
+
+
+class TestWorker(tests.TephiTest):
+    def setup_method(self):
+        self.options = dict(
+            column_titles=None,
+            delimiter=None,
+            dpi=50,
+            figsize=None,
+            format="png",
+            isopleths=batch.ISOPLETHS,
+        )
+
+    def test_reuse(self, tmp_path):
+        worker = batch._Worker(self.options)
+        (axes,) = worker.pool._idle
+        isopleths = axes.isobar._isopleths
+        assert isopleths is not None
+        for name in ("dews.txt", "temps.txt"):
+            filename, target, error, *times = worker.render(
+                tests.get_data_path(name), str(tmp_path / "image.png")
+            )
+            assert error is None
+            assert os.path.isfile(target)
+            assert worker.pool._idle == [axes]
+            assert len(axes.tephi["profiles"]) == 0
+            assert not axes.lines
+        assert axes.isobar._isopleths is isopleths
+        # The setup time is only reported with the first file.
+        assert worker.setup == 0
+
+    def test_barbs(self, tmp_path):
+        self.options["column_titles"] = _WINDS
+        worker = batch._Worker(self.options)
+        (axes,) = worker.pool._idle
+        result = worker.render(
+            tests.get_data_path("barbs.txt"), str(tmp_path / "barbs.png")
+        )
+        assert result[2] is None
+        assert not any(isinstance(a, BarbArtist) for a in axes.artists)
+        assert not axes.tephi["artists"].get(BarbArtist)
+        assert axes.get_legend() is None
+
+
+class TestRenderFiles(tests.TephiTest):
+    def test_in_process(self, tmp_path):
+        pattern = tests.get_data_path("[dt]*.txt")
+        result = batch.render_files(pattern, output=str(tmp_path), workers=1)
+        assert sorted(os.listdir(tmp_path)) == ["dews.png", "temps.png"]
+        assert result.failed == {}
+        assert len(result.filenames) == 2
+        assert result.timings.setup > 0
+        assert result.timings.wall >= result.timings.save
+
+    def test_failed(self, tmp_path):
+        filenames = [
+            tests.get_data_path("dews.txt"),
+            tests.get_data_path("missing.txt"),
+        ]
+        result = batch.render_files(filenames, output=str(tmp_path), workers=1)
+        assert result.filenames == [str(tmp_path / "dews.png")]
+        assert list(result.failed) == [filenames[1]]
+        assert "OSError" in result.failed[filenames[1]]
+
+    def test_pool(self, tmp_path):
+        filenames = [
+            tests.get_data_path(name)
+            for name in ("dews.txt", "temps.txt", "comma_sep.txt")
+        ]
+        result = batch.render_files(
+            filenames,
+            output=str(tmp_path),
+            workers=2,
+            chunksize=2,
+            format="svg",
+            column_titles=_COMMA,
+            delimiter=",",
+            isopleths=("isobars",),
+        )
+        # Only the comma separated file has these columns and delimiter.
+        assert list(result.failed) == filenames[:2]
+        assert os.listdir(tmp_path) == ["comma_sep.svg"]
+
+    def test_same_stem(self, tmp_path):
+        filenames = []
+        for directory in ("a", "b/c"):
+            filename = tmp_path / "data" / directory / "dews.txt"
+            filename.parent.mkdir(parents=True)
+            with open(tests.get_data_path("dews.txt")) as fh:
+                filename.write_text(fh.read())
+            filenames.append(str(filename))
+        filenames.append(tests.get_data_path("temps.txt"))
+        output = tmp_path / "images"
+        result = batch.render_files(filenames, output=str(output), workers=1)
+        assert result.failed == {}
+        # Only the files of the same stem keep their relative directory.
+        assert result.filenames == [
+            str(output / "a" / "dews.png"),
+            str(output / "b" / "c" / "dews.png"),
+            str(output / "temps.png"),
+        ]
+        assert all(os.path.isfile(name) for name in result.filenames)
+
+    def test_same_image(self, tmp_path):
+        filenames = [
+            tests.get_data_path("dews.txt"),
+            tests.get_data_path("dews.csv"),
+        ]
+        with pytest.raises(ValueError, match="same image"):
+            batch.render_files(filenames, output=str(tmp_path), workers=1)
+        assert os.listdir(tmp_path) == []
+
+    def test_unknown_isopleths(self, tmp_path):
+        with pytest.raises(ValueError):
+            batch.render_files([], output=str(tmp_path), isopleths=["dry"])
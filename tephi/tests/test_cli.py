@@ -0,0 +1,57 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the tephi command line interface provided by tephi.cli.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import os
+
+import pytest
+
+from tephi import cli
+
+
+class TestRender(tests.TephiTest):
+    def test_render(self, tmp_path, capsys):
+        argv = [
+            "render",
+            "--output",
+            str(tmp_path),
+            "--workers",
+            "1",
+            "--dpi",
+            "40",
+            "--columns",
+            "pressure,dewpoint,wind_speed,wind_direction",
+            "--isopleths",
+            "isobars,mixing_ratios",
+            tests.get_data_path("barbs.txt"),
+        ]
+        assert cli.main(argv) == 0
+        assert os.listdir(tmp_path) == ["barbs.png"]
+        out = capsys.readouterr().out
+        assert out.startswith("Rendered 1 of 1 files")
+        for stage in ("setup", "load", "plot", "save"):
+            assert stage in out
+
+    def test_failed(self, tmp_path, capsys):
+        argv = [
+            "render",
+            "-o",
+            str(tmp_path),
+            "-j",
+            "1",
+            tests.get_data_path("missing.txt"),
+        ]
+        assert cli.main(argv) == 1
+        assert "Failed" in capsys.readouterr().err
+
+    def test_command_required(self):
+        with pytest.raises(SystemExit):
+            cli.main([])
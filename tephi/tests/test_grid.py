@@ -0,0 +1,128 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the small multiples of tephigrams provided by tephi.grid.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+from matplotlib.figure import Figure
+from mpl_toolkits.axisartist.grid_finder import MaxNLocator
+import numpy as np
+import pytest
+
+from tephi import TephiAxes, TephiGrid, artists, render
+
+_DATA = [(1000, 20), (850, 10), (700, 0), (500, -20)]
+
+
+class TestTephiGrid(tests.TephiTest):
+    def test_axes(self):
+        grid = TephiGrid(2, 3, figure=Figure())
+        assert len(grid) == 6
+        assert grid.axes.shape == (2, 3)
+        assert all(isinstance(axes, TephiAxes) for axes in grid)
+        assert grid[1, 2].get_subplotspec().num1 == 5
+        assert all(axes.figure is grid.figure for axes in grid)
+
+    def test_shared_grid_finder(self):
+        grid = TephiGrid(2, 2, figure=Figure(), isotherm_locator=5)
+        finders = {id(axes.get_grid_helper().grid_finder) for axes in grid}
+        assert len(finders) == 1
+        finder = grid[0, 0].get_grid_helper().grid_finder
+        transform = finder.get_transform()
+        for axes in grid:
+            assert axes.tephi["transform"]._a is transform
+        assert isinstance(finder.grid_locator1.locator, MaxNLocator)
+
+    def test_shared_geometry(self):
+        grid = TephiGrid(2, 2, figure=Figure())
+        grid.add_isobars()
+        grid.add_wet_adiabats()
+        render(grid.figure)
+        for name in ("isobar", "wet_adiabat"):
+            first = getattr(grid[0, 0], name)._isopleths
+            for axes in grid:
+                isopleths = getattr(axes, name)._isopleths
+                for isopleth, shared in zip(isopleths, first):
+                    assert isopleth.geometry is shared.geometry
+                    assert isopleth.axes is axes
+                    if axes is not grid[0, 0]:
+                        assert isopleth is not shared
+
+    def test_matches_separate_axes(self):
+        expected = Figure(figsize=(6, 3), dpi=50)
+        for index in (1, 2):
+            axes = TephiAxes((1, 2, index), figure=expected)
+            axes.add_isobars()
+            axes.add_mixing_ratios(line=dict(color="red"))
+            axes.plot(_DATA[index - 1 :])
+        grid = TephiGrid(1, 2, figure=Figure(figsize=(6, 3), dpi=50))
+        grid.add_isobars()
+        grid.add_mixing_ratios(line=dict(color="red"))
+        for index, axes in enumerate(grid):
+            axes.plot(_DATA[index:])
+        self.assertArrayEqual(render(grid.figure), render(expected))
+
+    def test_share(self):
+        grid = TephiGrid(2, 2, figure=Figure(), share=True)
+        grid[0, 0].plot(_DATA[:2])
+        grid[1, 1].plot(_DATA[2:])
+        expected = TephiAxes(figure=Figure())
+        expected.plot(_DATA)
+        bbox = grid[0, 0].tephi["bbox"]
+        self.assertArrayAlmostEqual(
+            bbox.extents, expected.tephi["bbox"].extents
+        )
+        for axes in grid:
+            assert axes.tephi["bbox"] is bbox
+            self.assertArrayAlmostEqual(axes.get_xlim(), expected.get_xlim())
+            self.assertArrayAlmostEqual(axes.get_ylim(), expected.get_ylim())
+
+    def test_unshared(self):
+        grid = TephiGrid(1, 2, figure=Figure())
+        grid[0, 0].plot(_DATA[:2])
+        grid[0, 1].plot(_DATA[2:])
+        assert grid[0, 0].get_xlim() != grid[0, 1].get_xlim()
+
+    def test_reset(self):
+        grid = TephiGrid(1, 2, figure=Figure(), share=True)
+        grid.add_isobars()
+        for axes in grid:
+            axes.plot(_DATA)
+        grid.reset()
+        assert all(len(axes.tephi["profiles"]) == 0 for axes in grid)
+        assert all(axes.isobar is not None for axes in grid)
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            TephiGrid(0, 2, figure=Figure())
+
+
+class TestShare(tests.TephiTest):
+    def test_type(self):
+        with pytest.raises(TypeError):
+            artists.IsobarArtist().share(artists.WetAdiabatArtist())
+
+    def test_copy(self):
+        first = TephiAxes(figure=Figure())
+        second = TephiAxes(figure=Figure())
+        first.add_isobars()
+        second.add_isobars()
+        second.isobar.share(first.isobar)
+        for axes in (first, second):
+            axes.plot(_DATA)
+        render(first)
+        render(second)
+        # The isobar of 850 hPa, which is drawn.
+        isobar = first.isobar._isopleths[4]
+        copy = second.isobar._isopleths[4]
+        assert isobar.data == 850
+        assert copy.points is isobar.points
+        assert copy.line is not isobar.line
+        assert copy.line.axes is None
+        assert copy._kwargs["line"] is not isobar._kwargs["line"]
@@ -0,0 +1,125 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the tephigram curvilinear grid support provided by tephi.grid_finder.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import inspect
+
+from matplotlib.transforms import Bbox
+from mpl_toolkits.axisartist import grid_finder as mgrid_finder
+import numpy as np
+import pytest
+
+from tephi import Locator, TephiAxes, _FormatterIsotherm
+from tephi.grid_finder import ExtremeFinder, GridFinder, GridHelper
+from tephi.transforms import TephiTransformInverted
+
+
+class _CountingFormatter(_FormatterIsotherm):
+    def __init__(self):
+        self.values = []
+
+    def __call__(self, direction, factor, values):
+        self.values.extend(values)
+        return super(_CountingFormatter, self).__call__(
+            direction, factor, values
+        )
+
+
+class TestPrivateOverrides(tests.TephiTest):
+    # The private methods of matplotlib which the grid finder and extreme
+    # finder override, which are only called by matplotlib itself.
+    @pytest.mark.parametrize(
+        "parent, child, name",
+        [
+            (mgrid_finder.GridFinder, GridFinder, "_format_ticks"),
+            (mgrid_finder.GridFinder, GridFinder, "_get_raw_grid_lines"),
+            (
+                mgrid_finder.ExtremeFinderSimple,
+                ExtremeFinder,
+                "_find_transformed_bbox",
+            ),
+        ],
+    )
+    def test_parent(self, parent, child, name):
+        assert hasattr(parent, name)
+        expected = inspect.signature(getattr(parent, name))
+        assert inspect.signature(getattr(child, name)) == expected
+
+
+class TestExtremeFinder(tests.TephiTest):
+    def test_exact(self):
+        bbox = Bbox.from_extents(-20, 180, 60, 260)
+        trans = TephiTransformInverted()
+        result = ExtremeFinder(padding=0)._find_transformed_bbox(trans, bbox)
+        x, y = np.meshgrid(
+            np.linspace(bbox.x0, bbox.x1, 201),
+            np.linspace(bbox.y0, bbox.y1, 201),
+        )
+        sampled = trans.transform(np.column_stack([x.ravel(), y.ravel()]))
+        self.assertArrayAlmostEqual(result.min, sampled.min(axis=0))
+        self.assertArrayAlmostEqual(result.max, sampled.max(axis=0))
+
+    def test_matches_sampled(self):
+        bbox = Bbox.from_extents(-20, 180, 60, 260)
+        trans = TephiTransformInverted()
+        result = ExtremeFinder()._find_transformed_bbox(trans, bbox)
+        finder = mgrid_finder.ExtremeFinderSimple(20, 20)
+        expected = finder._find_transformed_bbox(trans, bbox)
+        self.assertArrayAlmostEqual(result.extents, expected.extents)
+
+
+class TestGridFinder(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.formatter = _CountingFormatter()
+        self.finder = GridFinder(
+            grid_locator1=Locator(10),
+            grid_locator2=Locator(10),
+            tick_formatter1=self.formatter,
+        )
+        self.bbox = Bbox.from_extents(-20, 180, 60, 260)
+
+    def test_grid_lines(self):
+        lon_values, lat_values = [-10.0, 0.0, 10.0], [20.0, 30.0]
+        extremes = Bbox.from_extents(-40, -10, 50, 120)
+        result = self.finder._get_raw_grid_lines(
+            lon_values, lat_values, extremes
+        )
+        expected = mgrid_finder.GridFinder._get_raw_grid_lines(
+            self.finder, lon_values, lat_values, extremes
+        )
+        for lines, expected_lines in zip(result, expected):
+            for line, expected_line in zip(lines, expected_lines):
+                self.assertArrayAlmostEqual(line, expected_line)
+
+    def test_cached(self):
+        grid_info = self.finder.get_grid_info(self.bbox)
+        assert self.finder.get_grid_info(self.bbox.frozen()) is grid_info
+
+    def test_update(self):
+        grid_info = self.finder.get_grid_info(self.bbox)
+        self.finder.update(grid_locator1=Locator(5))
+        assert self.finder.get_grid_info(self.bbox) is not grid_info
+
+    def test_labels_memoised(self):
+        labels = self.finder._format_ticks(1, "left", 1, [0.0, 10.0])
+        assert labels == _FormatterIsotherm()("left", 1, [0.0, 10.0])
+        self.finder._format_ticks(1, "left", 1, [10.0, 20.0])
+        assert self.formatter.values == [0.0, 10.0, 20.0]
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephiAxes(tests.TephiTest):
+    def test_grid_helper(self):
+        tephigram = TephiAxes()
+        assert isinstance(tephigram.get_grid_helper(), GridHelper)
+        grid_finder = tephigram.get_grid_helper().grid_finder
+        assert isinstance(grid_finder.extreme_finder, ExtremeFinder)
@@ -0,0 +1,82 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the lazy imports of the tephi package.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import json
+import subprocess
+import sys
+
+import pytest
+
+import tephi
+
+# The plotting dependencies, which are imported on first use.
+_PLOTTING = ("matplotlib", "mpl_toolkits", "scipy", "shapely")
+
+_SCRIPT = """
+import json, sys
+
+
+def imported():
+    return dict(
+        plotting=sorted(
+            {name.split(".")[0] for name in sys.modules} & set(%r)
+        ),
+        submodules=sorted(
+            name for name in sys.modules if name.startswith("tephi.")
+        ),
+    )
+
+
+import tephi
+package = imported()
+import tephi.indices, tephi.parcel, tephi.resample, tephi.thermo
+import tephi.transforms
+print(json.dumps(dict(package=package, physics=imported())))
+"""
+
+
+@pytest.fixture(scope="module")
+def result():
+    # Import tephi in a fresh interpreter, once for all the tests.
+    output = subprocess.run(
+        [sys.executable, "-c", _SCRIPT % (_PLOTTING,)],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+class TestImports(tests.TephiTest):
+    def test_package(self, result):
+        # Importing the package imports none of its submodules.
+        assert result["package"] == dict(plotting=[], submodules=[])
+
+    def test_physics(self, result):
+        assert result["physics"]["plotting"] == []
+        assert "tephi.tephigram" not in result["physics"]["submodules"]
+
+    def test_lazy(self):
+        from tephi.tephigram import Locator, TephiAxes
+        from tephi.transforms import TephiTransform
+
+        assert tephi.TephiAxes is TephiAxes
+        assert tephi.Locator is Locator
+        assert tephi.artists.IsobarArtist is tephi.IsobarArtist
+        assert tephi.transforms.TephiTransform is TephiTransform
+        assert "TephiAxes" in dir(tephi)
+
+    def test_unknown(self):
+        with pytest.raises(AttributeError):
+            tephi.unknown
+        with pytest.raises(AttributeError):
+            tephi.transforms.unknown
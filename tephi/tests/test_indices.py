@@ -0,0 +1,86 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the batched stability indices provided by tephi.indices.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import numpy as np
+import pytest
+
+from tephi import TephiAxes, indices, parcel, thermo
+import tephi.constants as constants
+
+
+PRESSURE = np.array([1000, 925, 850, 700, 600, 500, 400, 300.0])
+TEMPERATURE = np.array([30, 25, 20, 8, 0, -10, -22, -40.0])
+DEWPOINT = np.array([22, 19, 14, 0, -8, -20, -32, -50.0])
+
+
+class TestIndices(tests.TephiTest):
+    def test_mandatory_levels(self):
+        result = indices.calculate(PRESSURE, TEMPERATURE, DEWPOINT)
+        assert result.k_index == pytest.approx(20 + 10 + 14 - 8)
+        assert result.total_totals == pytest.approx(20 + 14 + 20)
+
+    def test_lifted(self):
+        result = indices.calculate(PRESSURE, TEMPERATURE, DEWPOINT)
+        expected = -10 - parcel.lift([500.0], 850.0, 20.0, 14.0)
+        assert result.showalter == pytest.approx(expected[0])
+        assert result.lifted_index < 0
+
+    def test_precipitable_water(self):
+        # A constant mixing ratio gives a closed form precipitable water.
+        dewpoint = thermo._dewpoint(
+            PRESSURE * 0.01 / constants.E
+        ) - constants.KELVIN
+        result = indices.precipitable_water(PRESSURE, dewpoint)
+        expected = 0.01 * (PRESSURE[0] - PRESSURE[-1]) * 100 / constants.G
+        assert result == pytest.approx(expected)
+
+    def test_precipitable_water_missing(self):
+        dewpoint = np.full_like(PRESSURE, np.nan)
+        assert np.isnan(indices.precipitable_water(PRESSURE, dewpoint))
+        pressure = np.vstack([PRESSURE, PRESSURE])
+        dewpoint = np.vstack([DEWPOINT, dewpoint])
+        result = indices.precipitable_water(pressure, dewpoint)
+        assert np.isfinite(result[0])
+        assert np.isnan(result[1])
+
+    def test_batch(self):
+        pressure = np.vstack([PRESSURE, PRESSURE])
+        temperature = np.vstack([TEMPERATURE, TEMPERATURE - 2])
+        dewpoint = np.vstack([DEWPOINT, DEWPOINT - 4])
+        # The second sounding does not reach 500 mb.
+        for array in (pressure, temperature, dewpoint):
+            array[1, 4:] = np.nan
+        result = indices.calculate(pressure, temperature, dewpoint)
+        assert result.k_index.shape == (2,)
+        single = indices.calculate(PRESSURE, TEMPERATURE, DEWPOINT)
+        for column, expected in zip(result, single):
+            assert column[0] == pytest.approx(expected)
+        assert np.isnan(result.k_index[1])
+        assert np.isnan(result.showalter[1])
+        assert np.isfinite(result.precipitable_water[1])
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestIndexTableArtist(tests.TephiTest):
+    def test_draw(self):
+        tephigram = TephiAxes()
+        tephigram.plot(np.column_stack([PRESSURE, TEMPERATURE]))
+        artist = tephigram.add_indices(PRESSURE, TEMPERATURE, DEWPOINT)
+        tephigram.figure.canvas.draw()
+        text = artist._text.get_text()
+        assert len(text.splitlines()) == len(indices.INDICES._fields)
+        assert text.startswith("K-index")
+
+    def test_batch_invalid(self):
+        pressure = np.vstack([PRESSURE, PRESSURE])
+        with pytest.raises(ValueError):
+            TephiAxes().add_indices(pressure, pressure, pressure)
@@ -0,0 +1,176 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the vectorised parcel diagnostics provided by tephi.parcel.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import numpy as np
+import pytest
+
+from tephi import TephiAxes, parcel, thermo
+from tephi.isopleths import BOUNDS, WetAdiabat
+import tephi.constants as constants
+
+
+PRESSURE = np.array(
+    [1000, 950, 900, 850, 800, 700, 600, 500, 400, 300, 250, 200, 150, 100.0]
+)
+TEMPERATURE = np.array(
+    [30, 26, 22, 18, 15, 8, 0, -10, -22, -38, -48, -58, -62, -65.0]
+)
+DEWPOINT = np.array(
+    [22, 20, 17, 12, 8, -2, -12, -25, -35, -50, -60, -70, -75, -80.0]
+)
+
+
+def _batch():
+    """A batch of two soundings, the second shorter and drier."""
+    pressure = np.vstack([PRESSURE, PRESSURE])
+    temperature = np.vstack([TEMPERATURE, TEMPERATURE - 5])
+    dewpoint = np.vstack([DEWPOINT, DEWPOINT - 5])
+    for array in (pressure, temperature, dewpoint):
+        array[1, -3:] = np.nan
+    return pressure, temperature, dewpoint
+
+
+class TestSoundings(tests.TephiTest):
+    def test_as_soundings(self):
+        (pressure, temperature), single = parcel.as_soundings(
+            PRESSURE.astype(int), TEMPERATURE
+        )
+        assert single
+        assert pressure.shape == temperature.shape == (1, PRESSURE.size)
+        assert pressure.dtype == np.float64
+        batch = np.stack([PRESSURE, PRESSURE])
+        (pressure,), single = parcel.as_soundings(batch)
+        assert not single
+        self.assertArrayEqual(pressure, batch)
+
+    def test_as_soundings_invalid(self):
+        with pytest.raises(ValueError):
+            parcel.as_soundings(PRESSURE, TEMPERATURE[:-1])
+        with pytest.raises(ValueError):
+            parcel.as_soundings(PRESSURE.reshape(1, 1, -1))
+
+    def test_mixed_layer_start(self):
+        start = parcel.mixed_layer_start(PRESSURE, TEMPERATURE, DEWPOINT)
+        assert all(np.ndim(value) == 0 for value in start)
+        result = parcel.mixed_layer(PRESSURE, TEMPERATURE, DEWPOINT)
+        expected = (result.pressure, result.temperature, result.dewpoint)
+        self.assertArrayAlmostEqual(start, expected)
+        batch = [np.stack([array] * 2) for array in (PRESSURE, TEMPERATURE)]
+        start = parcel.mixed_layer_start(
+            *batch, np.stack([DEWPOINT] * 2), depth=50.0
+        )
+        assert all(np.shape(value) == (2,) for value in start)
+        result = parcel.mixed_layer(
+            PRESSURE, TEMPERATURE, DEWPOINT, depth=50.0
+        )
+        expected = (result.pressure, result.temperature, result.dewpoint)
+        for value in np.transpose(start):
+            self.assertArrayAlmostEqual(value, expected)
+
+
+class TestLift(tests.TephiTest):
+    def test_lcl_is_saturated(self):
+        result = parcel.surface_based(PRESSURE, TEMPERATURE, DEWPOINT)
+        # The dry adiabat and mixing ratio line meet at the LCL.
+        kelvin = result.lcl_temperature + constants.KELVIN
+        theta = (TEMPERATURE[0] + constants.KELVIN) * (
+            result.lcl_pressure / PRESSURE[0]
+        ) ** constants.K
+        self.assertArrayAlmostEqual(kelvin, theta)
+        self.assertArrayAlmostEqual(
+            thermo.mixing_ratio(result.lcl_pressure, result.lcl_temperature),
+            thermo.mixing_ratio(PRESSURE[0], DEWPOINT[0]),
+        )
+
+    def test_saturated_adiabat(self):
+        adiabat = WetAdiabat.__new__(WetAdiabat)
+        adiabat.data = 20
+        adiabat.bounds = BOUNDS(-50, 1000.0)
+        adiabat._delta_pressure = -0.05
+        points = adiabat._generate_points()
+        pressure = np.asarray(points.pressure)[::2000]
+        temperature = np.asarray(points.temperature)[::2000]
+        result = parcel.lift(pressure, 1000.0, 20.0, 20.0)
+        self.assertArrayAlmostEqual(result, temperature, decimal=2)
+
+    def test_below_start(self):
+        result = parcel.lift(PRESSURE, 900.0, 22.0, 17.0)
+        assert np.all(np.isnan(result[:2]))
+        assert result[2] == pytest.approx(22.0)
+
+
+class TestDiagnostics(tests.TephiTest):
+    @pytest.mark.parametrize(
+        "func",
+        [parcel.surface_based, parcel.mixed_layer, parcel.most_unstable],
+    )
+    def test_batch_matches_single(self, func):
+        pressure, temperature, dewpoint = _batch()
+        batch = func(pressure, temperature, dewpoint)
+        for i in range(pressure.shape[0]):
+            valid = np.isfinite(pressure[i])
+            single = func(
+                pressure[i, valid], temperature[i, valid], dewpoint[i, valid]
+            )
+            for name in parcel.PARCEL._fields:
+                if name == "profile":
+                    actual = getattr(batch, name)[i, valid]
+                else:
+                    actual = getattr(batch, name)[i]
+                self.assertArrayAlmostEqual(actual, getattr(single, name))
+
+    def test_unstable(self):
+        result = parcel.surface_based(PRESSURE, TEMPERATURE, DEWPOINT)
+        assert result.cape > 1000
+        assert result.cin <= 0
+        assert result.lcl_pressure >= result.lfc_pressure
+        assert result.lfc_pressure > result.el_pressure
+
+    def test_stable(self):
+        temperature = TEMPERATURE + np.linspace(0, 60, PRESSURE.size)
+        result = parcel.surface_based(PRESSURE, temperature, DEWPOINT)
+        assert result.cape == 0
+        assert result.cin == 0
+        assert np.isnan(result.lfc_pressure)
+        assert np.isnan(result.el_pressure)
+
+    def test_most_unstable_layer(self):
+        dewpoint = DEWPOINT.copy()
+        dewpoint[0] = 0
+        result = parcel.most_unstable(PRESSURE, TEMPERATURE, dewpoint)
+        assert result.pressure == 950
+        result = parcel.most_unstable(
+            PRESSURE, TEMPERATURE, dewpoint, depth=10
+        )
+        assert result.pressure == 1000
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            parcel.surface_based(PRESSURE, TEMPERATURE, DEWPOINT[:-1])
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestParcelArtist(tests.TephiTest):
+    def test_draw(self):
+        tephigram = TephiAxes()
+        tephigram.plot(np.column_stack([PRESSURE, TEMPERATURE]))
+        artist = tephigram.add_parcel(PRESSURE, TEMPERATURE, DEWPOINT)
+        tephigram.figure.canvas.draw()
+        line, cape, cin = artist._artists
+        assert line.get_transform() == tephigram.tephi["transform"]
+        assert cape.get_facecolor()[0] == 1.0
+
+    def test_invalid_kind(self):
+        with pytest.raises(ValueError):
+            TephiAxes().add_parcel(
+                PRESSURE, TEMPERATURE, DEWPOINT, kind="wibble"
+            )
@@ -0,0 +1,73 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the pool of tephigrams provided by tephi.pool.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import pytest
+
+from tephi import TephiAxes
+from tephi.pool import TephiPool
+
+
+class TestTephiPool(tests.TephiTest):
+    def test_acquire_builds(self):
+        pool = TephiPool(size=2, isopleths=["isobars"])
+        axes = pool.acquire()
+        assert isinstance(axes, TephiAxes)
+        assert axes.isobar._isopleths is not None
+        assert axes.wet_adiabat is None
+        assert len(pool) == 0
+
+    def test_reuse(self):
+        pool = TephiPool(size=1, isopleths=["isobars"])
+        with pool.axes() as first:
+            first.plot([(1000, 20), (850, 10)])
+        with pool.axes() as second:
+            assert second is first
+            assert len(second.tephi["profiles"]) == 0
+            assert not second.lines
+        assert len(pool) == 1
+
+    def test_size(self):
+        pool = TephiPool(size=1, isopleths=[])
+        first, second = pool.acquire(), pool.acquire()
+        pool.release(first)
+        pool.release(second)
+        pool.release(first)
+        assert pool._idle == [first]
+
+    def test_fill(self):
+        pool = TephiPool(size=3, isopleths=[])
+        pool.fill(2)
+        assert len(pool) == 2
+        pool.fill(5)
+        assert len(pool) == 3
+        pool.clear()
+        assert len(pool) == 0
+
+    def test_released_on_error(self):
+        pool = TephiPool(size=1, isopleths=[])
+        with pytest.raises(ValueError):
+            with pool.axes() as axes:
+                axes.plot([(1000, 20), (850, 10)])
+                raise ValueError
+        assert pool._idle == [axes]
+        assert len(axes.tephi["profiles"]) == 0
+
+    def test_kwargs(self):
+        pool = TephiPool(isopleths=[], figsize=(4, 5), dpi=50, blit=True)
+        axes = pool.acquire()
+        assert tuple(axes.figure.get_size_inches()) == (4, 5)
+        assert axes.figure.dpi == 50
+        assert axes.tephi["blit"]
+
+    def test_unknown_isopleths(self):
+        with pytest.raises(ValueError):
+            TephiPool(isopleths=["dry_adiabats"])
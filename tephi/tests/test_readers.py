@@ -0,0 +1,333 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the readers of multi-sounding files.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import io
+
+from matplotlib.figure import Figure
+import numpy as np
+import pytest
+
+import tephi
+from tephi import readers
+from tephi.readers import (
+    IGRA2,
+    SOUNDING,
+    points,
+    read_igra2,
+    read_soundings,
+    read_wyoming,
+    winds,
+)
+
+COLUMNS = ("pressure", "temperature", "dewpoint")
+
+TEXT = """\
+# station A
+# time 00Z
+1000 20 15
+850 10 5
+
+# station B
+900 5 1 # surface
+800 0 -3
+700 -5 -9
+# trailing header
+"""
+
+
+class TestReadSoundings(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.filename = tephi.tests.get_data_path("soundings.txt")
+
+    def test_file(self):
+        soundings = list(read_soundings(self.filename, column_titles=COLUMNS))
+        assert len(soundings) == 3
+        sounding = soundings[0]
+        assert isinstance(sounding, SOUNDING)
+        assert sounding.header[0] == "station 03808 Camborne"
+        assert sounding.data._fields == COLUMNS
+        assert sounding.data.pressure.dtype == np.float32
+        self.assertArrayEqual(
+            sounding.data.pressure, [1006, 925, 850, 700, 500]
+        )
+        assert soundings[2].data.dewpoint[-1] == np.float32(-55.2)
+
+    def test_stream(self):
+        soundings = list(
+            read_soundings(io.StringIO(TEXT), column_titles=COLUMNS)
+        )
+        assert [sounding.header for sounding in soundings] == [
+            ["station A", "time 00Z"],
+            ["station B"],
+        ]
+        self.assertArrayEqual(soundings[0].data.temperature, [20, 10])
+        # Trailing comments are parsed value by value.
+        self.assertArrayEqual(soundings[1].data.pressure, [900, 800, 700])
+
+    def test_binary_stream(self):
+        stream = io.BytesIO(TEXT.encode())
+        soundings = list(read_soundings(stream, column_titles=COLUMNS))
+        assert len(soundings) == 2
+
+    def test_lazy(self):
+        stream = io.StringIO(TEXT)
+        soundings = read_soundings(stream, column_titles=COLUMNS)
+        next(soundings)
+        # Only the lines up to the header of the second sounding are read.
+        assert stream.tell() < len(TEXT)
+
+    def test_default_columns(self):
+        stream = io.StringIO("# header\n1000 20\n850 10\n")
+        (sounding,) = read_soundings(stream)
+        assert sounding.data._fields == ("pressure", "temperature")
+
+    def test_single_row(self):
+        stream = io.StringIO("# header\n1000 20\n")
+        (sounding,) = read_soundings(stream)
+        self.assertArrayEqual(sounding.data.pressure, [1000])
+
+    def test_delimiter_dtype(self):
+        stream = io.StringIO("# header\n1000, 20.5\n850, 10.5\n")
+        (sounding,) = read_soundings(stream, delimiter=",", dtype="i4")
+        assert sounding.data.temperature.dtype == np.int32
+        self.assertArrayEqual(sounding.data.temperature, [20, 10])
+
+    def test_callback(self):
+        calls = []
+
+        def callback(sounding):
+            calls.append(sounding.header[0])
+            return sounding.data.pressure.size
+
+        stream = io.StringIO(TEXT)
+        results = read_soundings(
+            stream, column_titles=COLUMNS, callback=callback
+        )
+        assert next(results) == 2
+        assert calls == ["station A"]
+        assert list(results) == [3]
+        assert calls == ["station A", "station B"]
+
+    def test_loadtxt_type(self):
+        (sounding,) = read_soundings(io.StringIO("# header\n1000 20\n"))
+        data = tephi.loadtxt(tephi.tests.get_data_path("dews.txt"))
+        # The data of a sounding is of the same namedtuple as loadtxt.
+        assert type(sounding.data) is type(data)
+        assert repr(sounding.data).startswith("tephidata(\n    pressure=")
+
+    def test_column_titles_string(self):
+        with pytest.raises(TypeError):
+            list(read_soundings(io.StringIO(TEXT), column_titles="pressure"))
+
+    def test_lazy_attribute(self):
+        assert tephi.read_soundings is read_soundings
+
+
+class TestNumbers(tests.TephiTest):
+    def test_values(self):
+        values = ["  12.5", "    -3", " -0.25", "      ", "1013.0", "    .5"]
+        table = np.frombuffer("".join(values).encode(), dtype=np.uint8)
+        result = readers._numbers(table.reshape(len(values), 6), 0, 6)
+        expected = [12.5, -3, -0.25, np.nan, 1013, 0.5]
+        np.testing.assert_array_equal(result, expected)
+
+    def test_exact(self):
+        generator = np.random.default_rng(0)
+        values = generator.uniform(-1000, 1000, 1000)
+        text = ["{:9.3f}".format(value) for value in values]
+        table = np.frombuffer("".join(text).encode(), dtype=np.uint8)
+        result = readers._numbers(table.reshape(len(text), 9), 0, 9)
+        expected = [float(item) for item in text]
+        np.testing.assert_array_equal(result, expected)
+
+
+class TestReadIGRA2(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.filename = tephi.tests.get_data_path("igra2.txt")
+
+    def test_header(self):
+        soundings = list(read_igra2(self.filename))
+        assert len(soundings) == 2
+        header = soundings[0].header
+        assert isinstance(header, IGRA2)
+        assert header.station == "GMM00010868"
+        assert (header.year, header.month, header.day) == (2024, 1, 1)
+        assert header.hour == 0
+        assert header.release_time == 2315
+        assert header.levels == 7
+        assert header.pressure_source == "ncdc6310"
+        assert header.latitude == 48.13
+        assert header.longitude == 11.77
+        assert soundings[1].header.hour == 12
+
+    def test_data(self):
+        (sounding, _) = read_igra2(self.filename)
+        data = sounding.data
+        assert data._fields == (
+            "pressure",
+            "temperature",
+            "dewpoint",
+            "wind_speed",
+            "wind_direction",
+        )
+        assert data.pressure.dtype == np.float32
+        expected = np.array(
+            [1013, 1000, 925, np.nan, 850, 700, 500], dtype="f4"
+        )
+        np.testing.assert_array_equal(data.pressure, expected)
+        assert data.temperature[0] == np.float32(12.4)
+        assert data.dewpoint[0] == np.float32(12.4 - 3.0)
+        # Missing values, and values removed by quality assurance.
+        assert np.isnan(data.temperature[3])
+        assert np.isnan(data.dewpoint[4])
+        assert np.isnan(data.wind_speed[5])
+        # Wind speeds are in knots.
+        np.testing.assert_allclose(data.wind_speed[1], 5.1 * 3600 / 1852)
+        assert data.wind_direction[1] == 210
+
+    def test_chunks(self):
+        expected = list(read_igra2(self.filename))
+        for chunksize in (1, 50, 200):
+            result = list(read_igra2(self.filename, chunksize=chunksize))
+            assert [item.header for item in result] == [
+                item.header for item in expected
+            ]
+            for item, other in zip(result, expected):
+                for column, expected_column in zip(item.data, other.data):
+                    np.testing.assert_array_equal(column, expected_column)
+
+    def test_streams(self):
+        with open(self.filename, "rb") as fh:
+            content = fh.read()
+        for stream in (io.BytesIO(content), io.StringIO(content.decode())):
+            soundings = list(read_igra2(stream, chunksize=64))
+            assert [item.header.levels for item in soundings] == [7, 3]
+
+    def test_crlf(self):
+        with open(self.filename, "rb") as fh:
+            content = fh.read().replace(b"\n", b"\r\n")
+        (sounding, _) = read_igra2(io.BytesIO(content))
+        assert sounding.header.longitude == 11.77
+        assert sounding.data.wind_direction[0] == 200
+
+    def test_masked(self):
+        (sounding, _) = read_igra2(self.filename, masked=True)
+        assert np.ma.isMaskedArray(sounding.data.pressure)
+        assert sounding.data.pressure.mask.tolist() == [
+            False,
+            False,
+            False,
+            True,
+            False,
+            False,
+            False,
+        ]
+
+    def test_lazy_attribute(self):
+        assert tephi.read_igra2 is read_igra2
+
+
+class TestReadWyoming(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.filename = tephi.tests.get_data_path("wyoming.txt")
+
+    def test_header(self):
+        soundings = list(read_wyoming(self.filename))
+        assert len(soundings) == 2
+        header = soundings[0].header
+        title = "72520 PIT Pittsburgh Observations at 00Z 01 Jan 2024"
+        assert header["title"] == title
+        assert header["Station identifier"] == "PIT"
+        assert header["Station latitude"] == 40.53
+        assert header["Showalter index"] == 3.21
+        assert soundings[1].header["Observation time"] == "240101/1200"
+
+    def test_data(self):
+        (sounding, _) = read_wyoming(self.filename)
+        data = sounding.data
+        expected = np.array([1000, 978, 925, 850, 700, 500, 400], dtype="f4")
+        np.testing.assert_array_equal(data.pressure, expected)
+        assert np.isnan(data.temperature[0])
+        assert data.temperature[1] == np.float32(-1.1)
+        assert np.isnan(data.dewpoint[-1])
+        assert data.dewpoint[-2] == np.float32(-45.3)
+        assert data.wind_speed[1] == 14
+        assert data.wind_direction[1] == 245
+
+    def test_text(self):
+        # The text of the page, without its HTML tags.
+        with open(self.filename) as fh:
+            text = readers._TAGS.sub("", fh.read())
+        soundings = list(read_wyoming(io.StringIO(text)))
+        assert [item.data.pressure.size for item in soundings] == [7, 3]
+
+    def test_untitled(self):
+        with open(self.filename) as fh:
+            lines = fh.read().splitlines()
+        start = next(
+            index for index, line in enumerate(lines) if "PRES" in line
+        )
+        text = "\n".join(lines[start - 1 : start + 10])
+        (sounding,) = read_wyoming(io.StringIO(text))
+        assert sounding.header == {}
+        assert sounding.data.pressure.size == 7
+
+    def test_binary_stream(self):
+        with open(self.filename, "rb") as fh:
+            soundings = list(read_wyoming(fh))
+        assert len(soundings) == 2
+
+    def test_masked(self):
+        (sounding, _) = read_wyoming(self.filename, masked=True)
+        assert sounding.data.temperature.mask[0]
+        assert not sounding.data.temperature.mask[1]
+
+
+class TestSelect(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        filename = tephi.tests.get_data_path("igra2.txt")
+        (self.sounding, _) = read_igra2(filename)
+
+    def test_points(self):
+        result = points(self.sounding.data)
+        np.testing.assert_array_equal(
+            result[:, 0], [1013, 1000, 925, 850, 700, 500]
+        )
+        result = points(self.sounding.data, "dewpoint")
+        assert result.shape == (5, 2)
+
+    def test_winds(self):
+        result = winds(self.sounding.data)
+        assert result.shape == (5, 3)
+        assert np.all(np.isfinite(result))
+
+    def test_masked(self):
+        filename = tephi.tests.get_data_path("igra2.txt")
+        (sounding, _) = read_igra2(filename, masked=True)
+        np.testing.assert_array_equal(
+            points(sounding.data), points(self.sounding.data)
+        )
+        np.testing.assert_array_equal(
+            winds(sounding.data), winds(self.sounding.data)
+        )
+
+    def test_plot(self):
+        axes = tephi.TephiAxes(figure=Figure())
+        profile = axes.plot(points(self.sounding.data))
+        profile.barbs(winds(self.sounding.data))
+        axes.figure.canvas.draw()
+        assert np.all(np.isfinite(axes.get_xlim()))
+        assert len(profile._barbs.barbs) == 5
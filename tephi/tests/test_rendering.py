@@ -0,0 +1,103 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the headless rendering provided by tephi.rendering.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+from concurrent.futures import ThreadPoolExecutor
+import io
+
+from matplotlib.backend_bases import FigureCanvasBase
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+import matplotlib.image as mimage
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+
+from tephi import TephiAxes, render
+
+
+class TestRender(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.figure = Figure(figsize=(4, 3), dpi=50)
+        self.tephigram = TephiAxes(figure=self.figure)
+        self.tephigram.add_isobars()
+        self.tephigram.plot([(1000, 20), (850, 10), (700, 0)])
+
+    def test_rgba_view(self):
+        FigureCanvasAgg(self.figure)
+        result = render(self.tephigram)
+        assert result.shape == (150, 200, 4)
+        assert result.dtype == np.uint8
+        assert not result.flags.writeable
+        buffer = np.asarray(self.figure.canvas.buffer_rgba())
+        assert np.shares_memory(result, buffer)
+
+    def test_png_matches_rgba(self):
+        rgba = render(self.figure).copy()
+        png = render(self.figure, format="png")
+        decoded = mimage.imread(io.BytesIO(png), format="png")
+        self.assertArrayEqual((decoded * 255).round().astype(np.uint8), rgba)
+
+    def test_encoded(self):
+        assert render(self.figure, format="svg").lstrip().startswith(b"<")
+        assert render(self.figure, format="pdf").startswith(b"%PDF")
+
+    def test_dpi(self):
+        result = render(self.figure, dpi=100)
+        assert result.shape == (300, 400, 4)
+        assert self.figure.dpi == 50
+        png = render(self.figure, format="png", dpi=100)
+        decoded = mimage.imread(io.BytesIO(png), format="png")
+        assert decoded.shape == (300, 400, 4)
+
+    def test_restores_canvas(self):
+        canvas = FigureCanvasBase(self.figure)
+        result = render(self.figure)
+        assert result.shape == (150, 200, 4)
+        assert self.figure.canvas is canvas
+
+    def test_rgba_kwargs(self):
+        with pytest.raises(TypeError):
+            render(self.figure, transparent=True)
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestRenderPyplot(tests.TephiTest):
+    def test_pyplot_figure(self):
+        figure = plt.figure(figsize=(2, 2), dpi=50)
+        tephigram = TephiAxes(figure=figure)
+        assert render(tephigram).shape == (100, 100, 4)
+
+
+class TestConcurrent(tests.TephiTest):
+    @staticmethod
+    def _render(offset):
+        figure = Figure(figsize=(4, 4), dpi=50)
+        tephigram = TephiAxes(figure=figure, xylim=[(-20, 0), (40, 60)])
+        tephigram.add_isobars()
+        tephigram.add_mixing_ratios()
+        pressure = np.linspace(1000, 300, 20)
+        temperature = np.linspace(20, -40, 20) + offset
+        profile = tephigram.plot(
+            np.column_stack([pressure, temperature]), label=str(offset)
+        )
+        profile.barbs([(10, 45, 900), (30, 90, 600)])
+        tephigram.set_title("offset {}".format(offset))
+        return render(figure).copy()
+
+    def test_thread_pool(self):
+        offsets = list(range(-4, 4, 2)) * 2
+        expected = [self._render(offset) for offset in offsets]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            result = list(executor.map(self._render, offsets))
+        for actual, image in zip(result, expected):
+            self.assertArrayEqual(actual, image)
@@ -0,0 +1,125 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the log-pressure resampling provided by tephi.resample.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import numpy as np
+import pytest
+
+from tephi import TephiAxes
+from tephi.resample import Interpolator, resample, stack
+
+
+class TestStack(tests.TephiTest):
+    def test_ragged(self):
+        result = stack([[1, 2, 3], [4], []])
+        expected = [[1, 2, 3], [4, np.nan, np.nan], [np.nan] * 3]
+        self.assertArrayEqual(result, np.array(expected))
+
+    def test_trailing(self):
+        result = stack([np.ones((2, 3)), np.zeros((1, 3))], fill_value=-1)
+        assert result.shape == (2, 2, 3)
+        self.assertArrayEqual(result[1, 1], [-1, -1, -1])
+
+    def test_mismatch(self):
+        with pytest.raises(ValueError):
+            stack([np.ones((2, 3)), np.ones((2, 2))])
+
+
+class TestResample(tests.TephiTest):
+    def test_matches_interp(self):
+        rng = np.random.default_rng(0)
+        pressure = np.sort(rng.uniform(100, 1050, (20, 15)), axis=1)[:, ::-1]
+        values = rng.normal(size=pressure.shape)
+        pressure[::3, -4:] = np.nan
+        levels = np.linspace(1050, 100, 40)
+        result = resample(pressure, values, levels)
+        assert result.shape == (20, 40)
+        for row, value, actual in zip(pressure, values, result):
+            valid = np.isfinite(row)
+            x = -np.log(row[valid])
+            expected = np.interp(-np.log(levels), x, value[valid])
+            outside = (levels > row[valid][0]) | (levels < row[valid][-1])
+            expected[outside] = np.nan
+            self.assertArrayAlmostEqual(actual, expected)
+
+    def test_ragged_matches_padded(self):
+        pressure = [[1000, 850, 700, 500], [900, 600]]
+        values = [[20, 10, 0, -20], [12, -5]]
+        padded = resample(stack(pressure), stack(values), [800, 650])
+        self.assertArrayEqual(resample(pressure, values, [800, 650]), padded)
+
+    def test_increasing_pressure(self):
+        pressure = np.array([1000, 850, 700, 500.0])
+        values = np.array([20, 10, 0, -20.0])
+        levels = [950, 750, 550]
+        expected = resample(pressure, values, levels)
+        result = resample(pressure[::-1], values[::-1], levels)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_trailing_fields(self):
+        pressure = np.array([[1000, 850, 700.0], [1000, 700, np.nan]])
+        temperature = np.array([[20, 10, 0], [15, 0, np.nan]])
+        dewpoint = temperature - 5
+        fields = np.stack([temperature, dewpoint], axis=-1)
+        result = resample(pressure, fields, [900, 800])
+        assert result.shape == (2, 2, 2)
+        self.assertArrayAlmostEqual(
+            result[..., 1], resample(pressure, dewpoint, [900, 800])
+        )
+
+    def test_single_profile(self):
+        result = resample([1000, 850, 700], [20, 10, 0], [850])
+        self.assertArrayAlmostEqual(result, [[10]])
+
+    def test_no_levels(self):
+        pressure = [[1000, 850, 700], [950, 800, np.nan]]
+        values = np.zeros((2, 3, 2), dtype="f4")
+        result = resample(pressure, values, [])
+        assert result.shape == (2, 0, 2)
+        assert result.dtype == np.float64
+        result = resample(pressure, values[..., 0], np.array([]))
+        assert result.shape == (2, 0)
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            resample([[1000, 850, 700]], [[20, 10]], [900])
+
+
+class TestInterpolator(tests.TephiTest):
+    def test_matches_resample(self):
+        pressure = np.array([700, 1000, np.nan, 850, 500])
+        temperature = np.array([0, 20, 5, 10, -20])
+        levels = [1050, 1000, 900, 600, 400]
+        expected = resample(pressure, temperature, levels)[0]
+        result = Interpolator(pressure, temperature)(levels)
+        self.assertArrayAlmostEqual(result, expected)
+
+    def test_empty(self):
+        result = Interpolator([np.nan], [10])(850)
+        assert np.isnan(result)
+
+    def test_shape_mismatch(self):
+        with pytest.raises(ValueError):
+            Interpolator([1000, 850], [20])
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestProfileList(tests.TephiTest):
+    def test_resample(self):
+        tephigram = TephiAxes()
+        tephigram.plot([(1000, 20), (850, 10), (700, 0)])
+        tephigram.plot([(900, 12), (600, -5)])
+        profiles = tephigram.tephi["profiles"]
+        result = profiles.resample([850, 700])
+        assert result.shape == (2, 2)
+        self.assertArrayAlmostEqual(result[0], [10, 0])
+        expected = profiles[1].resample([850, 700])
+        self.assertArrayAlmostEqual(result[1], expected)
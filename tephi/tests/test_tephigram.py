@@ -6,17 +6,24 @@
 Tests the tephigram plotting capability provided by tephi.
 
 """
+import re
+
 import matplotlib
+import matplotlib.backend_bases
+import matplotlib.quiver
 
 # Import tephi test package first so that some things can be initialised
 # before importing anything else.
 import tephi.tests as tests
 
+from matplotlib.figure import Figure
+import matplotlib.pyplot as plt
 import numpy as np
 import pytest
 
 import tephi
-from tephi import TephiAxes
+from tephi import TephiAxes, artists, isopleths, thermo, transforms
+from tephi.constants import default
 
 
 def _load_result(filename):
@@ -102,6 +109,117 @@ class TestTephigramLoadTxt(tests.TephiTest):
         assert dews.pressure[0].dtype == np.int32
         assert dews.temperature[0].dtype == np.int32
 
+    def test_workers(self):
+        filenames = [self.filename_dews, self.filename_temps] * 3
+        expected = tephi.loadtxt(*filenames)
+        result = tephi.loadtxt(*filenames, workers=4)
+        assert len(result) == len(expected)
+        for item, other in zip(result, expected):
+            self.assertArrayEqual(item, other)
+
+    def test_workers_column_titles(self):
+        columns = [
+            ("pressure", "dewpoint"),
+            ("pressure", "dewpoint", "wind_speed", "wind_direction"),
+        ]
+        dews, barbs = tephi.loadtxt(
+            self.filename_dews,
+            self.filename_barbs,
+            column_titles=columns,
+            workers=2,
+        )
+        assert dews._fields == columns[0]
+        assert barbs._fields == columns[1]
+        self.assertArrayEqual(barbs, _expected_barbs)
+
+    def test_class_reused(self):
+        dews = tephi.loadtxt(self.filename_dews)
+        temps = tephi.loadtxt(self.filename_temps)
+        assert type(dews) is type(temps)
+        assert repr(dews).startswith("tephidata(\n    pressure=")
+
+    def test_stacked(self):
+        columns = [
+            ("pressure", "dewpoint"),
+            ("pressure", "dewpoint", "wind_speed", "wind_direction"),
+        ]
+        result = tephi.loadtxt(
+            self.filename_temps,
+            self.filename_barbs,
+            column_titles=columns,
+            stacked=True,
+        )
+        temps = tephi.loadtxt(self.filename_temps)
+        rows = len(temps.pressure)
+        assert result.shape == (2, 4, max(rows, _expected_barbs.shape[1]))
+        assert result.dtype == np.float32
+        self.assertArrayEqual(result[0, :2, :rows], temps)
+        assert np.all(np.isnan(result[0, 2:]))
+        assert np.all(np.isnan(result[1, :, _expected_barbs.shape[1] :]))
+        self.assertArrayEqual(
+            result[1, :, : _expected_barbs.shape[1]], _expected_barbs
+        )
+
+    def test_stacked_dtype(self):
+        result = tephi.loadtxt(self.filename_dews, dtype="i4", stacked=True)
+        expected = tephi.loadtxt(self.filename_dews, dtype="i4")
+        assert result.dtype == np.float64
+        self.assertArrayEqual(result[0], expected)
+
+    def _fallback(self, filename, **kwargs):
+        return np.loadtxt(filename, dtype="f4", converters=float, **kwargs)
+
+    def test_fast(self):
+        for filename in (self.filename_dews, self.filename_barbs):
+            expected = self._fallback(filename)
+            result = tephi._fast_loadtxt(filename, None, "f4")
+            assert result.dtype == np.float32
+            self.assertArrayEqual(result, expected)
+
+    def test_fast_delimiter(self):
+        expected = self._fallback(self.filename_comma, delimiter=",")
+        result = tephi._fast_loadtxt(self.filename_comma, ",", "f4")
+        self.assertArrayEqual(result, expected)
+
+    def test_fast_dtype(self):
+        expected = np.loadtxt(self.filename_dews, dtype="i4", converters=float)
+        result = tephi._fast_loadtxt(self.filename_dews, None, "i4")
+        assert result.dtype == np.int32
+        self.assertArrayEqual(result, expected)
+
+    def test_fast_comments(self, tmp_path):
+        filename = tmp_path / "comments.txt"
+        filename.write_text("# header\n1000 20\n# surface\n900 10 # end\n")
+        assert tephi._fast_loadtxt(filename, None, "f4") is None
+        data = tephi.loadtxt(str(filename))
+        self.assertArrayEqual(data.pressure, [1000, 900])
+        self.assertArrayEqual(data.temperature, [20, 10])
+
+    def test_fast_unreadable(self, tmp_path):
+        # Python, but not the native parser, reads underscores in numbers.
+        filename = tmp_path / "underscores.txt"
+        filename.write_text("1_000 20\n900 10\n")
+        assert tephi._fast_loadtxt(filename, None, "f4") is None
+        data = tephi.loadtxt(str(filename))
+        self.assertArrayEqual(data.pressure, [1000, 900])
+
+    def test_fast_header(self, tmp_path):
+        filename = tmp_path / "header.txt"
+        filename.write_bytes(
+            b"\n# station \xb0\n  # pressure temperature\n\n"
+            b"1000 20\n\n900 10\n"
+        )
+        result = tephi._fast_loadtxt(filename, None, "f4")
+        self.assertArrayEqual(result, [[1000, 20], [900, 10]])
+
+    def test_fast_header_only(self, tmp_path):
+        filename = tmp_path / "header.txt"
+        filename.write_text("# pressure temperature\n")
+        with pytest.warns(UserWarning):
+            result = tephi._fast_loadtxt(filename, None, "f4")
+        assert result.size == 0
+
+
 @pytest.mark.graphical
 @pytest.mark.usefixtures("close_plot", "nodeid")
 class TestTephigramPlot(tests.GraphicsTest):
@@ -321,3 +439,836 @@ class TestSubplots(tests.GraphicsTest):
         tephi_two.plot(self.dews)
 
         self.check_graphic(nodeid)
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramPlotMany(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        pressure = np.linspace(1000, 300, 20)
+        temperature = np.linspace(20, -40, 20)
+        self.members = [
+            np.column_stack([pressure, temperature + offset])
+            for offset in range(5)
+        ]
+        self.members[-1] = self.members[-1][:10]
+        self.tephigram = TephiAxes()
+
+    def test_group(self):
+        group = self.tephigram.plot_many(self.members)
+        assert len(group) == 5
+        assert self.tephigram.tephi["profiles"] == [group]
+        assert len(group.line.get_segments()) == 5
+        assert group.line.get_transform() == self.tephigram.tephi["transform"]
+        assert len(group.line.get_segments()[-1]) == 10
+
+    def test_colors(self):
+        colors = ["red", "green", "blue", "black", "white"]
+        group = self.tephigram.plot_many(self.members, colors=colors)
+        self.assertArrayEqual(
+            group.line.get_colors(), matplotlib.colors.to_rgba_array(colors)
+        )
+
+    def test_matches_plot(self):
+        group = self.tephigram.plot_many(self.members)
+        profile = self.tephigram.plot(self.members[0])
+        points = profile.points
+        expected = np.column_stack([points.temperature, points.theta])
+        self.assertArrayAlmostEqual(group.line.get_segments()[0], expected)
+
+    def test_highlight(self):
+        group = self.tephigram.plot_many(self.members)
+        group.highlight(index=[1, 3])
+        self.assertArrayEqual(group.highlighted(), [1, 3])
+        assert self.tephigram.tephi["profiles"].highlighted() == [group]
+        assert self.tephigram.tephi["profiles"].picker(group.line) is group
+        group.highlight(False)
+        assert not group.has_highlight()
+
+    def test_invalid(self):
+        with pytest.raises(ValueError):
+            self.tephigram.plot_many([[1000, 20], [900, 10]])
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramEnvelope(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        pressure = np.linspace(1000, 300, 8)
+        temperature = np.linspace(20, -40, 8)
+        self.members = np.stack(
+            [
+                np.column_stack([pressure, temperature + offset])
+                for offset in range(11)
+            ]
+        )
+        self.tephigram = TephiAxes()
+
+    def test_quantiles(self):
+        envelope = self.tephigram.add_envelope(
+            self.members, levels=[1000, 600, 300]
+        )
+        temperature = np.linspace(20, -40, 8)[[0, 4, 7]]
+        expected = temperature + np.array([[1, 9, 2.5, 7.5, 5]]).T
+        self.assertArrayAlmostEqual(envelope.quantiles, expected)
+
+    def test_draw(self):
+        envelope = self.tephigram.add_envelope(self.members, color="red")
+        self.tephigram.figure.canvas.draw()
+        outer, inner, median = envelope._artists
+        transform = self.tephigram.tephi["transform"]
+        assert outer.get_transform() == transform
+        assert median.get_color() == "red"
+        self.assertArrayEqual(
+            inner.get_facecolor(), matplotlib.colors.to_rgba("red", 0.3)
+        )
+
+    def test_constant_artists(self):
+        members = np.repeat(self.members, 20, axis=0)
+        envelope = self.tephigram.add_envelope(members, median=False)
+        self.tephigram.figure.canvas.draw()
+        assert len(envelope._artists) == 2
+
+    def test_levels_outside_members(self):
+        envelope = self.tephigram.add_envelope(
+            self.members, levels=[1050, 1000, 500, 200]
+        )
+        self.assertArrayEqual(envelope.levels, [1000, 500])
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramDensity(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        rng = np.random.default_rng(0)
+        pressure = np.linspace(1000, 300, 8)
+        temperature = np.linspace(20, -40, 8) + rng.normal(size=(30, 1))
+        self.profiles = np.dstack(
+            [np.broadcast_to(pressure, temperature.shape), temperature]
+        )
+        self.tephigram = TephiAxes()
+
+    def test_incremental(self):
+        density = self.tephigram.add_density(self.profiles, bins=64)
+        extent = density.extent
+        expected = density.counts.copy()
+        density = self.tephigram.add_density(
+            self.profiles[:10], extent=extent, bins=64
+        )
+        density.add(self.profiles[10:])
+        assert density.count == 30
+        self.assertArrayAlmostEqual(density.counts, expected)
+
+    def test_segment_length(self):
+        density = artists.DensityArtist(
+            extent=(0, 100, 0, 100), bins=(100, 50)
+        )
+        x = np.array([10.5, 60.5])
+        y = np.array([20.5, 20.5])
+        temperature, theta = transforms.convert_xy2Tt(x, y)
+        pressure, _ = transforms.convert_Tt2pT(temperature, theta)
+        density.add([np.column_stack([pressure, temperature])])
+        assert density.counts.sum() == pytest.approx(50, abs=1e-6)
+        self.assertArrayEqual(np.nonzero(density.counts.sum(axis=1))[0], [10])
+
+    def test_clipped(self):
+        x0, y0 = transforms.convert_Tt2xy(0, 300)
+        density = artists.DensityArtist(
+            extent=(x0, x0 + 100, y0, y0 + 100), bins=(100, 50)
+        )
+        # A profile which enters the left of the histogram, and leaves from
+        # its top, with a segment wholly outside of it.
+        x = x0 + np.array([-50.5, 60.5, 60.5, 200.5])
+        y = y0 + np.array([20.5, 20.5, 150.5, 150.5])
+        temperature, theta = transforms.convert_xy2Tt(x, y)
+        pressure, _ = transforms.convert_Tt2pT(temperature, theta)
+        density.add([np.column_stack([pressure, temperature])])
+        # Only the lengths, in bins, of the segments inside the histogram are
+        # counted.
+        expected = 60.5 + 79.5 / 2
+        assert density.counts.sum() == pytest.approx(expected, abs=1e-6)
+        self.assertArrayEqual(np.nonzero(density.counts[:, 0])[0], [10])
+        rows, columns = np.nonzero(density.counts)
+        assert set(rows[columns < 60]) == {10}
+        assert set(columns[rows > 10]) == {60}
+        assert rows.max() == 49
+
+    def test_draw(self):
+        density = self.tephigram.add_density(self.profiles)
+        assert self.tephigram.get_xlim() == density.extent[:2]
+        self.tephigram.figure.canvas.draw()
+        assert density._image.get_zorder() < 0
+        assert density._image.get_array().count() > 0
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramExtents(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.dews = _expected_dews.T
+        self.temps = _expected_temps.T
+        self.tephigram = TephiAxes()
+
+    def test_running_extent(self):
+        self.tephigram.plot(self.dews)
+        self.tephigram.plot(self.temps)
+        x, y = transforms.convert_Tt2xy(
+            *transforms.convert_pT2Tt(
+                np.concatenate([self.dews[:, 0], self.temps[:, 0]]),
+                np.concatenate([self.dews[:, 1], self.temps[:, 1]]),
+            )
+        )
+        bbox = self.tephigram.tephi["bbox"]
+        self.assertArrayAlmostEqual(
+            bbox.extents, [x.min(), y.min(), x.max(), y.max()], decimal=3
+        )
+        dx, dy = 0.25 * (x.max() - x.min()), 0.05 * (y.max() - y.min())
+        self.assertArrayAlmostEqual(
+            self.tephigram.get_xlim(), [x.min() - dx, x.max() + dx], decimal=3
+        )
+        self.assertArrayAlmostEqual(
+            self.tephigram.get_ylim(), [y.min() - dy, y.max() + dy], decimal=3
+        )
+
+    def test_defer_autoscale(self, monkeypatch):
+        calls = []
+        calculate_extents = self.tephigram._calculate_extents
+
+        def counter(*args, **kwargs):
+            calls.append(args)
+            return calculate_extents(*args, **kwargs)
+
+        monkeypatch.setattr(self.tephigram, "_calculate_extents", counter)
+        with self.tephigram.defer_autoscale():
+            with self.tephigram.defer_autoscale():
+                self.tephigram.plot(self.dews)
+            self.tephigram.plot(self.temps)
+            assert not calls
+        assert len(calls) == 1
+        tephigram = TephiAxes()
+        tephigram.plot(self.dews)
+        tephigram.plot(self.temps)
+        self.assertArrayAlmostEqual(
+            self.tephigram.get_xlim(), tephigram.get_xlim()
+        )
+        self.assertArrayAlmostEqual(
+            self.tephigram.get_ylim(), tephigram.get_ylim()
+        )
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramLegend(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.dews = _expected_dews.T
+        self.temps = _expected_temps.T
+        self.tephigram = TephiAxes()
+
+    def test_deferred(self):
+        self.tephigram.plot(self.dews, label="dews")
+        self.tephigram.plot(self.temps, label="temps")
+        assert self.tephigram.get_legend() is None
+        self.tephigram.figure.canvas.draw()
+        legend = self.tephigram.get_legend()
+        labels = [text.get_text() for text in legend.get_texts()]
+        assert labels == ["dews", "temps"]
+        self.tephigram.figure.canvas.draw()
+        assert self.tephigram.get_legend() is legend
+
+    def test_targets_axes(self):
+        self.tephigram.plot(self.dews, label="dews")
+        other = TephiAxes(figure=plt.figure())
+        other.plot(self.temps)
+        self.tephigram.figure.canvas.draw()
+        other.figure.canvas.draw()
+        assert self.tephigram.get_legend() is not None
+        assert other.get_legend() is None
+
+    def test_explicit(self):
+        self.tephigram.plot(self.dews, label="dews")
+        legend = self.tephigram.legend(loc="lower left")
+        assert self.tephigram.get_legend() is legend
+        assert legend.shadow
+        self.tephigram.plot(self.temps, label="temps")
+        self.tephigram.figure.canvas.draw()
+        legend = self.tephigram.get_legend()
+        assert len(legend.get_texts()) == 2
+        assert legend._loc == 3
+
+    def test_explicit_handles(self):
+        dews = self.tephigram.plot(self.dews, label="dews")
+        self.tephigram.legend([dews.line], ["dew point"])
+        self.tephigram.plot(self.temps, label="temps")
+        self.tephigram.figure.canvas.draw()
+        legend = self.tephigram.get_legend()
+        labels = [text.get_text() for text in legend.get_texts()]
+        assert labels == ["dew point"]
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramProfileList(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.tephigram = TephiAxes()
+        self.profiles = self.tephigram.tephi["profiles"]
+        for station in ("03808", "03918"):
+            for member in range(3):
+                data = [(1000, 20 + member), (850, 10), (700, 0)]
+                self.tephigram.plot(
+                    data, metadata=dict(station=station, member=member)
+                )
+
+    def test_picker(self):
+        for profile in self.profiles:
+            assert self.profiles.picker(profile.line) is profile
+        with pytest.raises(ValueError):
+            self.profiles.picker(self.tephigram.patch)
+
+    def test_picker_replot(self):
+        profile = self.profiles[2]
+        line = profile.plot()
+        assert self.profiles.picker(line) is profile
+
+    def test_profile_for(self):
+        profile = self.profiles[2]
+        line = profile.line
+        assert self.profiles.profile_for(line) is profile
+        assert self.profiles.profile_for(self.tephigram.patch) is None
+        new = profile.plot()
+        # The replaced line is no longer indexed.
+        assert self.profiles.profile_for(new) is profile
+        assert self.profiles.profile_for(line) is None
+        assert set(self.profiles._by_artist) == {
+            id(item.line) for item in self.profiles
+        }
+
+    def test_select(self):
+        selected = self.profiles.select(station="03918", member=1)
+        assert selected == [self.profiles[4]]
+        assert self.profiles.select(station="03808") == self.profiles[:3]
+        assert self.profiles.select(station="wibble") == []
+
+    def test_hide_show(self):
+        self.profiles.hide(station="03808")
+        visible = [profile.line.get_visible() for profile in self.profiles]
+        assert visible == [False] * 3 + [True] * 3
+        self.profiles.show()
+        assert all(profile.line.get_visible() for profile in self.profiles)
+
+    def test_highlight(self):
+        self.profiles.highlight(True, member=0)
+        assert self.profiles.highlighted() == self.profiles[::3]
+        self.profiles[0].highlight(False)
+        self.profiles[1].highlight(True)
+        expected = [self.profiles[1], self.profiles[3]]
+        assert self.profiles.highlighted() == expected
+        selected = self.profiles.select(station="03808")
+        assert selected.highlighted() == [self.profiles[1]]
+        self.profiles[1].highlight(False)
+        assert selected.highlighted() == []
+
+    def test_highlighted_order(self):
+        # The highlighted profiles are in the order of the list, rather than
+        # the order in which they were highlighted.
+        for index in (4, 1, 5, 2):
+            self.profiles[index].highlight(True)
+        expected = [self.profiles[index] for index in (1, 2, 4, 5)]
+        assert self.profiles.highlighted() == expected
+
+    def test_select_order(self):
+        # Insert profiles out of the order in which they were indexed.
+        self.tephigram.plot(
+            [(1000, 20), (850, 10)], metadata=dict(station="03808", member=0)
+        )
+        self.profiles.insert(0, self.profiles.pop())
+        self.profiles.insert(2, self.profiles.pop())
+        self.profiles.append(self.profiles.pop(1))
+        for metadata in (
+            dict(station="03808"),
+            dict(station="03918"),
+            dict(member=0),
+            dict(station="03808", member=0),
+        ):
+            expected = [
+                profile
+                for profile in self.profiles
+                if metadata.items() <= profile.metadata.items()
+            ]
+            assert self.profiles.select(**metadata) == expected
+
+    def test_remove(self):
+        profile = self.profiles.pop(0)
+        assert profile not in self.profiles.select(station="03808")
+        with pytest.raises(ValueError):
+            self.profiles.picker(profile.line)
+        self.profiles.insert(0, profile)
+        assert self.profiles.picker(profile.line) is profile
+
+    def test_invalid(self):
+        with pytest.raises(TypeError):
+            self.profiles.append("wibble")
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramArtists(tests.TephiTest):
+    def test_replace(self):
+        tephigram = TephiAxes()
+        assert tephigram.isobar is None
+        tephigram.add_isobars()
+        first = tephigram.isobar
+        assert isinstance(first, artists.IsobarArtist)
+        tephigram.add_isobars()
+        assert tephigram.isobar is not first
+        assert first not in tephigram.artists
+
+    def test_defaults_copied(self):
+        tephigram = TephiAxes()
+        tephigram.add_isobars()
+        tephigram.add_wet_adiabats()
+        tephigram.add_mixing_ratios()
+        tephigram.figure.canvas.draw()
+        for name in ("isobar", "wet_adiabat", "mixing_ratio"):
+            artist = getattr(tephigram, name)
+            for key in ("line", "text"):
+                value = default["{}_{}".format(name, key)]
+                assert artist._kwargs[key] == value
+                assert artist._kwargs[key] is not value
+        isobar = tephigram.isobar._isopleths[0]
+        assert isobar._kwargs["line"] is not default["isobar_line"]
+        isobar._kwargs["line"]["color"] = "red"
+        assert default["isobar_line"]["color"] == "blue"
+
+
+class TestTephigramFigure(tests.TephiTest):
+    def test_pyplot_free(self):
+        figures = plt.get_fignums()
+        figure = Figure()
+        tephigram = TephiAxes(figure=figure)
+        tephigram.add_isobars()
+        profile = tephigram.plot([(1000, 20), (850, 10)], label="T")
+        profile.barbs([(10, 45, 900)])
+        tephigram.plot_many([[(1000, 15), (850, 5)]] * 2)
+        tephi.render(figure)
+        assert tephigram.figure is figure
+        assert tephigram.get_legend() is not None
+        assert plt.get_fignums() == figures
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramSpatialIndex(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        rng = np.random.default_rng(0)
+        pressure = np.linspace(1000, 300, 10)
+        self.tephigram = TephiAxes()
+        self.profiles = self.tephigram.tephi["profiles"]
+        for member in range(20):
+            temperature = np.linspace(20, -40, 10) + rng.normal(0, 3, 10)
+            self.tephigram.plot(
+                np.column_stack([pressure, temperature]),
+                metadata=dict(member=member),
+            )
+        self.points = rng.uniform(size=(50, 2))
+
+    def _brute_force(self, x, y):
+        result = None, np.inf
+        for profile in self.profiles:
+            if not profile.line.get_visible():
+                continue
+            xs, ys = transforms.convert_Tt2xy(
+                profile.points.temperature, profile.points.theta
+            )
+            x0, y0 = xs[..., :-1], ys[..., :-1]
+            dx, dy = np.diff(xs), np.diff(ys)
+            fraction = ((x - x0) * dx + (y - y0) * dy) / (dx**2 + dy**2)
+            fraction = np.clip(fraction, 0, 1)
+            distance = np.hypot(x0 + fraction * dx - x, y0 + fraction * dy - y)
+            if distance.min() < result[1]:
+                result = profile, distance.min()
+        return result
+
+    def _query(self):
+        x0, x1 = self.tephigram.get_xlim()
+        y0, y1 = self.tephigram.get_ylim()
+        for u, v in self.points:
+            x, y = x0 + u * (x1 - x0), y0 + v * (y1 - y0)
+            nearest = self.profiles.index.nearest(x, y, 10.0)
+            profile, distance = self._brute_force(x, y)
+            if distance > 10.0:
+                assert nearest is None
+            else:
+                assert nearest.profile is profile
+                assert nearest.distance == pytest.approx(distance)
+
+    def test_nearest(self):
+        self._query()
+
+    def test_hidden_and_removed(self):
+        self.profiles.hide(member=3)
+        self.profiles.remove(self.profiles[7])
+        self._query()
+        assert len(self.profiles.index) == 19
+
+    def test_incremental(self):
+        self._query()
+        self.tephigram.plot([(1000, 25), (700, 5), (400, -25)])
+        self._query()
+
+    def test_keys(self):
+        index = self.profiles.index
+        self._query()
+        # The packed keys of the cells, at non-negative cell indices, are
+        # positive.
+        assert np.all(index._segments["xy"] >= 0)
+        assert np.all(index._keys > 0)
+        assert np.all(np.diff(index._keys) >= 0)
+
+    def test_pending(self, monkeypatch):
+        index = self.profiles.index
+        self._query()
+        sorted_arrays = (index._segments, index._keys, index._samples)
+        calls = []
+        for name in ("_compact", "_concatenate", "_sort"):
+            method = getattr(index, name)
+
+            def counted(*args, _name=name, _method=method):
+                calls.append(_name)
+                return _method(*args)
+
+            monkeypatch.setattr(index, name, counted)
+        profile = self.tephigram.plot([(1000, 25), (700, 5), (400, -25)])
+        self._query()
+        x, y = transforms.convert_Tt2xy(
+            *transforms.convert_pT2Tt(*profile.data[1])
+        )
+        assert index.nearest(x, y, 1.0).profile is profile
+        assert index._pending["owner"].size > 0
+        # The pending profile is searched apart from the sorted index, which
+        # is neither rebuilt nor concatenated with it for each query.
+        assert all(
+            item is other
+            for item, other in zip(
+                (index._segments, index._keys, index._samples), sorted_arrays
+            )
+        )
+        assert calls == ["_concatenate"]
+
+    def test_nearest_point(self):
+        x, y = transforms.convert_Tt2xy(
+            *transforms.convert_pT2Tt(*self.profiles[0].data[4])
+        )
+        nearest = self.tephigram.nearest_profile(x, y)
+        assert nearest.profile is self.profiles[0]
+        assert nearest.segment in (3, 4)
+        assert nearest.pressure == pytest.approx(self.profiles[0].data[4, 0])
+
+    def test_pick(self):
+        profile = self.profiles[5]
+        x, y = transforms.convert_Tt2xy(
+            *transforms.convert_pT2Tt(*profile.data[2])
+        )
+        picked = []
+        canvas = self.tephigram.figure.canvas
+        canvas.mpl_connect("pick_event", lambda event: picked.append(event))
+        canvas.draw()
+        px, py = self.tephigram.transData.transform((x, y))
+        event = matplotlib.backend_bases.MouseEvent(
+            "button_press_event", canvas, px, py, 1
+        )
+        canvas.callbacks.process(event.name, event)
+        assert [event.artist for event in picked] == [profile.line]
+        assert picked[0].ind[0] in (1, 2)
+
+    def test_pick_replot(self):
+        profile = self.profiles[5]
+        profile.plot(color="red")
+        x, y = transforms.convert_Tt2xy(
+            *transforms.convert_pT2Tt(*profile.data[2])
+        )
+        picked = []
+        canvas = self.tephigram.figure.canvas
+        canvas.mpl_connect("pick_event", lambda event: picked.append(event))
+        canvas.draw()
+        px, py = self.tephigram.transData.transform((x, y))
+        event = matplotlib.backend_bases.MouseEvent(
+            "button_press_event", canvas, px, py, 1
+        )
+        canvas.callbacks.process(event.name, event)
+        # The new line is picked once, through the spatial index.
+        assert [event.artist for event in picked] == [profile.line]
+
+    def test_status_bar(self):
+        x, y = transforms.convert_Tt2xy(
+            *transforms.convert_pT2Tt(*self.profiles[5].data[2])
+        )
+        assert "member=5" in self.tephigram.format_coord(x, y)
+
+    def test_status_bar_readout(self):
+        tephigram = TephiAxes()
+        profile = tephigram.plot([(1000, 20), (850, 10), (700, 0)])
+        x, y = transforms.convert_Tt2xy(*transforms.convert_pT2Tt(850, 10.05))
+        text = tephigram.format_coord(x, y)
+        ratio = float(re.search("r=([-.0-9]+)g/kg", text).group(1))
+        assert ratio == pytest.approx(thermo.mixing_ratio(850, 10.05), 1e-3)
+        theta_w = float(re.search("\u03b8w=([-.0-9]+)", text).group(1))
+        expected = thermo.theta_w(850, 10.05, 10.05)
+        assert theta_w == pytest.approx(expected, abs=0.01)
+        expected = float(profile.temperature_at(850))
+        assert "T={:.2f}\u00b0C, p=850.00hPa]".format(expected) in text
+
+    def test_status_bar_group(self):
+        pressure = np.linspace(1000, 500, 11)
+        data = np.stack(
+            [
+                np.column_stack([pressure, np.linspace(30, -10, 11)]),
+                np.column_stack([pressure, np.linspace(35, -5, 11)]),
+            ]
+        )
+        tephigram = TephiAxes()
+        group = tephigram.plot_many(data)
+        x, y = transforms.convert_Tt2xy(*transforms.convert_pT2Tt(700, 11))
+        text = tephigram.format_coord(x, y)
+        assert "T=11.00\u00b0C, p=700.00hPa]" in text
+        assert list(group._interpolators) == [1]
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramBlit(tests.TephiTest):
+    def _tephigram(self, blit):
+        figure = plt.figure()
+        tephigram = TephiAxes(figure=figure, blit=blit)
+        tephigram.add_isobars()
+        tephigram.add_wet_adiabats()
+        rng = np.random.default_rng(0)
+        pressure = np.linspace(1000, 300, 20)
+        for member in range(5):
+            temperature = np.linspace(20, -40, 20) + rng.normal(0, 3, 20)
+            tephigram.plot(
+                np.column_stack([pressure, temperature]), label=str(member)
+            )
+        profile = tephigram.tephi["profiles"][0]
+        profile.barbs([(10, 45, 900), (30, 90, 600)])
+        figure.canvas.draw()
+        return tephigram
+
+    @staticmethod
+    def _pixels(tephigram):
+        canvas = tephigram.figure.canvas
+        return np.asarray(canvas.buffer_rgba()).copy()
+
+    def test_matches_full_draw(self):
+        expected = self._tephigram(blit=False)
+        result = self._tephigram(blit=True)
+        for tephigram in (expected, result):
+            tephigram.tephi["profiles"][2].highlight()
+            tephigram.figure.canvas.draw()
+        self.assertArrayEqual(self._pixels(result), self._pixels(expected))
+
+    def test_background_reused(self):
+        tephigram = self._tephigram(blit=True)
+        background = tephigram.tephi["background"]
+        tephigram.tephi["profiles"][1].highlight()
+        tephigram.tephi["profiles"][3].line.set_color("red")
+        tephigram.figure.canvas.draw()
+        assert tephigram.tephi["background"] is background
+
+    def test_invalidated(self):
+        tephigram = self._tephigram(blit=True)
+        canvas = tephigram.figure.canvas
+        changes = [
+            lambda: tephigram.isobar.set_visible(False),
+            lambda: tephigram.add_mixing_ratios(),
+            lambda: tephigram.set_xlim(tephigram.get_xlim()[0] + 1, None),
+            lambda: tephigram.figure.set_dpi(tephigram.figure.dpi * 2),
+        ]
+        for change in changes:
+            background = tephigram.tephi["background"]
+            change()
+            canvas.draw()
+            assert tephigram.tephi["background"] is not background
+
+    def test_blit(self):
+        tephigram = self._tephigram(blit=True)
+        tephigram.tephi["profiles"][4].highlight()
+        tephigram.blit()
+        result = self._pixels(tephigram)
+        tephigram.figure.canvas.draw()
+        self.assertArrayEqual(result, self._pixels(tephigram))
+
+    def test_blit_barbs(self):
+        expected = self._tephigram(blit=False)
+        result = self._tephigram(blit=True)
+        background = result.tephi["background"]
+        for tephigram in (expected, result):
+            profile = tephigram.tephi["profiles"][0]
+            profile._barbs.set_visible(False)
+        # The barbs are drawn over the background, rather than within it.
+        assert profile._barbs in result._dynamic_artists()
+        result.blit()
+        assert result.tephi["background"] is background
+        pixels = self._pixels(result)
+        expected.figure.canvas.draw()
+        self.assertArrayEqual(pixels, self._pixels(expected))
+
+    def test_set_blit(self):
+        tephigram = self._tephigram(blit=False)
+        assert tephigram.tephi["background"] is None
+        tephigram.set_blit(True)
+        tephigram.figure.canvas.draw()
+        assert tephigram.tephi["background"] is not None
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramDraft(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.figure = plt.figure()
+        self.tephigram = TephiAxes(figure=self.figure, draft=True)
+        self.tephigram.add_isobars()
+        self.tephigram.add_wet_adiabats()
+        pressure = np.linspace(1000, 300, 30)
+        profile = self.tephigram.plot(
+            np.column_stack([pressure, np.linspace(20, -40, 30)])
+        )
+        profile.barbs(
+            [(speed, 45, p) for speed, p in zip(range(5, 150, 5), pressure)]
+        )
+        self.profile = profile
+        self.figure.canvas.draw()
+
+    def _mouse(self, name):
+        x, y = self.tephigram.transAxes.transform((0.5, 0.5))
+        event = matplotlib.backend_bases.MouseEvent(
+            name, self.figure.canvas, x, y, 1
+        )
+        self.figure.canvas.callbacks.process(event.name, event)
+
+    def _drawn(self, monkeypatch, cls, method="draw"):
+        calls = []
+        original = getattr(cls, method)
+
+        def draw(artist, *args, **kwargs):
+            calls.append(artist)
+            return original(artist, *args, **kwargs)
+
+        monkeypatch.setattr(cls, method, draw)
+        return calls
+
+    def test_draft(self, monkeypatch):
+        self._mouse("button_press_event")
+        assert self.tephigram.tephi["drafting"]
+        labels = self._drawn(monkeypatch, isopleths.Isopleth, "refresh")
+        barbs = self._drawn(monkeypatch, matplotlib.quiver.Barbs)
+        self.figure.canvas.draw()
+        assert labels == []
+        assert len(barbs) <= default.get("draft_barbs")
+        drafted = [
+            adiabat
+            for adiabat in self.tephigram.wet_adiabat._isopleths
+            if adiabat._draft is not None
+        ]
+        assert drafted
+        for adiabat in drafted:
+            size = len(adiabat.points.temperature)
+            assert len(adiabat._draft.get_xdata()) < size
+
+    def test_release(self, monkeypatch):
+        self._mouse("button_press_event")
+        self.figure.canvas.draw()
+        labels = self._drawn(monkeypatch, isopleths.Isopleth, "refresh")
+        self._mouse("button_release_event")
+        assert not self.tephigram.tephi["drafting"]
+        assert labels
+
+    def test_click(self, monkeypatch):
+        # A click which draws nothing requires no final render.
+        draws = self._drawn(monkeypatch, TephiAxes)
+        self._mouse("button_press_event")
+        self._mouse("button_release_event")
+        assert draws == []
+
+    def test_disabled(self):
+        self.tephigram.set_draft(False)
+        self._mouse("button_press_event")
+        assert not self.tephigram.tephi["drafting"]
+
+    def test_barbs_drawn_once(self, monkeypatch):
+        barbs = self._drawn(monkeypatch, matplotlib.quiver.Barbs)
+        self.figure.canvas.draw()
+        assert len(barbs) == len({id(barb) for barb in barbs})
+
+
+@pytest.mark.usefixtures("close_plot")
+class TestTephigramReset(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        self.figure = plt.figure()
+        self.tephigram = TephiAxes(figure=self.figure)
+        self.tephigram.add_isobars()
+        self.tephigram.add_wet_adiabats()
+        self.figure.canvas.draw()
+        self.data = [(1000, 20), (850, 10), (700, 0), (500, -20)]
+
+    def _plot(self):
+        tephigram = self.tephigram
+        profile = tephigram.plot(self.data, label="temperature")
+        profile.barbs([(10, 45, 900), (30, 90, 600)])
+        profile.highlight()
+        group = tephigram.plot_many([self.data, self.data[:2]])
+        group.highlight()
+        pressure, temperature = np.array(self.data, dtype=float).T
+        tephigram.add_parcel(pressure, temperature, temperature - 5)
+        tephigram.text(0, 0, "label")
+        tephigram.set_title("station")
+        self.figure.canvas.draw()
+
+    def test_reset(self):
+        tephigram = self.tephigram
+        self._plot()
+        tephigram.reset()
+        assert len(tephigram.tephi["profiles"]) == 0
+        for container in (
+            tephigram.lines,
+            tephigram.collections,
+            tephigram.texts,
+        ):
+            assert not container
+        assert tephigram.get_legend() is None
+        assert tephigram.get_title() == ""
+        assert not np.isfinite(tephigram.tephi["bbox"].extents).any()
+        assert len(tephigram.tephi["profiles"].index) == 0
+        kinds = {type(artist) for artist in tephigram.artists}
+        assert kinds == {artists.IsobarArtist, artists.WetAdiabatArtist}
+        assert tephigram.tephi["artists"][artists.ParcelArtist] == []
+
+    def test_isopleths_kept(self):
+        tephigram = self.tephigram
+        isobars = tephigram.isobar._isopleths
+        adiabats = tephigram.wet_adiabat._isopleths
+        self._plot()
+        tephigram.reset()
+        self.figure.canvas.draw()
+        assert tephigram.isobar._isopleths is isobars
+        assert tephigram.wet_adiabat._isopleths is adiabats
+
+    def test_reuse(self):
+        tephigram = self.tephigram
+        self._plot()
+        tephigram.reset()
+        profile = tephigram.plot(self.data[1:])
+        assert list(tephigram.tephi["profiles"]) == [profile]
+        xlim, _ = tephigram._calculate_extents()
+        x, _ = transforms.convert_Tt2xy(
+            profile.points.temperature, profile.points.theta
+        )
+        self.assertArrayAlmostEqual(xlim, [np.min(x), np.max(x)])
+        self.figure.canvas.draw()
+        assert tephigram.get_legend() is None
+
+    def test_xylim_kept(self):
+        xylim = [(-20, 0), (40, 60)]
+        tephigram = TephiAxes(figure=plt.figure(), xylim=xylim)
+        view = tephigram.viewLim.frozen()
+        tephigram.plot(self.data)
+        tephigram.reset()
+        self.assertArrayEqual(tephigram.viewLim.bounds, view.bounds)
@@ -0,0 +1,114 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Tests the vectorised thermodynamic functions provided by tephi.thermo.
+
+"""
+# Import tephi test package first so that some things can be initialised
+# before importing anything else.
+import tephi.tests as tests
+
+import numpy as np
+import pytest
+
+from tephi import thermo, transforms
+from tephi.isopleths import BOUNDS, WetAdiabat
+
+
+def _wet_adiabat(theta_w):
+    """The points of a finely integrated saturated adiabat."""
+    adiabat = WetAdiabat.__new__(WetAdiabat)
+    adiabat.data = theta_w
+    adiabat.bounds = BOUNDS(-60, 1000.0)
+    adiabat._delta_pressure = -0.2
+    points = adiabat._generate_points()
+    return np.asarray(points.pressure), np.asarray(points.temperature)
+
+
+class TestThermo(tests.TephiTest):
+    @pytest.fixture(autouse=True)
+    def _setup(self):
+        rng = np.random.default_rng(0)
+        self.pressure = rng.uniform(100, 1050, (100, 100))
+        self.temperature = rng.uniform(-80, 45, (100, 100))
+        self.dewpoint = self.temperature - rng.uniform(0, 40, (100, 100))
+
+    def test_mixing_ratio_isopleth(self):
+        pressure = np.array([1000, 850, 500])
+        temperature = transforms.convert_pw2T(pressure, 10.0)
+        ratio = thermo.mixing_ratio(pressure, temperature)
+        self.assertArrayAlmostEqual(ratio, 10.0, decimal=1)
+
+    def test_lcl(self):
+        pressure, temperature = thermo.lcl(
+            self.pressure, self.temperature, self.dewpoint
+        )
+        assert pressure.shape == self.pressure.shape
+        # The LCL lies on the dry adiabat and the mixing ratio line.
+        _, theta = transforms.convert_pT2Tt(self.pressure, self.temperature)
+        _, lcl_theta = transforms.convert_pT2Tt(pressure, temperature)
+        self.assertArrayAlmostEqual(lcl_theta, theta)
+        self.assertArrayAlmostEqual(
+            thermo.mixing_ratio(pressure, temperature),
+            thermo.mixing_ratio(self.pressure, self.dewpoint),
+        )
+
+    def test_saturated(self):
+        # Saturated air is its own wet-bulb and LCL temperature.
+        self.assertArrayAlmostEqual(
+            thermo.wet_bulb_temperature(
+                self.pressure, self.temperature, self.temperature
+            ),
+            self.temperature,
+        )
+        _, temperature = thermo.lcl(
+            self.pressure, self.temperature, self.temperature
+        )
+        self.assertArrayAlmostEqual(temperature, self.temperature)
+
+    def test_wet_bulb_bounds(self):
+        wet_bulb = thermo.wet_bulb_temperature(
+            self.pressure, self.temperature, self.dewpoint
+        )
+        assert np.all(wet_bulb <= self.temperature + 1e-6)
+        assert np.all(wet_bulb >= self.dewpoint - 1e-6)
+
+    def test_theta_e_conserved(self):
+        pressure, temperature = thermo.lcl(
+            self.pressure, self.temperature, self.dewpoint
+        )
+        self.assertArrayAlmostEqual(
+            thermo.theta_e(pressure, temperature, temperature),
+            thermo.theta_e(self.pressure, self.temperature, self.dewpoint),
+            decimal=4,
+        )
+
+    @pytest.mark.parametrize("theta_w", [-10, 0, 10, 20])
+    def test_theta_w_wet_adiabat(self, theta_w):
+        pressure, temperature = _wet_adiabat(theta_w)
+        result = thermo.theta_w(pressure, temperature, temperature)
+        assert np.max(np.abs(result - theta_w)) < 0.5
+
+    def test_theta_w_conserved(self):
+        result = thermo.theta_w(
+            self.pressure, self.temperature, self.dewpoint
+        )
+        # The wet-bulb potential temperature is unchanged at the LCL.
+        pressure, temperature = thermo.lcl(
+            self.pressure, self.temperature, self.dewpoint
+        )
+        expected = thermo.theta_w(pressure, temperature, temperature)
+        self.assertArrayAlmostEqual(result, expected, decimal=3)
+
+    def test_saturated_theta_w(self):
+        result = thermo.saturated_theta_w(self.pressure, self.temperature)
+        expected = thermo.theta_w(
+            self.pressure, self.temperature, self.temperature
+        )
+        self.assertArrayAlmostEqual(result, expected, decimal=2)
+
+    def test_saturated_theta_w_outside(self):
+        result = thermo.saturated_theta_w([1200, 500, 500], [0, -120, 60])
+        assert np.all(np.isnan(result))
@@ -0,0 +1,395 @@
+# Copyright Tephi contributors
+#
+# This file is part of Tephi and is released under the BSD license.
+# See LICENSE in the root of the repository for full licensing details.
+"""
+Vectorised thermodynamic functions consistent with the tephigram isopleths.
+
+Each function accepts scalars or arrays of any broadcastable shape, and
+solves for its result over the whole array at once, either in closed form or
+with a fixed number of Newton iterations.
+
+The saturation vapour pressure, saturated adiabatic lapse rate and
+equivalent potential temperature all use the constants of
+:mod:`tephi.constants`, and so agree with the
+:class:`~tephi.isopleths.WetAdiabat` and
+:class:`~tephi.isopleths.HumidityMixingRatio` isopleths.
+
+"""
+
+import numpy as np
+
+import tephi.constants as constants
+
+#: Newton iterations used to solve for the lifting condensation level.
+_LCL_ITERATIONS = 6
+
+#: Newton iterations used to solve for saturated temperatures of constant
+#: equivalent potential temperature.
+_SATURATED_ITERATIONS = 6
+
+#: Upper bound, in K, of the first guess of the wet-bulb potential
+#: temperature, which keeps the Newton iterations away from the steep
+#: exponential growth of the saturation mixing ratio.
+_THETA_W_MAX_GUESS = 330.0
+
+#: The first, last and number of log-spaced pressures, in mb or hPa, of the
+#: lookup table of the saturated wet-bulb potential temperature.
+_THETA_W_TABLE_PRESSURE = (1100.0, 50.0, 200)
+
+#: The first, last and number of temperatures, in degC, of the lookup table
+#: of the saturated wet-bulb potential temperature.
+_THETA_W_TABLE_TEMPERATURE = (-100.0, 50.0, 301)
+
+# Tolerance, in grid steps, of lookups at the edges of a table.
+_TABLE_TOLERANCE = 1e-6
+
+# The lookup table of the saturated wet-bulb potential temperature, which is
+# built on first use.
+_THETA_W_TABLE = None
+
+
+def _saturation_vapour_pressure(kelvin):
+    """Saturation vapour pressure, in hPa, over water at the temperature."""
+    exponent = (constants.L / constants.Rv) * (
+        (1.0 / constants.KELVIN) - (1.0 / kelvin)
+    )
+    return 6.11 * np.exp(exponent)
+
+
+def _dewpoint(vapour_pressure):
+    """Dew-point, in K, of the vapour pressure, in hPa."""
+    return 1.0 / (
+        (1.0 / constants.KELVIN)
+        - ((constants.Rv / constants.L) * np.log(vapour_pressure / 6.11))
+    )
+
+
+def _log_theta_e(pressure, kelvin, mixing_ratio, lcl_kelvin):
+    """
+    Natural logarithm of the equivalent potential temperature, in K, given
+    the mixing ratio, in kg kg-1, and LCL temperature, in K.
+
+    """
+    log_theta = np.log(kelvin) + constants.K * np.log(
+        constants.P_BASE / pressure
+    )
+    latent = (constants.L / lcl_kelvin + constants.Rv) * mixing_ratio
+    return log_theta + latent / constants.Cp
+
+
+def _saturated_kelvin(pressure, log_theta_e, kelvin):
+    """
+    Temperature, in K, of saturated air at the pressure with the equivalent
+    potential temperature, solved for by Newton iteration from the first
+    guess temperature.
+
+    """
+    for _ in range(_SATURATED_ITERATIONS):
+        rs = _saturation_vapour_pressure(kelvin) * (constants.E / pressure)
+        residual = _log_theta_e(pressure, kelvin, rs, kelvin) - log_theta_e
+        drs = rs * constants.L / (constants.Rv * kelvin**2)
+        slope = 1.0 / kelvin + (
+            drs * (constants.L / kelvin + constants.Rv)
+            - rs * constants.L / kelvin**2
+        ) / constants.Cp
+        kelvin = kelvin - residual / slope
+    return kelvin
+
+
+def saturation_vapour_pressure(temperature):
+    """
+    Calculate the saturation vapour pressure over water.
+
+    Args:
+
+    * temperature:
+        Temperature in degC.
+
+    Returns:
+        Saturation vapour pressure in mb or hPa.
+
+    """
+    temperature = np.asarray(temperature)
+    return _saturation_vapour_pressure(temperature + constants.KELVIN)
+
+
+def mixing_ratio(pressure, dewpoint):
+    """
+    Calculate the humidity mixing ratio.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa.
+
+    * dewpoint:
+        Dew-point temperature in degC. Pass the temperature to calculate
+        the saturation mixing ratio.
+
+    Returns:
+        Humidity mixing ratio in g kg-1.
+
+    """
+    pressure, dewpoint = np.asarray(pressure), np.asarray(dewpoint)
+    vapour = _saturation_vapour_pressure(dewpoint + constants.KELVIN)
+    return 1000.0 * constants.E * vapour / pressure
+
+
+def saturated_lapse_rate(pressure, temperature):
+    """
+    Calculate the rate of change of temperature with pressure along the
+    saturated adiabat.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa.
+
+    * temperature:
+        Temperature in degC.
+
+    Returns:
+        Rate of change of temperature with pressure in K hPa-1.
+
+    """
+    pressure = np.asarray(pressure)
+    kelvin = np.asarray(temperature) + constants.KELVIN
+    rw = _saturation_vapour_pressure(kelvin) * (constants.E / pressure)
+    lrwbt = (constants.L * rw) / (constants.Rd * kelvin)
+    numerator = ((constants.Rd * kelvin) / (constants.Cp * pressure)) * (
+        1.0 + lrwbt
+    )
+    denominator = 1.0 + (
+        lrwbt * ((constants.E * constants.L) / (constants.Cp * kelvin))
+    )
+    return numerator / denominator
+
+
+def lcl(pressure, temperature, dewpoint):
+    """
+    Calculate the lifting condensation level.
+
+    The LCL lies where the dry adiabat through the temperature meets the
+    humidity mixing ratio line through the dew-point.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa.
+
+    * temperature:
+        Temperature in degC.
+
+    * dewpoint:
+        Dew-point temperature in degC.
+
+    Returns:
+        Tuple of the LCL pressure, in mb or hPa, and temperature, in degC.
+
+    For example:
+
+        >>> from tephi import thermo
+        >>> pressure, temperature = thermo.lcl(1000, 30, 20)
+        >>> print(f"{pressure:.1f} {temperature:.1f}")
+        865.5 17.7
+
+    """
+    pressure = np.asarray(pressure)
+    kelvin = np.asarray(temperature) + constants.KELVIN
+    dew_kelvin = np.asarray(dewpoint) + constants.KELVIN
+    # Equating the saturation vapour pressure ratio along the mixing ratio
+    # line with the pressure ratio along the dry adiabat gives
+    # a (1 / Td - 1 / T) = b ln(T / T0), which is solved for T.
+    a = constants.L / constants.Rv
+    b = 1.0 / constants.K
+    result = dew_kelvin
+    for _ in range(_LCL_ITERATIONS):
+        residual = a * (1.0 / dew_kelvin - 1.0 / result) - b * np.log(
+            result / kelvin
+        )
+        slope = a / result**2 - b / result
+        result = result - residual / slope
+    lcl_pressure = pressure * (result / kelvin) ** b
+    return lcl_pressure, result - constants.KELVIN
+
+
+def theta_e(pressure, temperature, dewpoint):
+    """
+    Calculate the equivalent potential temperature.
+
+    This is the pseudo-equivalent potential temperature
+    θ exp(r (L / T_lcl + Rv) / Cp), where r is the mixing ratio and T_lcl
+    is the temperature of the LCL, which is conserved, to first order,
+    along the saturated adiabats of the tephigram.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa.
+
+    * temperature:
+        Temperature in degC.
+
+    * dewpoint:
+        Dew-point temperature in degC.
+
+    Returns:
+        Equivalent potential temperature in degC.
+
+    """
+    pressure = np.asarray(pressure)
+    kelvin = np.asarray(temperature) + constants.KELVIN
+    _, lcl_temperature = lcl(pressure, temperature, dewpoint)
+    ratio = mixing_ratio(pressure, dewpoint) / 1000.0
+    log_theta_e = _log_theta_e(
+        pressure, kelvin, ratio, lcl_temperature + constants.KELVIN
+    )
+    return np.exp(log_theta_e) - constants.KELVIN
+
+
+def wet_bulb_temperature(pressure, temperature, dewpoint):
+    """
+    Calculate the wet-bulb temperature.
+
+    This is the temperature of saturated air at the same pressure and
+    equivalent potential temperature.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa.
+
+    * temperature:
+        Temperature in degC.
+
+    * dewpoint:
+        Dew-point temperature in degC.
+
+    Returns:
+        Wet-bulb temperature in degC.
+
+    """
+    pressure = np.asarray(pressure)
+    kelvin = np.asarray(temperature) + constants.KELVIN
+    log_theta_e = np.log(
+        theta_e(pressure, temperature, dewpoint) + constants.KELVIN
+    )
+    result = _saturated_kelvin(pressure, log_theta_e, kelvin)
+    return result - constants.KELVIN
+
+
+def theta_w(pressure, temperature, dewpoint):
+    """
+    Calculate the wet-bulb potential temperature.
+
+    This is the temperature at 1000 mb of the saturated adiabat through the
+    wet-bulb temperature, and so labels the
+    :class:`~tephi.isopleths.WetAdiabat` isopleth through the point.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa.
+
+    * temperature:
+        Temperature in degC.
+
+    * dewpoint:
+        Dew-point temperature in degC.
+
+    Returns:
+        Wet-bulb potential temperature in degC.
+
+    For example:
+
+        >>> from tephi import thermo
+        >>> print(f"{thermo.theta_w(1000, 20, 20):.2f}")
+        20.00
+
+    """
+    pressure = np.asarray(pressure)
+    log_theta_e = np.log(
+        theta_e(pressure, temperature, dewpoint) + constants.KELVIN
+    )
+    # The dry adiabat through the wet-bulb temperature is a first guess
+    # no cooler than the saturated adiabat at the base pressure.
+    wet_bulb = _saturated_kelvin(
+        pressure, log_theta_e, np.asarray(temperature) + constants.KELVIN
+    )
+    guess = wet_bulb * (constants.P_BASE / pressure) ** constants.K
+    guess = np.minimum(guess, _THETA_W_MAX_GUESS)
+    result = _saturated_kelvin(constants.P_BASE, log_theta_e, guess)
+    return result - constants.KELVIN
+
+
+def _saturated_theta_w_table():
+    """
+    The log-pressure and temperature axes, and the values, of the lookup
+    table of the saturated wet-bulb potential temperature.
+
+    """
+    global _THETA_W_TABLE
+    if _THETA_W_TABLE is None:
+        log_pressure = np.log(np.geomspace(*_THETA_W_TABLE_PRESSURE))
+        temperature = np.linspace(*_THETA_W_TABLE_TEMPERATURE)
+        pressure, kelvin = np.meshgrid(
+            np.exp(log_pressure), temperature, indexing="ij"
+        )
+        values = theta_w(pressure, kelvin, kelvin)
+        _THETA_W_TABLE = log_pressure, temperature, values
+    return _THETA_W_TABLE
+
+
+def saturated_theta_w(pressure, temperature):
+    """
+    Look up the wet-bulb potential temperature of saturated air.
+
+    This labels the :class:`~tephi.isopleths.WetAdiabat` through the point,
+    and matches ``theta_w(pressure, temperature, temperature)`` to within
+    0.01 degC. It is interpolated from a table, which is solved for once on
+    first use, and so is cheap enough to evaluate on every mouse event.
+
+    Args:
+
+    * pressure:
+        Pressure in mb or hPa, between 50 and 1100.
+
+    * temperature:
+        Temperature in degC, between -100 and 50.
+
+    Returns:
+        Wet-bulb potential temperature in degC, which is NaN outside the
+        table.
+
+    For example:
+
+        >>> from tephi import thermo
+        >>> print(f"{thermo.saturated_theta_w(1000, 20):.2f}")
+        20.00
+
+    """
+    log_pressure, temperatures, values = _saturated_theta_w_table()
+    with np.errstate(invalid="ignore", divide="ignore"):
+        row = (np.log(pressure) - log_pressure[0]) / (
+            log_pressure[1] - log_pressure[0]
+        )
+    column = (np.asarray(temperature, dtype=float) - temperatures[0]) / (
+        temperatures[1] - temperatures[0]
+    )
+    # Allow for rounding at the edges of the table.
+    inside = (
+        (row > -_TABLE_TOLERANCE)
+        & (row < log_pressure.size - 1 + _TABLE_TOLERANCE)
+        & (column > -_TABLE_TOLERANCE)
+        & (column < temperatures.size - 1 + _TABLE_TOLERANCE)
+    )
+    row = np.clip(np.where(inside, row, 0.0), 0, log_pressure.size - 1)
+    column = np.clip(np.where(inside, column, 0.0), 0, temperatures.size - 1)
+    i = np.minimum(row.astype(int), log_pressure.size - 2)
+    j = np.minimum(column.astype(int), temperatures.size - 2)
+    u, v = row - i, column - j
+    lower = (1 - v) * values[i, j] + v * values[i, j + 1]
+    upper = (1 - v) * values[i + 1, j] + v * values[i + 1, j + 1]
+    result = (1 - u) * lower + u * upper
+    return np.where(inside, result, np.nan)
@@ -5,13 +5,33 @@
 """
 Tephigram transform support.
 
+The conversions between pressure, temperature, potential temperature and
+native tephigram coordinates only require NumPy. The matplotlib
+:class:`TephiTransform` and :class:`TephiTransformInverted` are imported,
+along with matplotlib, on first use.
+
 """
 
-from matplotlib.transforms import Transform
+import importlib
+
 import numpy as np
 
 import tephi.constants as constants
 
+# The matplotlib transforms, which are imported from their submodule on first
+# use.
+_TRANSFORMS = ("TephiTransform", "TephiTransformInverted")
+
+
+def __getattr__(name):
+    if name in _TRANSFORMS:
+        module = importlib.import_module("tephi._transforms")
+        value = getattr(module, name)
+        globals()[name] = value
+        return value
+    msg = "module {!r} has no attribute {!r}"
+    raise AttributeError(msg.format(__name__, name))
+
 
 def convert_Tt2pT(temperature, theta):
     """
@@ -185,68 +205,3 @@ def convert_pw2T(pressure, mixing_ratio):
     )
 
     return temp - constants.KELVIN
-
-
-class TephiTransform(Transform):
-    """
-    Tephigram transformation to convert from temperature and
-    potential temperature to native plotting device coordinates.
-
-    """
-
-    input_dims = 2
-    output_dims = 2
-    is_separable = False
-    has_inverse = True
-
-    def transform_non_affine(self, values):
-        """
-        Transform from tephigram temperature and potential temperature
-        to native plotting device coordinates.
-
-        Args:
-
-        * values:
-            Values to be transformed, with shape (N, 2).
-
-        """
-        return np.concatenate(
-            convert_Tt2xy(values[:, 0:1], values[:, 1:2]), axis=-1
-        )
-
-    def inverted(self):
-        """Return the inverse transformation."""
-        return TephiTransformInverted()
-
-
-class TephiTransformInverted(Transform):
-    """
-    Tephigram inverse transformation to convert from native
-    plotting device coordinates to tephigram temperature and
-    potential temperature.
-
-    """
-
-    input_dims = 2
-    output_dims = 2
-    is_separable = False
-    has_inverse = True
-
-    def transform_non_affine(self, values):
-        """
-        Transform from native plotting display coordinates to tephigram
-        temperature and potential temperature.
-
-        Args:
-
-        * values:
-           Values to be transformed, with shape (N, 2).
-
-        """
-        return np.concatenate(
-            convert_xy2Tt(values[:, 0:1], values[:, 1:2]), axis=-1
-        )
-
-    def inverted(self):
-        """Return the inverse transformation."""
-        return TephiTransform()